@@ -1,110 +1,133 @@
 # app/api/endpoints.py
 
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+import json
+import math
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
+from typing import List, Optional
 
 # Import models, services, and utilities
-from app.models.schemas import AnalysisRequest, FollowUpRequest, Chapter
-from app.services import ai_service
+from app.core import config
+from app.core.chapters import CHAPTERS_DATA
+from app.models.schemas import AnalysisRequest, BatchAnalysisRequest, ExplanationScope, FollowUpRequest, Chapter
+from app.services import (
+    ai_service, cassette_service, document_service, llm_backend, scraper_service, search_service, snapshot_service,
+)
+from app.services.document_service import ChapterNotFoundError
+from app.services.session_service import SessionNotFoundError
+from app.utils.admission import OverloadedError
+from app.utils.cassette import CassetteMissError
+from app.utils.canonical import canonical_analysis_query
+from app.utils.http_cache import cache_control, entity_tag, if_none_match
 
 # Create a new router instance
 router = APIRouter()
 
-# --- REVISION 1: Updated URLs to point to HTML versions ---
-CHAPTERS_DATA: List[Dict[str, Any]]= [
-    {
-        "id": 1,
-        "name": "Chapter 1: Founding Provisions",
-        "url": "https://www.gov.za/documents/constitution/chapter-1-founding-provisions"
-    },
-    {
-        "id": 2,
-        "name": "Chapter 2: Bill of Rights",
-        "url": "https://www.gov.za/documents/constitution/chapter-2-bill-rights"
-    },
-    {
-        "id": 3,
-        "name": "Chapter 3: Co-operative Government",
-        "url": "https://www.gov.za/documents/constitution/chapter-3-co-operative-government"
-    },
-    {
-        "id": 4,
-        "name": "Chapter 4: Parliament",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-4-parliament"
-    },
-    {
-        "id": 5,
-        "name": "Chapter 5: The President & National Executive",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-5-president-and-national-executive"
-    },
-    {
-        "id": 6,
-        "name": "Chapter 6: Provinces",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-6-provinces"
-    },
-    {
-        "id": 7,
-        "name": "Chapter 7: Local Government",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-7-local-government"
-    },
-    {
-        "id": 8,
-        "name": "Chapter 8: Courts & Administration of Justice",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-8-courts-and-administration-justice"
-    },
-    {
-        "id": 9,
-        "name": "Chapter 9: State institutions supporting constitutional democracy",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-9-state-institutions-supporting"
-    },
-    {
-        "id": 10,
-        "name": "Chapter 10: Public Administration",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-10-public-administration"
-    },
-    {
-        "id": 11,
-        "name": "Chapter 11: Security Services",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-11-security-services"
-    },
-    {
-        "id": 12,
-        "name": "Chapter 12: Traditional Leaders",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-12-traditional-leaders"
-    },
-    {
-        "id": 13,
-        "name": "Chapter 13: Finance",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-13-finance"
-    },
-    {
-        "id": 14,
-        "name": "Chapter 14: General Provisions",
-        "url": "https://www.gov.za/documents/constitution-republic-south-africa-1996-chapter-14-general-provisions"
-    },
-]
+# The chapter list only changes with a deploy, so its ETag is fixed at import.
+_CHAPTERS_ETAG = entity_tag(json.dumps(CHAPTERS_DATA, sort_keys=True))
+_CHAPTERS_BY_ID = {chapter["id"]: chapter for chapter in CHAPTERS_DATA}
+
+
+def _overloaded(e: OverloadedError) -> HTTPException:
+    """Maps a rejected model call to 503, with a whole-second Retry-After hint."""
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
+
+
+def _not_modified(etag: str, cache_control_value: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control_value})
 
 
 @router.get("/chapters", response_model=List[Chapter], tags=["Chapters"])
-async def get_chapters():
+async def get_chapters(response: Response, if_none_match_header: Optional[str] = Header(None, alias="If-None-Match")):
     """
     Provides the frontend with a static list of the constitutional chapters.
+
+    The response carries an ETag and may be cached; a request whose
+    If-None-Match still matches gets an empty 304.
     """
+    caching = cache_control(config.CHAPTERS_HTTP_MAX_AGE, config.CHAPTERS_HTTP_SHARED_MAX_AGE)
+    if if_none_match(if_none_match_header, _CHAPTERS_ETAG):
+        return _not_modified(_CHAPTERS_ETAG, caching)
+    response.headers["ETag"] = _CHAPTERS_ETAG
+    response.headers["Cache-Control"] = caching
     return CHAPTERS_DATA
 
+async def _chapter_document(chapter_id: int):
+    try:
+        return await document_service.get_chapter_document(chapter_id)
+    except ChapterNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        # This is for network/scraping failures.
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/chapters/{chapter_id}/sections", tags=["Chapters"])
+async def get_chapter_sections(chapter_id: int):
+    """
+    Lists the numbered sections of a chapter (number, title and character
+    offsets into the chapter text), without calling the AI service.
+    """
+    document = await _chapter_document(chapter_id)
+    return {
+        "chapter_id": document.chapter_id,
+        "title": document.title,
+        "url": document.url,
+        "sections": [section.to_dict(include_text=False) for section in document.sections],
+    }
+
+@router.get("/chapters/{chapter_id}/sections/{section_number}", tags=["Chapters"])
+async def get_chapter_section(chapter_id: int, section_number: str):
+    """
+    Returns one section of a chapter, e.g. section 16 of chapter 2, with its
+    subsections and items, straight from the parsed document model.
+    """
+    document = await _chapter_document(chapter_id)
+    section = document.section(section_number)
+    if section is None:
+        raise HTTPException(status_code=404, detail=f"Section {section_number} was not found in chapter {chapter_id}.")
+    return {"chapter_id": document.chapter_id, **section.to_dict()}
+
+@router.get("/search", tags=["Chapters"])
+async def search_constitution(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    chapter_id: Optional[int] = None,
+):
+    """
+    Full-text search across every section of the Constitution, without
+    calling the AI service. Put phrases in double quotes to match them
+    exactly, e.g. `"freedom of expression" limits`. Each result names its
+    chapter and section and carries an HTML snippet with <mark> highlights.
+    """
+    try:
+        return await search_service.search(q, limit, chapter_id)
+    except RuntimeError as e:
+        # This is for network/scraping failures.
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/analyze", tags=["Analysis"])
-async def analyze_chapter(request: AnalysisRequest):
+async def analyze_chapter(request: AnalysisRequest, response: Response):
     """
     Receives a request to analyze a chapter, calls the AI service,
     and returns a structured analysis.
+
+    The `X-Cache` response header is `HIT` when the analysis was served
+    from the result cache and `MISS` when it was freshly generated.
+
+    The response includes a `session_id`; follow-ups that send it need not
+    resend the analysis text or the chapter URL.
     """
     try:
         # Parse the raw string response from the service
-        parsed_response = await ai_service.generate_initial_analysis(request)
+        parsed_response, cache_status = await ai_service.start_analysis_session(request)
+        response.headers["X-Cache"] = cache_status
 
         # Return the parsed dictionary on success
         return parsed_response
 
+    except OverloadedError as e:
+        # The model is saturated; ask the client to back off instead of timing out.
+        raise _overloaded(e)
     # --- REVISION 2: Swapped status codes for ValueError and RuntimeError ---
     except ValueError as e:
         # This is for safety blocks or parsing issues.
@@ -113,11 +136,146 @@ async def analyze_chapter(request: AnalysisRequest):
         # This is for network/scraping failures.
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/analyze", tags=["Analysis"])
+async def get_analysis(
+    request: Request,
+    response: Response,
+    chapter_id: int,
+    scope: ExplanationScope,
+    role: Optional[str] = Query(None, max_length=200),
+    audience: Optional[str] = Query(None, max_length=200),
+    if_none_match_header: Optional[str] = Header(None, alias="If-None-Match"),
+):
+    """
+    A cacheable variant of `POST /analyze` for a chapter by id, without
+    follow-up questions or a session. For example:
+    `GET /api/analyze?chapter_id=2&scope=A&role=journalist`.
+
+    Queries that are not in canonical form (parameter order, case or spacing
+    of `role` and `audience`) are redirected (308) to the canonical URL, so
+    equivalent requests share one cache entry.
+
+    The response carries a strong ETag, derived from the chapter text, the
+    request and the prompt version, and a public Cache-Control. A request
+    whose If-None-Match still matches gets an empty 304 without a model call.
+    """
+    chapter = _CHAPTERS_BY_ID.get(chapter_id)
+    if chapter is None:
+        raise HTTPException(status_code=404, detail=f"Chapter {chapter_id} does not exist.")
+    analysis_request = AnalysisRequest(
+        chapter_url=chapter["url"], explanation_scope=scope, analysis_role=role, target_audience=audience,
+    )
+    canonical_query = canonical_analysis_query(chapter_id, analysis_request)
+    if request.url.query != canonical_query:
+        return RedirectResponse(f"{request.url.path}?{canonical_query}", status_code=308)
+
+    caching = cache_control(config.ANALYSIS_HTTP_MAX_AGE, config.ANALYSIS_HTTP_SHARED_MAX_AGE)
+    try:
+        parsed_response, cache_status, etag = await ai_service.get_cacheable_analysis(
+            analysis_request, if_none_match_header,
+        )
+    except OverloadedError as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if parsed_response is None:
+        return _not_modified(etag, caching)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = caching
+    response.headers["X-Cache"] = cache_status
+    return parsed_response
+
+@router.post("/analyze/stream", tags=["Analysis"])
+async def analyze_chapter_stream(request: AnalysisRequest):
+    """
+    Streams the analysis as newline-delimited JSON (NDJSON) events: the
+    analysis text as it is generated, each answered question as soon as it
+    is complete, and a terminal `complete` event carrying the validated object.
+
+    Failures after the stream has started are reported as a final `error`
+    event, carrying the status code the non-streaming endpoint would use.
+    """
+    async def event_lines():
+        try:
+            async for event in ai_service.stream_initial_analysis(request):
+                yield json.dumps(event) + "\n"
+        except OverloadedError as e:
+            yield json.dumps({"event": "error", "status_code": 503, "detail": str(e), "retry_after": e.retry_after}) + "\n"
+        except CassetteMissError as e:
+            yield json.dumps({"event": "error", "status_code": 503, "detail": str(e)}) + "\n"
+        except ValueError as e:
+            yield json.dumps({"event": "error", "status_code": 409, "detail": str(e)}) + "\n"
+        except RuntimeError as e:
+            yield json.dumps({"event": "error", "status_code": 400, "detail": str(e)}) + "\n"
+
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+def _batch_item(index: int, outcome) -> dict:
+    """Describes one batch item, mapping failures to the status code `/analyze` would use."""
+    if not isinstance(outcome, Exception):
+        result, cache_status = outcome
+        return {"index": index, "status": "ok", "cache": cache_status, "result": result}
+
+    item = {"index": index, "status": "error", "detail": str(outcome)}
+    if isinstance(outcome, OverloadedError):
+        item.update(status_code=503, retry_after=outcome.retry_after)
+    elif isinstance(outcome, CassetteMissError):
+        item["status_code"] = 503
+    elif isinstance(outcome, ValueError):
+        item["status_code"] = 409
+    elif isinstance(outcome, RuntimeError):
+        item["status_code"] = 400
+    else:
+        item.update(status_code=500, detail="Internal error while analyzing this item.")
+    return item
+
+@router.post("/analyze/batch", tags=["Analysis"])
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Analyzes several chapters and/or scopes in one call. Items run
+    concurrently and share scrapes of the same chapter, so the call takes
+    about as long as its slowest item.
+
+    Every item is reported in request order with `status` "ok" (plus
+    `result` and `cache`) or "error" (plus `status_code` and `detail`);
+    one failing item does not fail the batch.
+    """
+    items = [None] * len(request.items)
+    async for index, outcome in ai_service.generate_batch_analyses(request.items):
+        items[index] = _batch_item(index, outcome)
+    failed = sum(item["status"] == "error" for item in items)
+    return {"items": items, "succeeded": len(items) - failed, "failed": failed}
+
+@router.post("/analyze/batch/stream", tags=["Analysis"])
+async def analyze_batch_stream(request: BatchAnalysisRequest):
+    """
+    Like `/analyze/batch`, but streams each item as an NDJSON `item` event
+    as soon as it completes, followed by a `complete` event with the totals.
+    """
+    async def event_lines():
+        succeeded = failed = 0
+        async for index, outcome in ai_service.generate_batch_analyses(request.items):
+            item = _batch_item(index, outcome)
+            if item["status"] == "ok":
+                succeeded += 1
+            else:
+                failed += 1
+            yield json.dumps({"event": "item", **item}) + "\n"
+        yield json.dumps({"event": "complete", "succeeded": succeeded, "failed": failed}) + "\n"
+
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
 @router.post("/follow-up", tags=["Analysis"])
 async def follow_up_question(request: FollowUpRequest):
     """
     Receives a follow-up question, calls the AI service with context,
     and returns a concise answer.
+
+    Send either a `session_id` from `/analyze` or the `initial_analysis_text`
+    and `original_url`. An unknown or expired session returns 404.
     """
     try:
 
@@ -125,10 +283,34 @@ async def follow_up_question(request: FollowUpRequest):
         response_data = await ai_service.generate_follow_up_answer(request)
         return response_data
 
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except OverloadedError as e:
+        # The model is saturated; ask the client to back off instead of timing out.
+        raise _overloaded(e)
     # --- REVISION 2: Swapped status codes for ValueError and RuntimeError ---
     except ValueError as e:
         # This is for safety blocks or parsing issues.
         raise HTTPException(status_code=409, detail=str(e))
     except RuntimeError as e:
         # This is for network/scraping failures.
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/stats", tags=["Diagnostics"])
+async def get_stats():
+    """
+    Exposes in-process cache counters, e.g. to confirm that follow-up
+    questions are served from the document cache instead of the network.
+    """
+    return {
+        "corpus_snapshot": snapshot_service.get_snapshot_stats(),
+        "document_cache": scraper_service.get_document_cache_stats(),
+        "analysis_single_flight": ai_service.get_inflight_stats(),
+        "analysis_result_cache": ai_service.get_result_cache_stats(),
+        "analysis_hedging": ai_service.get_hedging_stats(),
+        "follow_up_answer_cache": ai_service.get_answer_cache_stats(),
+        "sessions": ai_service.get_session_stats(),
+        "search_index": search_service.get_search_stats(),
+        "admission": llm_backend.get_admission_stats(),
+        "cassettes": cassette_service.get_cassette_stats(),
+    }
@@ -0,0 +1,69 @@
+# app/api/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import REGISTRY, Counter, Gauge
+from app.services import ai_service, llm_backend, scraper_service, snapshot_service
+
+router = APIRouter()
+
+# Read from the services' own counters at scrape time, so they cost nothing per request.
+_CACHE_LOOKUPS = Counter("analyzer_cache_lookups", "Cache lookups by cache and result.", ["cache", "result"])
+_CACHE_HIT_RATIO = Gauge("analyzer_cache_hit_ratio", "Fraction of lookups served by each cache.", ["cache"])
+_ADMISSION_ACTIVE = Gauge("analyzer_admission_active", "Model calls currently holding a slot.", ["model"])
+_ADMISSION_QUEUED = Gauge("analyzer_admission_queue_depth", "Model calls waiting for a slot.", ["model"])
+_ADMISSION_REJECTED = Counter("analyzer_admission_rejected", "Model calls turned away (queue full or timed out).", ["model"])
+
+
+def _cache_counts():
+    """(cache, hits, misses) for every cache that is enabled."""
+    document = scraper_service.get_document_cache_stats()
+    yield "document", document["hits"], document["misses"]
+    yield "snapshot", snapshot_service.get_snapshot_stats()["hits"], 0
+
+    result = ai_service.get_result_cache_stats()
+    if result.get("enabled", True):
+        yield "analysis_result", result["memory_hits"] + result["disk_hits"], result["misses"]
+
+    answers = ai_service.get_answer_cache_stats()
+    if answers["enabled"]:
+        yield "follow_up_answer", answers["exact_hits"] + answers["near_hits"], answers["misses"]
+
+
+def _collect_caches():
+    counts = list(_cache_counts())
+    yield _CACHE_LOOKUPS, (
+        sample
+        for cache, hits, misses in counts
+        for sample in (
+            ("analyzer_cache_lookups_total", {"cache": cache, "result": "hit"}, hits),
+            ("analyzer_cache_lookups_total", {"cache": cache, "result": "miss"}, misses),
+        )
+    )
+    yield _CACHE_HIT_RATIO, (
+        ("analyzer_cache_hit_ratio", {"cache": cache}, hits / (hits + misses) if hits + misses else 0.0)
+        for cache, hits, misses in counts
+    )
+
+
+def _collect_admission():
+    stats = llm_backend.get_admission_stats()
+    yield _ADMISSION_ACTIVE, (("analyzer_admission_active", {"model": m}, s["active"]) for m, s in stats.items())
+    yield _ADMISSION_QUEUED, (("analyzer_admission_queue_depth", {"model": m}, s["queue_depth"]) for m, s in stats.items())
+    yield _ADMISSION_REJECTED, (
+        ("analyzer_admission_rejected_total", {"model": m}, s["rejected"] + s["timed_out"]) for m, s in stats.items()
+    )
+
+
+REGISTRY.add_collector(_collect_caches)
+REGISTRY.add_collector(_collect_admission)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, tags=["Diagnostics"])
+async def get_metrics():
+    """
+    Exposes stage latencies, model token usage, cache hit ratios and
+    upstream error counts in the Prometheus text format.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,199 @@
+# app/core/config.py
+
+import os
+from dotenv import load_dotenv
+
+# Load the .env file once so every setting below can be overridden locally.
+load_dotenv()
+
+
+def _get_int(name: str, default: int) -> int:
+    """Reads an integer setting from the environment, falling back to a default."""
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _get_float(name: str, default: float) -> float:
+    """Reads a float setting from the environment, falling back to a default."""
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    """Reads a boolean setting ("1", "true", "yes", "on") from the environment."""
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# --- SCRAPER: DOCUMENT CACHE ---
+# Cleaned chapter text is cached in-process, keyed by URL.
+# Entries older than the TTL are revalidated with a conditional GET.
+DOCUMENT_CACHE_MAX_ENTRIES = _get_int("DOCUMENT_CACHE_MAX_ENTRIES", 64)
+DOCUMENT_CACHE_TTL_SECONDS = _get_float("DOCUMENT_CACHE_TTL_SECONDS", 6 * 60 * 60)
+
+# --- SHARED HTTP CLIENT ---
+# One pooled httpx.AsyncClient is created in the app lifespan and reused by the scraper.
+HTTP_MAX_CONNECTIONS = _get_int("HTTP_MAX_CONNECTIONS", 20)
+HTTP_MAX_KEEPALIVE_CONNECTIONS = _get_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10)
+HTTP_KEEPALIVE_EXPIRY_SECONDS = _get_float("HTTP_KEEPALIVE_EXPIRY_SECONDS", 30.0)
+# HTTP/2 needs the optional `h2` package (`pip install httpx[http2]`).
+HTTP2_ENABLED = _get_bool("HTTP2_ENABLED", False)
+HTTP_CONNECT_TIMEOUT_SECONDS = _get_float("HTTP_CONNECT_TIMEOUT_SECONDS", 5.0)
+HTTP_READ_TIMEOUT_SECONDS = _get_float("HTTP_READ_TIMEOUT_SECONDS", 15.0)
+HTTP_WRITE_TIMEOUT_SECONDS = _get_float("HTTP_WRITE_TIMEOUT_SECONDS", 5.0)
+HTTP_POOL_TIMEOUT_SECONDS = _get_float("HTTP_POOL_TIMEOUT_SECONDS", 5.0)
+
+# --- OFFLINE CORPUS SNAPSHOT ---
+# Built by `python build_snapshot.py` and shipped in the Docker image.
+# Documents found in the snapshot are served without any network I/O.
+CORPUS_SNAPSHOT_PATH = os.getenv(
+    "CORPUS_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "corpus_snapshot.json.gz"),
+)
+
+# --- ANALYSIS RESULT CACHE ---
+# Initial analyses are cached per canonical request + document hash, in memory
+# and in a SQLite file that survives restarts. Set the path to "" to keep only
+# the in-memory tier.
+ANALYSIS_CACHE_ENABLED = _get_bool("ANALYSIS_CACHE_ENABLED", True)
+ANALYSIS_CACHE_MEMORY_ENTRIES = _get_int("ANALYSIS_CACHE_MEMORY_ENTRIES", 256)
+ANALYSIS_CACHE_DISK_MAX_ENTRIES = _get_int("ANALYSIS_CACHE_DISK_MAX_ENTRIES", 5000)
+ANALYSIS_CACHE_TTL_SECONDS = _get_float("ANALYSIS_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60)
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", os.path.join(".cache", "analysis_cache.sqlite3"))
+
+# --- FOLLOW-UP RETRIEVAL ---
+# Follow-up prompts include only the chapter sections most relevant to the
+# question (BM25-ranked), within a token budget. When retrieval confidence is
+# low the full chapter text is sent instead.
+FOLLOW_UP_RETRIEVAL_ENABLED = _get_bool("FOLLOW_UP_RETRIEVAL_ENABLED", True)
+FOLLOW_UP_TOP_K_SECTIONS = _get_int("FOLLOW_UP_TOP_K_SECTIONS", 6)
+FOLLOW_UP_TOKEN_BUDGET = _get_int("FOLLOW_UP_TOKEN_BUDGET", 6000)
+# Minimum BM25 score of the best section for retrieval to be trusted.
+FOLLOW_UP_MIN_RETRIEVAL_SCORE = _get_float("FOLLOW_UP_MIN_RETRIEVAL_SCORE", 2.0)
+
+# --- LLM BACKEND ---
+# "gemini" calls the real API; "stub" is a deterministic local stand-in for
+# tests, benchmarks and capacity planning (see app/services/stub_backend.py).
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+# Create the backend (importing its SDK) and its model handles in a background
+# thread at startup, rather than during the first request that needs a model.
+LLM_WARMUP_AT_STARTUP = _get_bool("LLM_WARMUP_AT_STARTUP", True)
+# Stub latency to first token, as "<distribution>:<params>", e.g. "fixed:0.05",
+# "uniform:0.2,1.5", "normal:0.8,0.2" or "lognormal:-0.5,0.6" (seconds).
+LLM_STUB_LATENCY = os.getenv("LLM_STUB_LATENCY", "fixed:0")
+# Per-model latency overrides as "model=spec;model=spec", e.g.
+# "models/gemini-2.5-pro=lognormal:1,0.8;models/gemini-2.0-flash=fixed:0.3".
+LLM_STUB_MODEL_LATENCY = os.getenv("LLM_STUB_MODEL_LATENCY", "")
+# Output tokens generated per second after the first token (0 = instantaneous).
+LLM_STUB_TOKENS_PER_SECOND = _get_float("LLM_STUB_TOKENS_PER_SECOND", 0.0)
+# Fraction of calls that fail, and the failure kinds to choose from
+# ("error", "blocked", "invalid_json", "rate_limited").
+LLM_STUB_ERROR_RATE = _get_float("LLM_STUB_ERROR_RATE", 0.0)
+LLM_STUB_ERROR_KINDS = os.getenv("LLM_STUB_ERROR_KINDS", "error")
+# Optional JSON file mapping "analysis" / "follow_up" / "follow_up_multi" to canned responses.
+LLM_STUB_RESPONSES_PATH = os.getenv("LLM_STUB_RESPONSES_PATH", "")
+LLM_STUB_SEED = _get_int("LLM_STUB_SEED", 0)
+
+# --- ADMISSION CONTROL FOR MODEL CALLS ---
+# Each model gets at most MAX_CONCURRENCY calls in flight and MAX_QUEUE callers
+# waiting; a caller that waits longer than QUEUE_TIMEOUT is rejected with 503.
+LLM_MAX_CONCURRENCY = _get_int("LLM_MAX_CONCURRENCY", 8)
+LLM_MAX_QUEUE = _get_int("LLM_MAX_QUEUE", 32)
+LLM_QUEUE_TIMEOUT_SECONDS = _get_float("LLM_QUEUE_TIMEOUT_SECONDS", 10.0)
+# Per-model overrides as "model=concurrency:queue:timeout", comma separated, e.g.
+# "models/gemini-2.5-pro=4:16:15,models/gemini-2.0-flash=16:64:5".
+LLM_ADMISSION_LIMITS = os.getenv("LLM_ADMISSION_LIMITS", "")
+# Retry-After sent when the upstream provider itself rate-limits us.
+LLM_RATE_LIMIT_RETRY_AFTER_SECONDS = _get_float("LLM_RATE_LIMIT_RETRY_AFTER_SECONDS", 10.0)
+
+# --- HEDGED ANALYSIS CALLS ---
+# When the primary analysis call is slower than the ANALYSIS_HEDGE_PERCENTILE of recent
+# calls, a second call is raced against it and the first valid result wins.
+ANALYSIS_HEDGING_ENABLED = _get_bool("ANALYSIS_HEDGING_ENABLED", False)
+# Model for the hedge call; empty means the analysis model itself.
+ANALYSIS_HEDGE_MODEL = os.getenv("ANALYSIS_HEDGE_MODEL", "")
+ANALYSIS_HEDGE_PERCENTILE = _get_float("ANALYSIS_HEDGE_PERCENTILE", 0.95)
+# Hedge delay used until ANALYSIS_HEDGE_MIN_SAMPLES latencies have been observed.
+ANALYSIS_HEDGE_DEFAULT_DELAY_SECONDS = _get_float("ANALYSIS_HEDGE_DEFAULT_DELAY_SECONDS", 30.0)
+ANALYSIS_HEDGE_MIN_SAMPLES = _get_int("ANALYSIS_HEDGE_MIN_SAMPLES", 20)
+ANALYSIS_HEDGE_WINDOW = _get_int("ANALYSIS_HEDGE_WINDOW", 200)
+# Upper bound on the fraction of analysis calls that may fire a hedge (the extra cost).
+ANALYSIS_HEDGE_BUDGET_FRACTION = _get_float("ANALYSIS_HEDGE_BUDGET_FRACTION", 0.1)
+
+# --- BATCH ANALYSIS ---
+# Maximum number of analyses a single /api/analyze/batch call generates at once.
+BATCH_MAX_CONCURRENCY = _get_int("BATCH_MAX_CONCURRENCY", 4)
+
+# --- CONVERSATION SESSIONS ---
+# /api/analyze opens a session holding the chapter text, the analysis and the
+# follow-up history, so follow-ups can send just a session id and a question.
+SESSION_TTL_SECONDS = _get_float("SESSION_TTL_SECONDS", 60 * 60)
+SESSION_MAX_ENTRIES = _get_int("SESSION_MAX_ENTRIES", 1000)
+# Cap on the approximate memory held by all sessions together.
+SESSION_MAX_MEMORY_MB = _get_int("SESSION_MAX_MEMORY_MB", 128)
+# Most recent Q&A turns included in follow-up prompts.
+SESSION_MAX_HISTORY_TURNS = _get_int("SESSION_MAX_HISTORY_TURNS", 6)
+
+# --- HTML EXTRACTION ---
+# "lxml" extracts chapter text directly from the lxml tree; "bs4" uses the
+# original BeautifulSoup path. Both produce identical text.
+SCRAPER_PARSER = os.getenv("SCRAPER_PARSER", "lxml")
+# Pages at least this large (in characters) are parsed in a worker thread.
+SCRAPER_PARSE_IN_THREAD_MIN_CHARS = _get_int("SCRAPER_PARSE_IN_THREAD_MIN_CHARS", 50_000)
+
+# --- FULL-TEXT SEARCH ---
+# Build the search index at startup when the corpus snapshot covers every
+# chapter; otherwise (or when disabled) the first search builds it.
+SEARCH_INDEX_AT_STARTUP = _get_bool("SEARCH_INDEX_AT_STARTUP", True)
+# Approximate length of the highlighted snippet returned with each result.
+SEARCH_SNIPPET_CHARS = _get_int("SEARCH_SNIPPET_CHARS", 240)
+# An index missing chapters that failed to fetch is rebuilt by the next search
+# after this many seconds, so the missing chapters are retried.
+SEARCH_INDEX_RETRY_SECONDS = _get_float("SEARCH_INDEX_RETRY_SECONDS", 30)
+# After this many seconds the next search re-checks the chapter texts and
+# re-indexes if any changed, so results follow what `/analyze` serves.
+SEARCH_INDEX_TTL_SECONDS = _get_float("SEARCH_INDEX_TTL_SECONDS", 10 * 60)
+
+# --- FOLLOW-UP ANSWER CACHE ---
+# Answers to follow-up questions are reused, per chapter text, for later
+# questions that normalize to the same words or are near-duplicates of them.
+FOLLOW_UP_CACHE_ENABLED = _get_bool("FOLLOW_UP_CACHE_ENABLED", True)
+FOLLOW_UP_CACHE_MAX_ENTRIES = _get_int("FOLLOW_UP_CACHE_MAX_ENTRIES", 2000)
+FOLLOW_UP_CACHE_TTL_SECONDS = _get_float("FOLLOW_UP_CACHE_TTL_SECONDS", 24 * 60 * 60)
+# Minimum Jaccard similarity (0-1) of two questions' character shingles to share an answer.
+FOLLOW_UP_CACHE_SIMILARITY_THRESHOLD = _get_float("FOLLOW_UP_CACHE_SIMILARITY_THRESHOLD", 0.8)
+
+# --- RECORD/REPLAY CASSETTES ---
+# Records scraper HTTP responses and model responses to CASSETTE_DIR, or replays
+# them, so tests, evals and benchmarks can run offline and deterministically.
+# "off", "record" (always call live), "replay" (never call live) or "auto"
+# (replay what was recorded, record the rest).
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", os.path.join("tests", "cassettes"))
+# "zero" replays instantly; "original" waits as long as the recorded call took.
+CASSETTE_LATENCY = os.getenv("CASSETTE_LATENCY", "zero")
+
+# --- MODEL OUTPUT REPAIR ---
+# Responses that are not valid JSON for their schema are first extracted and
+# repaired locally; only when that fails is a model asked, once, to fix the JSON.
+JSON_FIX_ENABLED = _get_bool("JSON_FIX_ENABLED", True)
+# Model for the fix call; empty means the (fast) follow-up model.
+JSON_FIX_MODEL = os.getenv("JSON_FIX_MODEL", "")
+
+# --- LOGGING AND TRACING ---
+# Level of the structured JSON logs written by the `app.*` modules.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Adds a Server-Timing header with the time spent in each stage to every response.
+SERVER_TIMING_ENABLED = _get_bool("SERVER_TIMING_ENABLED", True)
+
+# --- HTTP CACHING ---
+# Cache-Control lifetimes, in seconds, for `GET /api/analyze` (max-age for
+# browsers, s-maxage for shared caches such as a CDN in front of Cloud Run).
+# Clients revalidate with If-None-Match afterwards, which costs no model call.
+ANALYSIS_HTTP_MAX_AGE = _get_int("ANALYSIS_HTTP_MAX_AGE", 300)
+ANALYSIS_HTTP_SHARED_MAX_AGE = _get_int("ANALYSIS_HTTP_SHARED_MAX_AGE", 24 * 60 * 60)
+# The same for `GET /api/chapters`, which only changes with a deploy.
+CHAPTERS_HTTP_MAX_AGE = _get_int("CHAPTERS_HTTP_MAX_AGE", 60 * 60)
+CHAPTERS_HTTP_SHARED_MAX_AGE = _get_int("CHAPTERS_HTTP_SHARED_MAX_AGE", 24 * 60 * 60)
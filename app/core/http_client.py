@@ -0,0 +1,39 @@
+# app/core/http_client.py
+
+import importlib.util
+import logging
+import httpx
+
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Builds the pooled, keep-alive HTTP client used for outbound requests.
+
+    Pool limits, keep-alive expiry, per-phase timeouts and HTTP/2 are all
+    driven by settings in `app.core.config`. HTTP/2 is only enabled when the
+    optional `h2` package is installed.
+    """
+    http2 = config.HTTP2_ENABLED
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed; falling back to HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(
+            connect=config.HTTP_CONNECT_TIMEOUT_SECONDS,
+            read=config.HTTP_READ_TIMEOUT_SECONDS,
+            write=config.HTTP_WRITE_TIMEOUT_SECONDS,
+            pool=config.HTTP_POOL_TIMEOUT_SECONDS,
+        ),
+        http2=http2,
+        follow_redirects=True,
+    )
@@ -0,0 +1,85 @@
+# app/core/logging_config.py
+"""
+Structured, non-blocking logging for the `app.*` loggers.
+
+Records are formatted as one JSON object per line (with `severity` and
+`message`, which Cloud Logging picks up, plus the request id and any `extra`
+fields) on the calling thread, then handed to a queue. A listener thread does
+the actual write to stdout, so a slow or blocked stdout never stalls the
+event loop.
+"""
+
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO
+
+from app.core import config
+from app.core.tracing import current_request_id
+
+# Attributes every LogRecord has; anything else on a record came from `extra`.
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[QueueHandler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single-line JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = current_request_id()
+        if request_id is not None:
+            entry["request_id"] = request_id
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(stream: Optional[TextIO] = None) -> None:
+    """
+    Routes the `app` loggers through a queue to `stream` (stdout by default).
+    Does nothing if logging is already configured.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _handler = QueueHandler(records)
+    # Format on the calling thread, where the request's context is still current.
+    _handler.setFormatter(JsonFormatter())
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(logging.Formatter("%(message)s"))
+    _listener = QueueListener(records, output)
+    _listener.start()
+
+    logger = logging.getLogger("app")
+    logger.addHandler(_handler)
+    logger.setLevel(config.LOG_LEVEL)
+    logger.propagate = False
+
+
+def shutdown_logging() -> None:
+    """Writes out any queued records and detaches the queue handler."""
+    global _listener, _handler
+    if _listener is None:
+        return
+    _listener.stop()
+    logger = logging.getLogger("app")
+    logger.removeHandler(_handler)
+    logger.propagate = True
+    _listener = _handler = None
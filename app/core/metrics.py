@@ -0,0 +1,240 @@
+# app/core/metrics.py
+"""
+In-process metrics with a Prometheus text exposition.
+
+Counters, gauges and histograms keep plain floats per label combination, so
+recording a value is a dictionary lookup plus an addition, with no locks or
+I/O on the hot path. Values that other modules already count (cache hits,
+admission queues) are not recorded twice: collectors read them when
+`/metrics` is scraped.
+"""
+
+import bisect
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Seconds; spans sub-millisecond parses up to multi-minute model calls.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    @property
+    def family_name(self) -> str:
+        """The name in the HELP and TYPE lines (counters carry their _total suffix)."""
+        return self.name + "_total" if self.kind == "counter" else self.name
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, e.g. calls or tokens."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield self.name + "_total", dict(zip(self.labelnames, key)), value
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, e.g. in-flight requests."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class Histogram(_Metric):
+    """Counts observations (e.g. latencies in seconds) into cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: [count per bucket (last is +Inf)..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [0] * (len(self.buckets) + 3)
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observes the wall-clock duration of the block, whether or not it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return int(state[-1]) if state else 0
+
+    def samples(self) -> Iterable[Sample]:
+        for key, state in self._values.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state):
+                cumulative += count
+                yield self.name + "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield self.name + "_sum", labels, state[-2]
+            yield self.name + "_count", labels, state[-1]
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class Registry:
+    """Holds metrics and scrape-time collectors, and renders them as Prometheus text."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[_Metric, Iterable[Sample]]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collect: Callable[[], Iterable[Tuple[_Metric, Iterable[Sample]]]]) -> None:
+        """Adds a function called at scrape time that yields (metric, samples) pairs."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        families = [(metric, metric.samples()) for metric in self._metrics.values()]
+        for collect in self._collectors:
+            families.extend(collect())
+
+        lines = []
+        for metric, samples in families:
+            lines.append(f"# HELP {metric.family_name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.family_name} {metric.kind}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Resets every recorded value (collectors keep reading their sources)."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+REGISTRY = Registry()
+
+# --- APPLICATION METRICS ---
+# Where a request spends its time: fetch, parse, retrieval, prompt, model, decode.
+STAGE_SECONDS = REGISTRY.histogram(
+    "analyzer_stage_duration_seconds", "Time spent in each stage of handling a request.", ["stage"]
+)
+MODEL_SECONDS = REGISTRY.histogram(
+    "analyzer_model_call_duration_seconds", "Duration of model calls, per model and outcome.", ["model", "outcome"]
+)
+MODEL_TOKENS = REGISTRY.counter(
+    "analyzer_model_tokens", "Tokens reported by the model provider's usage metadata.", ["model", "kind"]
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "analyzer_upstream_errors", "Failed calls to gov.za or the model provider, by error class.", ["upstream", "error"]
+)
+JSON_RECOVERIES = REGISTRY.counter(
+    "analyzer_json_recoveries",
+    "Model responses that were not valid JSON as-is, by how they were recovered (or failed).",
+    ["method"],
+)
+
+
+def record_model_call(model: str, outcome: str, seconds: float, prompt_tokens=None, response_tokens=None) -> None:
+    """Records one model call: its duration, its token usage and, if it failed, its error class."""
+    MODEL_SECONDS.observe(seconds, model=model, outcome=outcome)
+    if prompt_tokens:
+        MODEL_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+    if response_tokens:
+        MODEL_TOKENS.inc(response_tokens, model=model, kind="response")
+    if outcome not in ("ok", "cancelled"):
+        UPSTREAM_ERRORS.inc(upstream="model", error=outcome)
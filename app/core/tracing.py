@@ -0,0 +1,170 @@
+# app/core/tracing.py
+"""
+Request-scoped tracing.
+
+`TracingMiddleware` opens a `Trace` for each HTTP request in a context
+variable. Context variables are copied into every task a request spawns, so
+endpoints, `ai_service` and the scraper all record their spans into the same
+trace without passing it around. When the response starts, the spans are
+summed per name into a `Server-Timing` header, and the request id is stamped
+on every log line written while handling the request.
+"""
+
+import logging
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from app.core import config
+from app.core.metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Incoming request ids are reused only if they are short and plain.
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+@dataclass
+class Span:
+    name: str
+    start: float     # seconds since the trace started
+    duration: float  # seconds
+
+
+class Trace:
+    """The spans recorded while handling one request."""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+
+    def add(self, name: str, started: float, duration: float) -> None:
+        """Records a span that began at perf_counter() `started` and lasted `duration` seconds."""
+        self.spans.append(Span(name, started - self.started, duration))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """
+        The spans as a Server-Timing header value, e.g.
+        `fetch;dur=120.4, model;dur=8410.2;desc="x2", total;dur=8544.0`.
+        Spans with the same name (e.g. concurrent follow-up calls) are summed.
+        """
+        totals: Dict[str, List[float]] = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            total = totals.setdefault(span.name, [0.0, 0])
+            total[0] += span.duration
+            total[1] += 1
+        parts = [
+            f"{name};dur={duration * 1000:.1f}" + (f';desc="x{count}"' if count > 1 else "")
+            for name, (duration, count) in totals.items()
+        ]
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current.get()
+    return trace.request_id if trace is not None else None
+
+
+@contextmanager
+def start_trace(request_id: Optional[str] = None) -> Iterator[Trace]:
+    """Makes a new trace current for the block (and the tasks it starts)."""
+    trace = Trace(request_id or uuid.uuid4().hex)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Records the block's duration as a span of the current trace, if any."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace = _current.get()
+        if trace is not None:
+            trace.add(name, started, time.perf_counter() - started)
+
+
+def record_stage(name: str, started: float, duration: float) -> None:
+    """Records a measured stage both in the stage latency histogram and the current trace."""
+    STAGE_SECONDS.observe(duration, stage=name)
+    trace = _current.get()
+    if trace is not None:
+        trace.add(name, started, duration)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Like `span`, but also observed in the `analyzer_stage_duration_seconds` histogram."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, started, time.perf_counter() - started)
+
+
+def _incoming_request_id(scope) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == b"x-request-id":
+            request_id = value.decode("latin-1")
+            return request_id if _REQUEST_ID.match(request_id) else None
+    return None
+
+
+class TracingMiddleware:
+    """
+    Runs each HTTP request inside its own trace, and adds `X-Request-ID` and
+    (if SERVER_TIMING_ENABLED) `Server-Timing` headers to the response.
+
+    For streamed responses the headers go out before the body, so they only
+    cover the work done before the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = None
+        with start_trace(_incoming_request_id(scope)) as trace:
+            async def send_with_headers(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-request-id", trace.request_id.encode("latin-1")))
+                    if config.SERVER_TIMING_ENABLED:
+                        headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                logger.info(
+                    "%s %s %s", scope["method"], scope["path"], status,
+                    extra={"method": scope["method"], "path": scope["path"], "status": status,
+                           "duration_ms": round(trace.elapsed() * 1000, 1)},
+                )
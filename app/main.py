@@ -1,14 +1,57 @@
 # app/main.py
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import endpoints
+from fastapi.responses import JSONResponse
+from app.api import endpoints, metrics
+from app.core import config
+from app.core.http_client import create_http_client
+from app.core.logging_config import configure_logging, shutdown_logging
+from app.core.tracing import TracingMiddleware
+from app.services import ai_service, llm_backend, scraper_service, search_service, snapshot_service
+from app.services.answer_cache import reset_answer_cache
+from app.services.result_cache import close_result_cache
+from app.utils.cassette import CassetteMissError
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates shared resources at startup and releases them at shutdown.
+    """
+    configure_logging()
+    # Serve the pre-built chapter corpus from memory; only uncovered URLs are scraped live.
+    snapshot_service.load_snapshot(config.CORPUS_SNAPSHOT_PATH)
+
+    # One pooled HTTP client for all scraping, so connections to gov.za are reused.
+    http_client = create_http_client()
+    scraper_service.set_http_client(http_client)
+    # Import the model SDK in the background; the server starts listening meanwhile.
+    warm_up = asyncio.create_task(ai_service.warm_up_models()) if config.LLM_WARMUP_AT_STARTUP else None
+    # Index the whole Constitution up front when the snapshot has every chapter.
+    await search_service.build_index_at_startup()
+    try:
+        yield
+    finally:
+        if warm_up is not None:
+            await warm_up
+        search_service.reset_search_index()
+        scraper_service.set_http_client(None)
+        await http_client.aclose()
+        close_result_cache()
+        reset_answer_cache()
+        await llm_backend.close_backend()
+        shutdown_logging()
+
 
 # Initialize the FastAPI application
 app = FastAPI(
     title="Constitution Analyzer API",
     description="API for providing AI-powered analysis of the South African Constitution.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -23,10 +66,24 @@ app.add_middleware(
     allow_credentials=True,      # Allow cookies (good for future auth)
     allow_methods=["*"],         # Allow all methods (GET, POST, etc.)
     allow_headers=["*"],         # Allow all headers
+    # Let the frontend see whether a response came from cache, and where the time went
+    expose_headers=["X-Cache", "X-Request-ID", "Server-Timing", "ETag"],
 )
+# Outermost, so the trace covers CORS handling and every route
+app.add_middleware(TracingMiddleware)
 
 # Include the router from our endpoints file, prefixing all routes with /api
 app.include_router(endpoints.router, prefix="/api")
+# Prometheus scrapes /metrics at the root, by convention
+app.include_router(metrics.router)
+
+@app.exception_handler(CassetteMissError)
+async def cassette_miss(request: Request, exc: CassetteMissError):
+    """
+    A replay-only run (CASSETTE_MODE=replay) needed a response that was never
+    recorded; say which one instead of failing with a bare 500.
+    """
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
 
 @app.get("/", tags=["Root"])
 async def read_root():
@@ -0,0 +1,136 @@
+from typing import Any, Dict, List, Optional
+
+# Structured form of a cleaned chapter text. Every record keeps the character
+# offsets of its text within the chapter text, so `chapter.text[r.start:r.end]
+# == r.text` for each record, and consumers can map results back to the source.
+
+
+class Item:
+    """A lettered or numbered item within a subsection, e.g. "(a)"."""
+
+    __slots__ = ("label", "text", "start", "end")
+
+    def __init__(self, label: str, text: str, start: int, end: int):
+        self.label = label
+        self.text = text
+        self.start = start
+        self.end = end
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"label": self.label, "text": self.text, "start": self.start, "end": self.end}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Item":
+        return cls(data["label"], data["text"], data["start"], data["end"])
+
+
+class Subsection:
+    """
+    A numbered subsection, e.g. "(1)", with its items. Text in a section that
+    precedes its first numbered subsection forms a subsection labelled None.
+    """
+
+    __slots__ = ("label", "text", "start", "end", "items")
+
+    def __init__(self, label: Optional[str], text: str, start: int, end: int, items: Optional[List[Item]] = None):
+        self.label = label
+        self.text = text
+        self.start = start
+        self.end = end
+        self.items = items or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "text": self.text,
+            "start": self.start,
+            "end": self.end,
+            "items": [item.to_dict() for item in self.items],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Subsection":
+        return cls(data["label"], data["text"], data["start"], data["end"], [Item.from_dict(i) for i in data["items"]])
+
+
+class Section:
+    """
+    A numbered section, e.g. "16. Freedom of expression". Text before a
+    chapter's first numbered heading forms an "Introduction" with number None.
+    """
+
+    __slots__ = ("number", "title", "text", "start", "end", "subsections")
+
+    def __init__(
+        self,
+        number: Optional[str],
+        title: str,
+        text: str,
+        start: int,
+        end: int,
+        subsections: Optional[List[Subsection]] = None,
+    ):
+        self.number = number
+        self.title = title
+        self.text = text
+        self.start = start
+        self.end = end
+        self.subsections = subsections or []
+
+    def to_dict(self, include_text: bool = True) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"number": self.number, "title": self.title, "start": self.start, "end": self.end}
+        if include_text:
+            data["text"] = self.text
+            data["subsections"] = [subsection.to_dict() for subsection in self.subsections]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Section":
+        return cls(
+            data["number"], data["title"], data["text"], data["start"], data["end"],
+            [Subsection.from_dict(s) for s in data["subsections"]],
+        )
+
+
+class ChapterDocument:
+    """A parsed chapter: its full cleaned text plus its sections, addressable by number."""
+
+    __slots__ = ("chapter_id", "title", "url", "text", "sections", "_by_number")
+
+    def __init__(
+        self,
+        text: str,
+        sections: List[Section],
+        chapter_id: Optional[int] = None,
+        title: Optional[str] = None,
+        url: Optional[str] = None,
+    ):
+        self.chapter_id = chapter_id
+        self.title = title
+        self.url = url
+        self.text = text
+        self.sections = sections
+        self._by_number = {section.number: section for section in sections if section.number}
+
+    def section(self, number: str) -> Optional[Section]:
+        """Returns the section numbered `number` (e.g. "16" or "25a"), or None."""
+        return self._by_number.get(number.strip().upper())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "chapter_id": self.chapter_id,
+            "title": self.title,
+            "url": self.url,
+            "text": self.text,
+            "sections": [section.to_dict() for section in self.sections],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChapterDocument":
+        return cls(
+            data["text"],
+            [Section.from_dict(s) for s in data["sections"]],
+            chapter_id=data.get("chapter_id"),
+            title=data.get("title"),
+            url=data.get("url"),
+        )
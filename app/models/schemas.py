@@ -1,4 +1,4 @@
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 from typing import List, Optional
 from enum import Enum
 
@@ -14,12 +14,56 @@ class AnalysisRequest(BaseModel):
     target_audience: Optional[str] = None
     follow_up_questions: List[str] = []
 
+# Upper bound on the number of analyses one batch request may ask for.
+MAX_BATCH_ITEMS = 20
+
+class BatchAnalysisRequest(BaseModel):
+    items: List[AnalysisRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+# Upper bound on the number of questions one follow-up request may ask.
+MAX_FOLLOW_UP_QUESTIONS = 10
+
 class FollowUpRequest(BaseModel):
-    question: str
-    initial_analysis_text: str
-    original_url: HttpUrl
+    # Either a single `question` (answered as {"answer": ...}) or a list of
+    # `questions` answered together in one model call (as {"answers": [...]}).
+    question: Optional[str] = None
+    questions: List[str] = Field(default=[], max_length=MAX_FOLLOW_UP_QUESTIONS)
+    # The session returned by /api/analyze; it replaces the two fields below.
+    session_id: Optional[str] = None
+    initial_analysis_text: Optional[str] = None
+    original_url: Optional[HttpUrl] = None
+
+    @model_validator(mode="after")
+    def _require_a_question_and_context(self):
+        if not self.all_questions():
+            raise ValueError("Provide a 'question' or a non-empty 'questions' list.")
+        if not self.session_id and (self.initial_analysis_text is None or self.original_url is None):
+            raise ValueError("Provide a 'session_id', or both 'initial_analysis_text' and 'original_url'.")
+        return self
+
+    def all_questions(self) -> List[str]:
+        """Every distinct, non-blank question asked, in order."""
+        asked = [self.question or "", *self.questions]
+        return list(dict.fromkeys(q.strip() for q in asked if q.strip()))
 
 class Chapter(BaseModel):
     id: int
     name: str
-    url: HttpUrl
\ No newline at end of file
+    url: HttpUrl
+
+class AnsweredQuestion(BaseModel):
+    question: str
+    answer: str
+
+class AnalysisResponse(BaseModel):
+    analysis: str
+    answered_questions: List[AnsweredQuestion] = []
+
+# The shapes the follow-up prompts ask the model to answer in.
+class FollowUpAnswer(BaseModel):
+    answer: str
+
+class MultiFollowUpAnswers(BaseModel):
+    # Entries are checked one by one when they are matched to the questions,
+    # so one malformed entry does not discard the others.
+    answers: list
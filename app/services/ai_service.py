@@ -1,21 +1,50 @@
-import os
-import google.generativeai as genai
-from google.generativeai.types import generation_types
-from dotenv import load_dotenv
+import asyncio
+import itertools
 import json
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from app.core import config
+from app.core.metrics import JSON_RECOVERIES, record_model_call
+from app.core.tracing import record_stage, span, stage
 
 # Import our Pydantic models and our scraper function
-from app.models.schemas import AnalysisRequest, FollowUpRequest
+from app.models.schemas import (
+    AnalysisRequest, AnalysisResponse, FollowUpAnswer, FollowUpRequest, MultiFollowUpAnswers,
+)
+from app.services.answer_cache import get_answer_cache
+from app.services.llm_backend import get_admission_controller, get_backend, record_usage, warm_up_backend
+from app.services.result_cache import get_result_cache
+from app.services.retrieval_service import expand_section_references, select_relevant_text
 from app.services.scraper_service import fetch_and_parse_url
+from app.services.session_service import get_session_store
+from app.utils.admission import OverloadedError
+from app.utils.canonical import analysis_request_key, document_hash
+from app.utils.cassette import CassetteMissError
+from app.utils.hedging import Hedger
+from app.utils.http_cache import entity_tag, if_none_match
+from app.utils.parsers import iter_json_objects
+from app.utils.singleflight import SingleFlight
+from app.utils.stream_json import IncrementalObjectParser
+
+logger = logging.getLogger(__name__)
+
+# The powerful "Pro" model does the heavy lift; the fast "Flash" model handles quick Q&A.
+ANALYSIS_MODEL = 'models/gemini-2.5-pro'
+FOLLOW_UP_MODEL = 'models/gemini-2.0-flash'
+
+# Bump whenever the analysis prompt or its output format changes, so that HTTP
+# caches holding analyses made with the old prompt revalidate (see `get_cacheable_analysis`).
+PROMPT_VERSION = "1"
+
+# Concurrent, identical analysis requests share one scrape and one model call.
+_inflight_analyses = SingleFlight()
 
-load_dotenv()
-# --- SDK CONFIGURATION ---
-# This configures the client for the entire application using the API key
-# loaded from the .env file (which should be done in main.py).
-try:
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-except KeyError:
-    raise RuntimeError("GOOGLE_API_KEY not found. Please ensure it is set in your .env file and loaded before this module.")
+# Races a backup call against slow analysis calls when hedging is enabled.
+_analysis_hedger: Optional[Hedger] = None
 
 # --- PRIVATE HELPER FUNCTIONS (Prompt Construction) ---
 
@@ -98,10 +127,36 @@ def _construct_initial_prompt(request: AnalysisRequest, document_text: str) -> s
     return "\n".join(prompt_parts)
 
 
-def _construct_follow_up_prompt(request: FollowUpRequest, full_document_text: str) -> str:
+def _history_block(history: Sequence[Tuple[str, str]]) -> str:
+    """Renders earlier follow-up turns of a session, or nothing when there are none."""
+    if not history:
+        return ""
+    turns = "\n".join(
+        f"    <turn>\n      <question>{q}</question>\n      <answer>{a}</answer>\n    </turn>" for q, a in history
+    )
+    return f"\n  <conversation_history>\n{turns}\n  </conversation_history>\n"
+
+
+def _construct_follow_up_prompt(
+    request: FollowUpRequest,
+    full_document_text: str,
+    is_excerpt: bool = False,
+    question: Optional[str] = None,
+    history: Sequence[Tuple[str, str]] = (),
+) -> str:
     """
     Constructs the prompt for follow-up questions using the "Dual Context" strategy.
+
+    When `is_excerpt` is True, `full_document_text` holds only the sections
+    retrieved as relevant to the question, and the instructions say so.
+    `question` defaults to the request's own single question; `history` holds
+    the session's earlier questions and answers, which are part of the context.
     """
+    if is_excerpt:
+        source_description = "These are the sections of the authoritative source text most relevant to the question, separated by [...]. They are the ultimate source of truth."
+    else:
+        source_description = "This is the complete, authoritative source text. This is the ultimate source of truth."
+
     return f"""
 <prompt>
   <system_instructions>
@@ -109,7 +164,7 @@ def _construct_follow_up_prompt(request: FollowUpRequest, full_document_text: st
     Your primary goal is to answer the user's question based on the two sources of information provided.
 
     <sources>
-      1.  `<original_document_text>`: This is the complete, authoritative source text. This is the ultimate source of truth.
+      1.  `<original_document_text>`: {source_description}
       2.  `<conversation_context>`: This is the initial analysis that has already been provided to the user.
     </sources>
 
@@ -131,9 +186,9 @@ def _construct_follow_up_prompt(request: FollowUpRequest, full_document_text: st
   <conversation_context>
   {request.initial_analysis_text}
   </conversation_context>
-
+{_history_block(history)}
   <user_question>
-  {request.question}
+  {question or request.question}
   </user_question>
 
   <output_format>
@@ -145,70 +200,704 @@ def _construct_follow_up_prompt(request: FollowUpRequest, full_document_text: st
 """
 
 
+def _construct_multi_follow_up_prompt(
+    request: FollowUpRequest,
+    questions: List[str],
+    full_document_text: str,
+    is_excerpt: bool = False,
+    history: Sequence[Tuple[str, str]] = (),
+) -> str:
+    """
+    Constructs one "Dual Context" prompt that answers several follow-up
+    questions at once, so the document and analysis are sent only once.
+    Each answer is tagged with its question's id so it can be mapped back.
+    """
+    if is_excerpt:
+        source_description = "These are the sections of the authoritative source text most relevant to the questions, separated by [...]. They are the ultimate source of truth."
+    else:
+        source_description = "This is the complete, authoritative source text. This is the ultimate source of truth."
+
+    questions_xml = "\n".join(f'  <question id="{i}">{q}</question>' for i, q in enumerate(questions, start=1))
+
+    return f"""
+<prompt>
+  <system_instructions>
+    You are an AI assistant in a follow-up Q&A session.
+    Your primary goal is to answer EACH of the user's questions based on the two sources of information provided.
+
+    <sources>
+      1.  `<original_document_text>`: {source_description}
+      2.  `<conversation_context>`: This is the initial analysis that has already been provided to the user.
+    </sources>
+
+    <reasoning_steps>
+      1.  For each question, first check if the `<conversation_context>` contains a sufficient answer.
+      2.  If it does not, you MUST then search the `<original_document_text>` for the specific information needed.
+      3.  Formulate a concise answer to that question based on the information you find.
+    </reasoning_steps>
+
+    <style_guide>
+      - Answer every question, each in its own entry, using the question's id.
+      - If an answer cannot be found in EITHER source, you MUST respond with the exact phrase: "The provided text does not contain a direct answer to this question."
+    </style_guide>
+  </system_instructions>
+
+  <original_document_text>
+  {full_document_text}
+  </original_document_text>
+
+  <conversation_context>
+  {request.initial_analysis_text}
+  </conversation_context>
+{_history_block(history)}
+  <user_questions>
+{questions_xml}
+  </user_questions>
+
+  <output_format>
+  {{
+    "answers": [
+      {{ "id": 1, "answer": "Your concise, fact-based answer to question 1 goes here." }}
+    ]
+  }}
+  </output_format>
+</prompt>
+"""
+
+
 # --- PUBLIC SERVICE FUNCTIONS ---
 
 async def generate_initial_analysis(request: AnalysisRequest) -> str:
     """
     Orchestrates the initial analysis: scrapes URL, constructs prompt, calls Gemini.
     """
-    print("--- Starting initial analysis generation ---")
-    # 1. Scrape the content from the URL
+    parsed_response, _ = await generate_initial_analysis_with_status(request)
+    return parsed_response
+
+
+async def generate_initial_analysis_with_status(request: AnalysisRequest) -> Tuple[dict, str]:
+    """
+    Like `generate_initial_analysis`, but also reports whether the result
+    came from the result cache ("HIT") or from a fresh generation ("MISS").
+
+    Results are cached per canonical request and document hash, so a change
+    in the chapter text automatically invalidates them. Concurrent callers
+    whose requests share a canonical form are coalesced onto a single
+    in-flight generation and receive the same result.
+    """
+    # 1. Scrape the content from the URL (served from the snapshot or cache when possible)
     document_text = await fetch_and_parse_url(str(request.chapter_url))
-    
+    return await _analyze_document(request, document_text)
+
+
+async def start_analysis_session(request: AnalysisRequest) -> Tuple[dict, str]:
+    """
+    Like `generate_initial_analysis_with_status`, but also opens a
+    conversation session for the analysis and adds its `session_id` to the
+    returned result, so follow-ups need not resend the analysis or re-scrape.
+    """
+    document_text = await fetch_and_parse_url(str(request.chapter_url))
+    parsed_response, cache_status = await _analyze_document(request, document_text)
+    session = _open_session(request, document_text, parsed_response)
+    # The cached/coalesced result is shared, so the session id goes on a copy.
+    return {**parsed_response, "session_id": session.session_id}, cache_status
+
+
+async def get_cacheable_analysis(
+    request: AnalysisRequest, if_none_match_header: Optional[str] = None,
+) -> Tuple[Optional[dict], Optional[str], str]:
+    """
+    Like `generate_initial_analysis_with_status`, for HTTP caching: returns
+    `(result, cache_status, etag)`, where the strong ETag is derived from the
+    canonical request, PROMPT_VERSION and the hash of the very chapter text
+    the analysis is served for. The chapter is fetched once, so the ETag
+    always describes the returned body.
+
+    If `if_none_match_header` matches the ETag, the client's copy is current:
+    `result` and `cache_status` are None, and no analysis is looked up or
+    generated.
+    """
+    document_text = await fetch_and_parse_url(str(request.chapter_url))
+    doc_hash = document_hash(document_text)
+    etag = entity_tag(analysis_request_key(request), doc_hash, PROMPT_VERSION)
+    if if_none_match(if_none_match_header, etag):
+        return None, None, etag
+    parsed_response, cache_status = await _analyze_document(request, document_text, doc_hash)
+    return parsed_response, cache_status, etag
+
+
+def _open_session(request: AnalysisRequest, document_text: str, parsed_response: dict):
+    return get_session_store().create(str(request.chapter_url), document_text, parsed_response.get("analysis", ""))
+
+
+async def _analyze_document(
+    request: AnalysisRequest, document_text: str, doc_hash: Optional[str] = None,
+) -> Tuple[dict, str]:
+    """Serves an analysis of already-scraped text from the cache, or generates it."""
+    request_key = analysis_request_key(request)
+    doc_hash = doc_hash or document_hash(document_text)
+
+    cache = get_result_cache()
+    if cache is not None:
+        with span("cache"):
+            cached_response = await cache.get(request_key, doc_hash)
+        if cached_response is not None:
+            logger.info("Initial analysis served from cache")
+            return cached_response, "HIT"
+
+    async def generate_and_store() -> dict:
+        parsed_response = await _generate_initial_analysis(request, document_text)
+        if cache is not None:
+            await cache.set(request_key, doc_hash, parsed_response)
+        return parsed_response
+
+    parsed_response = await _inflight_analyses.do((request_key, doc_hash), generate_and_store)
+    return parsed_response, "MISS"
+
+
+async def generate_batch_analyses(
+    requests: List[AnalysisRequest], max_concurrency: Optional[int] = None
+) -> AsyncIterator[Tuple[int, Union[Tuple[dict, str], Exception]]]:
+    """
+    Analyzes several requests concurrently, yielding `(index, outcome)` pairs
+    in completion order. The outcome is the `(result, cache_status)` pair of
+    `generate_initial_analysis_with_status`, or the exception that item
+    raised; one failing item never affects the others.
+
+    Each distinct chapter URL is scraped once and shared by every item that
+    needs it, and at most `max_concurrency` generations run at a time.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or config.BATCH_MAX_CONCURRENCY)
+    scrapes: Dict[str, asyncio.Task] = {}
+    for request in requests:
+        url = str(request.chapter_url)
+        if url not in scrapes:
+            scrapes[url] = asyncio.ensure_future(fetch_and_parse_url(url))
+
+    async def run(index: int, request: AnalysisRequest):
+        try:
+            # Shielded, because the scrape is shared with other items.
+            document_text = await asyncio.shield(scrapes[str(request.chapter_url)])
+            async with semaphore:
+                return index, await _analyze_document(request, document_text)
+        except Exception as e:
+            return index, e
+
+    tasks = [asyncio.ensure_future(run(index, request)) for index, request in enumerate(requests)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in [*tasks, *scrapes.values()]:
+            if not task.done():
+                task.cancel()
+        # Retrieve scrape errors, which each item already received, so none go unobserved.
+        for scrape in scrapes.values():
+            if scrape.done() and not scrape.cancelled():
+                scrape.exception()
+
+
+async def _generate_json(
+    model: str, prompt: str, schema: Type[BaseModel], fix: bool = True, admitted: Optional[asyncio.Event] = None,
+) -> dict:
+    """
+    Makes one admitted model call and returns its response as JSON validated
+    against `schema`. `admitted`, if given, is set once the call holds its
+    admission slot.
+
+    A response that is not valid as-is (prose around it, trailing commas,
+    truncation...) is extracted and repaired locally, which is far cheaper
+    than generating it again. Only if that fails, and `fix` is set, is the
+    fast model asked once to correct the JSON.
+    """
+    async with get_admission_controller(model).slot():
+        if admitted is not None:
+            admitted.set()
+        started = time.perf_counter()
+        try:
+            response = await get_backend().generate(model, prompt)
+        except OverloadedError:
+            record_model_call(model, "rate_limited", time.perf_counter() - started)
+            raise
+        except Exception:
+            record_model_call(model, "error", time.perf_counter() - started)
+            raise
+        elapsed = time.perf_counter() - started
+    record_stage("model", started, elapsed)
+    record_usage(response)
+
+    if response.blocked_reason:
+        record_model_call(model, "blocked", elapsed, response.prompt_tokens, response.response_tokens)
+        raise ValueError(f"Response was blocked for safety reasons: {response.blocked_reason}")
+
+    with stage("decode"):
+        parsed, method = _decode_json(response.text, schema)
+    record_model_call(
+        model, "ok" if method == "strict" else "invalid_json", elapsed, response.prompt_tokens, response.response_tokens
+    )
+    if parsed is not None:
+        if method != "strict":
+            JSON_RECOVERIES.inc(method=method)
+            logger.warning("Recovered malformed JSON from the model", extra={"model": model, "method": method})
+        return parsed
+
+    if fix and config.JSON_FIX_ENABLED:
+        return await _fix_json(response.text, schema)
+    JSON_RECOVERIES.inc(method="failed")
+    raise ValueError(f"The model response is not valid JSON for {schema.__name__}.")
+
+
+def _decode_json(text: str, schema: Type[BaseModel]) -> Tuple[Optional[dict], str]:
+    """
+    Returns the first object in `text` that validates against `schema`, and
+    how it was found: "strict", "extracted", "repaired", or (None) "failed".
+    """
+    candidates = iter_json_objects(text)
+    try:
+        candidates = itertools.chain([(json.loads(text), "strict")], candidates)
+    except ValueError:
+        pass
+    for value, method in candidates:
+        try:
+            return schema.model_validate(value).model_dump(exclude_none=True), method
+        except ValueError:
+            continue
+    return None, "failed"
+
+
+def _construct_json_fix_prompt(broken_text: str, schema: Type[BaseModel]) -> str:
+    return f"""
+<prompt>
+  <system_instructions>
+    The text in `<broken_json>` was meant to be one JSON object matching `<json_schema>`, but it is not valid.
+    Return ONLY the corrected JSON object. Keep its content exactly as written: do not add, remove, summarize or rephrase anything.
+  </system_instructions>
+
+  <json_schema>
+  {json.dumps(schema.model_json_schema(), separators=(",", ":"))}
+  </json_schema>
+
+  <broken_json>
+  {broken_text}
+  </broken_json>
+</prompt>
+"""
+
+
+async def _fix_json(broken_text: str, schema: Type[BaseModel]) -> dict:
+    """Asks the fast model, once, to correct a response that could not be repaired locally."""
+    model = config.JSON_FIX_MODEL or FOLLOW_UP_MODEL
+    logger.warning("Model response is not valid JSON; asking for a fix", extra={"model": model, "chars": len(broken_text)})
+    try:
+        parsed = await _generate_json(model, _construct_json_fix_prompt(broken_text, schema), schema, fix=False)
+    except OverloadedError:
+        raise
+    except Exception:
+        JSON_RECOVERIES.inc(method="failed")
+        raise
+    JSON_RECOVERIES.inc(method="model_fix")
+    return parsed
+
+
+def _get_analysis_hedger() -> Hedger:
+    """Returns the analysis hedger, creating it from config on first use."""
+    global _analysis_hedger
+    if _analysis_hedger is None:
+        _analysis_hedger = Hedger(
+            percentile=config.ANALYSIS_HEDGE_PERCENTILE,
+            default_delay=config.ANALYSIS_HEDGE_DEFAULT_DELAY_SECONDS,
+            min_samples=config.ANALYSIS_HEDGE_MIN_SAMPLES,
+            window=config.ANALYSIS_HEDGE_WINDOW,
+            budget_fraction=config.ANALYSIS_HEDGE_BUDGET_FRACTION,
+        )
+    return _analysis_hedger
+
+
+async def _generate_initial_analysis(request: AnalysisRequest, document_text: str) -> dict:
+    """
+    Runs one uncached, uncoalesced initial analysis over the given document text.
+    """
+    logger.info("Starting initial analysis generation")
     # 2. Construct the dynamic, robust prompt
-    prompt = _construct_initial_prompt(request, document_text)
+    with stage("prompt"):
+        prompt = _construct_initial_prompt(request, document_text)
     
     # 3. Call the AI model (using the powerful "Pro" model for the heavy lift)
-    print("Prompt constructed. Calling Gemini 2.5 Pro...")
-
-    json_generation_config = genai.GenerationConfig(response_mime_type="application/json")
+    logger.info("Prompt constructed; calling model", extra={"model": ANALYSIS_MODEL, "prompt_chars": len(prompt)})
 
-    model = genai.GenerativeModel('models/gemini-2.5-pro')
-    
     try:
-        response = await model.generate_content_async(prompt, generation_config=json_generation_config)
-        
-        if not response.parts:
-            block_reason = response.prompt_feedback.block_reason.name if response.prompt_feedback else "Unknown"
-            raise ValueError(f"Response was blocked for safety reasons: {block_reason}")
-        
-        parsed_response = json.loads(response.text)
+        if config.ANALYSIS_HEDGING_ENABLED:
+            hedge_model = config.ANALYSIS_HEDGE_MODEL or ANALYSIS_MODEL
+            admitted = asyncio.Event()
+            controllers = {get_admission_controller(ANALYSIS_MODEL), get_admission_controller(hedge_model)}
+            # Hedge only on a slow model, never on queueing, and never while shedding load.
+            parsed_response = await _get_analysis_hedger().run(
+                lambda: _generate_json(ANALYSIS_MODEL, prompt, AnalysisResponse, admitted=admitted),
+                lambda: _generate_json(hedge_model, prompt, AnalysisResponse),
+                admitted=admitted,
+                overloaded=lambda: any(controller.saturated for controller in controllers),
+            )
+        else:
+            parsed_response = await _generate_json(ANALYSIS_MODEL, prompt, AnalysisResponse)
         
-        print("--- Initial analysis successful ---")
+        logger.info("Initial analysis successful")
         return parsed_response
+    except OverloadedError:
+        # Surfaced as-is so the API can answer 503 with a Retry-After hint.
+        raise
+    except CassetteMissError:
+        # A replay-only run must report the unrecorded call, not a model failure.
+        raise
     except Exception as e:
-        print(f"ERROR: An exception occurred during the Gemini API call: {e}")
+        logger.error("An exception occurred during the model call: %s", e, extra={"model": ANALYSIS_MODEL})
         raise RuntimeError("Failed to get a valid response from the AI service.")
 
 
-async def generate_follow_up_answer(request: FollowUpRequest) -> str:
+def _result_events(parsed_response: dict) -> list:
+    """Expands a complete analysis into the same events a live stream would produce."""
+    events = [{"event": "analysis", "text": parsed_response.get("analysis", "")}]
+    for index, item in enumerate(parsed_response.get("answered_questions", [])):
+        events.append({"event": "answered_question", "index": index, **item})
+    return events
+
+
+async def stream_initial_analysis(request: AnalysisRequest) -> AsyncIterator[dict]:
+    """
+    Streams the initial analysis as a sequence of events, so clients can render
+    text as soon as the model produces it instead of waiting for the full response.
+
+    Yields, in order:
+        {"event": "analysis_delta", "text": ...}     newly generated analysis text
+        {"event": "analysis", "text": ...}           the complete analysis text
+        {"event": "answered_question", "index": i, "question": ..., "answer": ...}
+        {"event": "complete", "result": {...}, "cache": "HIT" | "MISS", "session_id": ...}
+
+    Cached results are replayed immediately without the delta events.
+    """
+    document_text = await fetch_and_parse_url(str(request.chapter_url))
+    request_key = analysis_request_key(request)
+    doc_hash = document_hash(document_text)
+
+    cache = get_result_cache()
+    if cache is not None:
+        with span("cache"):
+            cached_response = await cache.get(request_key, doc_hash)
+        if cached_response is not None:
+            for event in _result_events(cached_response):
+                yield event
+            session = _open_session(request, document_text, cached_response)
+            yield {"event": "complete", "result": cached_response, "cache": "HIT", "session_id": session.session_id}
+            return
+
+    with stage("prompt"):
+        prompt = _construct_initial_prompt(request, document_text)
+    logger.info("Prompt constructed; streaming from model", extra={"model": ANALYSIS_MODEL, "prompt_chars": len(prompt)})
+
+    parser = IncrementalObjectParser(stream_keys=["analysis"])
+    received: List[str] = []
+    result = None
+    usage = None
+
+    try:
+        # The slot is held for the whole stream, since the model is busy until it ends.
+        async with get_admission_controller(ANALYSIS_MODEL).slot():
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                async for chunk in get_backend().stream(ANALYSIS_MODEL, prompt):
+                    if chunk.blocked_reason:
+                        outcome = "blocked"
+                        raise ValueError(f"Response was blocked for safety reasons: {chunk.blocked_reason}")
+                    if chunk.prompt_tokens is not None or chunk.response_tokens is not None:
+                        # Usage is cumulative across chunks; only the last report counts.
+                        usage = chunk
+
+                    received.append(chunk.text)
+                    for event in parser.feed(chunk.text):
+                        kind, key = event[0], event[1]
+                        if kind == "string_delta":
+                            yield {"event": "analysis_delta", "text": event[2]}
+                        elif kind == "field" and key == "analysis":
+                            yield {"event": "analysis", "text": event[2]}
+                        elif kind == "item" and key == "answered_questions":
+                            yield {"event": "answered_question", "index": event[2], **event[3]}
+                        elif kind == "end":
+                            result = event[1]
+                outcome = "ok" if result is not None else "invalid_json"
+            except OverloadedError:
+                outcome = "rate_limited"
+                raise
+            except (asyncio.CancelledError, GeneratorExit):
+                # The client went away mid-stream; not the model's fault.
+                outcome = "cancelled"
+                raise
+            finally:
+                # Includes time the client took to read each event, as the slot is held throughout.
+                elapsed = time.perf_counter() - started
+                record_model_call(
+                    ANALYSIS_MODEL, outcome, elapsed,
+                    usage.prompt_tokens if usage else None, usage.response_tokens if usage else None,
+                )
+        record_stage("model", started, elapsed)
+        if usage is not None:
+            record_usage(usage)
+
+        try:
+            if result is None:
+                raise ValueError("The response stream ended before a complete JSON object was received.")
+            # Validate the assembled object against the same shape the non-streaming endpoint returns.
+            parsed_response = AnalysisResponse.model_validate(result).model_dump()
+        except ValueError:
+            # Salvage a truncated or malformed stream locally; the complete event carries the result.
+            parsed_response, method = _decode_json("".join(received), AnalysisResponse)
+            if parsed_response is None:
+                raise
+            JSON_RECOVERIES.inc(method=method)
+    except OverloadedError:
+        raise
+    except CassetteMissError:
+        # A replay-only run must report the unrecorded call, not a model failure.
+        raise
+    except Exception as e:
+        logger.error("An exception occurred during the streaming model call: %s", e, extra={"model": ANALYSIS_MODEL})
+        raise RuntimeError("Failed to get a valid response from the AI service.")
+
+    if cache is not None:
+        await cache.set(request_key, doc_hash, parsed_response)
+
+    logger.info("Streamed initial analysis successful")
+    session = _open_session(request, document_text, parsed_response)
+    yield {"event": "complete", "result": parsed_response, "cache": "MISS", "session_id": session.session_id}
+
+
+async def generate_follow_up_answer(request: FollowUpRequest) -> dict:
     """
     Orchestrates the follow-up: re-scrapes URL, constructs dual-context prompt, calls Gemini.
+
+    A single `question` is answered as {"answer": ...}. A `questions` list is
+    answered in one model call as {"answers": [{"question", "answer"}, ...]},
+    in the order asked; any question the model skips is retried on its own.
+    A question whose retry fails gets `"answer": None` and an `"error"`,
+    alongside the other answers; only if no question was answered does
+    the request fail.
+
+    With a `session_id`, the chapter text and analysis come from the session
+    (raising SessionNotFoundError if it has expired), the session's recent
+    Q&A is included in the prompt, and the new answers are added to it.
+
+    Questions outside a conversation are first looked up in the follow-up
+    answer cache, which also matches rewordings of questions already
+    answered for the same chapter text; only the rest reach the model.
     """
-    print("--- Starting follow-up answer generation ---")
-    # 1. Re-scrape the original URL to get the full source of truth
-    full_document_text = await fetch_and_parse_url(str(request.original_url))
-    
-    json_generation_config = genai.GenerationConfig(response_mime_type="application/json")
+    logger.info("Starting follow-up answer generation")
+    session = None
+    history: List[Tuple[str, str]] = []
+    if request.session_id:
+        # The session already holds the source of truth, so there is nothing to re-scrape.
+        session = get_session_store().get(request.session_id)
+        request = request.model_copy(update={
+            "initial_analysis_text": session.analysis_text,
+            "original_url": session.document_url,
+        })
+        full_document_text = session.document_text
+        history = session.recent_history(config.SESSION_MAX_HISTORY_TURNS)
+    else:
+        # 1. Re-scrape the original URL to get the full source of truth
+        full_document_text = await fetch_and_parse_url(str(request.original_url))
+
+    questions = request.all_questions()
+    cached = _cached_answers(full_document_text, questions, history)
+    if not request.questions:
+        if questions[0] in cached:
+            parsed_response = {"answer": cached[questions[0]]}
+        else:
+            parsed_response = await _answer_follow_up(request, questions[0], full_document_text, history)
+            _store_answers(full_document_text, {questions[0]: parsed_response.get("answer")}, history)
+        if session is not None:
+            get_session_store().add_turns(session, [(questions[0], parsed_response.get("answer", ""))])
+        return parsed_response
+
+    answers = dict(cached)
+    pending = [q for q in questions if q not in answers]
+    fresh = {}
+    if len(pending) > 1:
+        document_context, is_excerpt = _follow_up_context(full_document_text, " ".join(pending))
+        with stage("prompt"):
+            prompt = _construct_multi_follow_up_prompt(request, pending, document_context, is_excerpt, history)
+        logger.info("Prompt constructed for %d questions; calling model", len(pending), extra={"model": FOLLOW_UP_MODEL})
+        try:
+            fresh = _match_answers(pending, await _call_follow_up_model(prompt, MultiFollowUpAnswers))
+        except OverloadedError:
+            raise
+        except RuntimeError as e:
+            # Fall back to answering each question on its own below.
+            logger.warning("Combined follow-up failed (%s); answering questions individually", e)
+
+    skipped = [q for q in pending if q not in fresh]
+    if skipped and fresh:
+        logger.info("Model skipped %d of %d questions; retrying them individually", len(skipped), len(pending))
+    retried = await asyncio.gather(
+        *[_answer_follow_up(request, q, full_document_text, history) for q in skipped], return_exceptions=True,
+    )
+    errors: Dict[str, BaseException] = {}
+    for question, outcome in zip(skipped, retried):
+        if isinstance(outcome, BaseException):
+            errors[question] = outcome
+        else:
+            fresh[question] = outcome.get("answer", "")
+    _store_answers(full_document_text, fresh, history)
+    answers.update(fresh)
+    if errors:
+        fatal = next((e for e in errors.values() if isinstance(e, CassetteMissError) or not isinstance(e, Exception)), None)
+        if fatal is not None or not answers:
+            # Cancelled, unrecorded, or nothing to show: fail the request as a single question would.
+            raise fatal or next(iter(errors.values()))
+        logger.warning("%d of %d follow-up questions failed; returning the rest", len(errors), len(questions))
+
+    if session is not None:
+        get_session_store().add_turns(session, [(q, answers[q]) for q in questions if q in answers])
+    logger.info("Follow-up answers successful")
+    return {"answers": [
+        {"question": q, "answer": answers[q]} if q in answers else {"question": q, "answer": None, "error": str(errors[q])}
+        for q in questions
+    ]}
+
+
+def _cached_answers(
+    full_document_text: str, questions: List[str], history: Sequence[Tuple[str, str]]
+) -> Dict[str, str]:
+    """
+    Looks each question up in the follow-up answer cache, returning the
+    answers found. Questions asked within a conversation may refer back to
+    it ("what about the second one?"), so those are never answered from
+    the cache.
+    """
+    cache = get_answer_cache()
+    if cache is None or history:
+        return {}
+    doc_hash = document_hash(full_document_text)
+    answers = {}
+    for question in questions:
+        hit = cache.get(doc_hash, expand_section_references(full_document_text, question))
+        if hit is not None:
+            logger.info("Follow-up answer cache hit", extra={"question": question, "cached_question": hit.question, "similarity": hit.similarity})
+            answers[question] = hit.answer
+    return answers
+
+
+def _store_answers(full_document_text: str, answers: Dict[str, Optional[str]], history: Sequence[Tuple[str, str]]) -> None:
+    cache = get_answer_cache()
+    if cache is None or history:
+        return
+    doc_hash = document_hash(full_document_text)
+    for question, answer in answers.items():
+        if isinstance(answer, str) and answer.strip():
+            cache.set(doc_hash, expand_section_references(full_document_text, question), answer)
+
+
+def _follow_up_context(full_document_text: str, query: str) -> Tuple[str, bool]:
+    """Returns the document text to send for `query`, and whether it is an excerpt."""
+    if not config.FOLLOW_UP_RETRIEVAL_ENABLED:
+        return full_document_text, False
+    with stage("retrieval"):
+        retrieval = select_relevant_text(full_document_text, query)
+    if retrieval.is_excerpt:
+        logger.info("Retrieved relevant sections", extra={"sections": retrieval.section_numbers, "estimated_tokens": retrieval.estimated_tokens})
+    return retrieval.text, retrieval.is_excerpt
+
 
-    # 2. Construct the dual-context prompt
-    prompt = _construct_follow_up_prompt(request, full_document_text)
+async def _answer_follow_up(
+    request: FollowUpRequest, question: str, full_document_text: str, history: Sequence[Tuple[str, str]] = ()
+) -> dict:
+    """Answers one question with its own prompt and model call."""
+    # 2. Keep only the sections relevant to the question, then construct the dual-context prompt
+    document_context, is_excerpt = _follow_up_context(full_document_text, question)
+    with stage("prompt"):
+        prompt = _construct_follow_up_prompt(request, document_context, is_excerpt, question=question, history=history)
 
     # 3. Call the AI model (using the fast "Flash" model for quick Q&A)
-    print("Prompt constructed. Calling Gemini 2.0 Flash...")
-    model = genai.GenerativeModel('models/gemini-2.0-flash')
+    logger.info("Prompt constructed; calling model", extra={"model": FOLLOW_UP_MODEL, "prompt_chars": len(prompt)})
+    parsed_response = await _call_follow_up_model(prompt, FollowUpAnswer)
+    logger.info("Follow-up answer successful")
+    return parsed_response
 
+
+async def _call_follow_up_model(prompt: str, schema: Type[BaseModel]) -> dict:
     try:
-        response = await model.generate_content_async(prompt, generation_config=json_generation_config)
+        return await _generate_json(FOLLOW_UP_MODEL, prompt, schema)
+    except OverloadedError:
+        raise
+    except CassetteMissError:
+        # A replay-only run must report the unrecorded call, not a model failure.
+        raise
+    except Exception as e:
+        logger.error("An exception occurred during the model call: %s", e, extra={"model": FOLLOW_UP_MODEL})
+        raise RuntimeError("Failed to get a valid response from the AI service for the follow-up.")
 
-        if not response.parts:
-            block_reason = response.prompt_feedback.block_reason.name if response.prompt_feedback else "Unknown"
-            raise ValueError(f"Response was blocked for safety reasons: {block_reason}")
-        
-        parsed_response = json.loads(response.text)
-            
-        print("--- Follow-up answer successful ---")
-        return parsed_response
+
+def _match_answers(questions: List[str], parsed_response: dict) -> Dict[str, str]:
+    """
+    Maps a combined response back to the questions by id (falling back to
+    the echoed question text), leaving out any question without an answer.
+    """
+    by_text = {q.casefold(): q for q in questions}
+    answers = {}
+    entries = parsed_response.get("answers") if isinstance(parsed_response, dict) else None
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict) or not isinstance(entry.get("answer"), str) or not entry["answer"].strip():
+            continue
+        try:
+            index = int(entry.get("id")) - 1
+        except (TypeError, ValueError):
+            index = -1
+        if 0 <= index < len(questions):
+            question = questions[index]
+        else:
+            question = by_text.get(str(entry.get("question", "")).strip().casefold())
+        if question is not None and question not in answers:
+            answers[question] = entry["answer"]
+    return answers
+
+
+async def warm_up_models() -> None:
+    """
+    Prepares the backend and every model this service calls, off the event
+    loop. A failure is only logged: the first request will then try again.
+    """
+    models = dict.fromkeys(m for m in (ANALYSIS_MODEL, FOLLOW_UP_MODEL, config.ANALYSIS_HEDGE_MODEL, config.JSON_FIX_MODEL) if m)
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(warm_up_backend, list(models))
     except Exception as e:
-        print(f"ERROR: An exception occurred during the Gemini API call: {e}")
-        raise RuntimeError("Failed to get a valid response from the AI service for the follow-up.")
\ No newline at end of file
+        logger.warning("Model warm-up failed: %s", e)
+        return
+    logger.info("Model backend warmed up", extra={"models": list(models), "ms": round((time.perf_counter() - started) * 1000, 1)})
+
+
+def get_inflight_stats() -> dict:
+    """Returns counters for coalesced (single-flight) analysis generations."""
+    return _inflight_analyses.stats()
+
+
+def get_hedging_stats() -> dict:
+    """Returns how often analysis hedges fired and won."""
+    if not config.ANALYSIS_HEDGING_ENABLED:
+        return {"enabled": False}
+    return _get_analysis_hedger().stats()
+
+
+def get_session_stats() -> dict:
+    """Returns occupancy and eviction counters for the conversation session store."""
+    return get_session_store().stats()
+
+
+def get_answer_cache_stats() -> dict:
+    """Returns hit counters and similarity histograms for the follow-up answer cache."""
+    cache = get_answer_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
+def get_result_cache_stats() -> dict:
+    """Returns hit/miss counters for the analysis result cache."""
+    cache = get_result_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
@@ -0,0 +1,180 @@
+import re
+from typing import Any, Dict, FrozenSet, Hashable, NamedTuple, Optional, Tuple
+
+from app.core import config
+from app.utils.bm25 import STOPWORDS
+from app.utils.cache import CacheEntry, LRUCache
+from app.utils.minhash import MinHashLSH, char_shingles, word_shingles
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Words that do not change what a question asks. "not" is kept: it flips the meaning.
+_QUESTION_STOPWORDS = (STOPWORDS - {"not"}) | frozenset(
+    "about according any can could describe does explain i me mean means please say says "
+    "should tell under what would you".split()
+)
+
+# Word order enters the similarity through bigrams of word prefixes (robust to
+# typos and inflections late in a word), each counted three times so that a
+# question with subject and object swapped falls below the threshold while a
+# moved modifier ("limits on X" / "X limit") stays above it.
+_ORDER_PREFIX = 4
+_ORDER_WEIGHT = 3
+
+# Similarity buckets reported in the stats, as (label, lower bound).
+_BUCKETS = [("0.9-1.0", 0.9), ("0.8-0.9", 0.8), ("0.7-0.8", 0.7), ("0.6-0.7", 0.6), ("0.5-0.6", 0.5), ("<0.5", 0.0)]
+
+
+class CachedAnswer(NamedTuple):
+    answer: str
+    question: str
+    similarity: float
+
+
+class _Normalized(NamedTuple):
+    text: str
+    shingles: FrozenSet[int]
+    numbers: FrozenSet[str]
+
+
+def normalize_question(question: str) -> _Normalized:
+    """
+    Reduces a question to its content words, in order, so trivial rewordings
+    like "What are the limits on freedom of expression?" and "Limits on
+    freedom of expression" normalize to the same text. Order is kept because
+    it carries meaning: "Can the President dismiss Parliament?" is not
+    "Can Parliament dismiss the President?". Numbers are kept apart:
+    questions that cite different numbers are never treated as duplicates.
+    """
+    words = []
+    for word in _WORD.findall(question.casefold()):
+        if word in _QUESTION_STOPWORDS:
+            continue
+        # Light stemming so plurals match: "limits" -> "limit", but not "access".
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    shingles = char_shingles(words) | word_shingles([w[:_ORDER_PREFIX] for w in words], weight=_ORDER_WEIGHT)
+    return _Normalized(" ".join(words), shingles, frozenset(w for w in words if w.isdigit()))
+
+
+def _bucket(similarity: float) -> str:
+    return next(label for label, lower in _BUCKETS if similarity >= lower)
+
+
+class FollowUpAnswerCache:
+    """
+    Caches follow-up answers per document and reuses them for questions that
+    are worded slightly differently.
+
+    Entries live in an LRU keyed by (document hash, normalized question). An
+    exact normalized match is a hit; otherwise a MinHash index of the
+    document's cached questions proposes candidates, and the most similar
+    one at or above `threshold` (Jaccard similarity of character shingles
+    and ordered word pairs) is a near-duplicate hit. Every document has its own index, so an answer
+    about one chapter is never served for another.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, threshold: float):
+        self.threshold = threshold
+        self._entries = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds, on_evict=self._forget)
+        self._indexes: Dict[str, MinHashLSH] = {}
+        self.counters = {"exact_hits": 0, "near_hits": 0, "misses": 0, "stores": 0}
+        # Best candidate similarity of every near-duplicate lookup, split by outcome, for tuning the threshold.
+        self.hit_similarity = dict.fromkeys([label for label, _ in _BUCKETS], 0)
+        self.miss_similarity = dict.fromkeys([label for label, _ in _BUCKETS], 0)
+
+    def _forget(self, key: Hashable, _entry: Optional[CacheEntry] = None) -> None:
+        doc_hash, _ = key
+        index = self._indexes.get(doc_hash)
+        if index is not None:
+            index.remove(key)
+            if not len(index):
+                del self._indexes[doc_hash]
+
+    def _fresh(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        value = self._entries.get(key)
+        if value is None and key in self._entries:
+            # Expired: drop it so it stops turning up as a candidate.
+            self._entries.pop(key)
+            self._forget(key)
+        return value
+
+    def get(self, doc_hash: str, question: str) -> Optional[CachedAnswer]:
+        normalized = normalize_question(question)
+        if not normalized.text:
+            self.counters["misses"] += 1
+            return None
+
+        value = self._fresh((doc_hash, normalized.text))
+        if value is not None:
+            self.counters["exact_hits"] += 1
+            return CachedAnswer(value["answer"], value["question"], 1.0)
+
+        index = self._indexes.get(doc_hash)
+        candidates = index.query(normalized.shingles) if index is not None else []
+        for key, similarity in candidates:
+            if similarity < self.threshold:
+                break
+            value = self._fresh(key)
+            if value is None or value["numbers"] != normalized.numbers:
+                continue
+            self.counters["near_hits"] += 1
+            self.hit_similarity[_bucket(similarity)] += 1
+            return CachedAnswer(value["answer"], value["question"], round(similarity, 4))
+
+        self.counters["misses"] += 1
+        if candidates:
+            self.miss_similarity[_bucket(candidates[0][1])] += 1
+        return None
+
+    def set(self, doc_hash: str, question: str, answer: str) -> None:
+        normalized = normalize_question(question)
+        if not normalized.text or not answer:
+            return
+        key = (doc_hash, normalized.text)
+        self._entries.set(key, {"answer": answer, "question": question, "numbers": normalized.numbers})
+        self._indexes.setdefault(doc_hash, MinHashLSH()).add(key, normalized.shingles)
+        self.counters["stores"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._indexes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.counters["exact_hits"] + self.counters["near_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            "enabled": True,
+            "entries": len(self._entries),
+            "max_entries": self._entries.max_entries,
+            "evictions": self._entries.evictions,
+            "documents": len(self._indexes),
+            "threshold": self.threshold,
+            **self.counters,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "near_hit_similarity": self.hit_similarity,
+            "miss_best_similarity": self.miss_similarity,
+        }
+
+
+_answer_cache: Optional[FollowUpAnswerCache] = None
+
+
+def get_answer_cache() -> Optional[FollowUpAnswerCache]:
+    """Returns the shared follow-up answer cache, or None when it is disabled."""
+    global _answer_cache
+    if not config.FOLLOW_UP_CACHE_ENABLED:
+        return None
+    if _answer_cache is None:
+        _answer_cache = FollowUpAnswerCache(
+            max_entries=config.FOLLOW_UP_CACHE_MAX_ENTRIES,
+            ttl_seconds=config.FOLLOW_UP_CACHE_TTL_SECONDS,
+            threshold=config.FOLLOW_UP_CACHE_SIMILARITY_THRESHOLD,
+        )
+    return _answer_cache
+
+
+def reset_answer_cache() -> None:
+    global _answer_cache
+    _answer_cache = None
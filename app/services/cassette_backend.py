@@ -0,0 +1,69 @@
+import dataclasses
+import time
+from typing import AsyncIterator, Dict, Iterable, List
+
+from app.services.llm_backend import LLMBackend, LLMResponse
+from app.utils.cassette import CassetteStore
+
+
+def _request(model: str, prompt: str, json_mode: bool, streamed: bool) -> Dict:
+    return {"kind": "llm", "model": model, "prompt": prompt, "json_mode": json_mode, "stream": streamed}
+
+
+def _summary(request: Dict) -> Dict:
+    # The full prompt is already addressed by the key; keep the cassette itself small.
+    return {**request, "prompt": request["prompt"][:200], "prompt_chars": len(request["prompt"])}
+
+
+class CassetteBackend(LLMBackend):
+    """
+    Wraps another backend and records its responses to a cassette store,
+    or replays them, keyed by the model, the prompt and the call options.
+
+    Streams are recorded chunk by chunk with their offsets, so a replay with
+    the original latency reproduces the time to first token as well.
+    Failed calls are not recorded.
+    """
+
+    def __init__(self, inner: LLMBackend, store: CassetteStore):
+        self.inner = inner
+        self.store = store
+        self.name = f"cassette:{inner.name}"
+
+    def warm_up(self, models: Iterable[str]) -> None:
+        # Replays never reach the inner backend, but record and auto modes do.
+        self.inner.warm_up(models)
+
+    async def generate(self, model: str, prompt: str, json_mode: bool = True) -> LLMResponse:
+        request = _request(model, prompt, json_mode, streamed=False)
+        key, entry = await self.store.lookup(request)
+        if entry is not None:
+            await self.store.wait(entry["elapsed"])
+            return LLMResponse(**entry["response"])
+
+        started = time.perf_counter()
+        response = await self.inner.generate(model, prompt, json_mode)
+        await self.store.save(key, _summary(request), dataclasses.asdict(response), time.perf_counter() - started)
+        return response
+
+    async def stream(self, model: str, prompt: str, json_mode: bool = True) -> AsyncIterator[LLMResponse]:
+        request = _request(model, prompt, json_mode, streamed=True)
+        key, entry = await self.store.lookup(request)
+        if entry is not None:
+            replayed = 0.0
+            for chunk in entry["response"]:
+                await self.store.wait(chunk["at"] - replayed)
+                replayed = chunk["at"]
+                yield LLMResponse(**chunk["chunk"])
+            return
+
+        started = time.perf_counter()
+        chunks: List[Dict] = []
+        async for chunk in self.inner.stream(model, prompt, json_mode):
+            chunks.append({"at": round(time.perf_counter() - started, 4), "chunk": dataclasses.asdict(chunk)})
+            yield chunk
+        # Only a stream that ran to the end is worth replaying.
+        await self.store.save(key, _summary(request), chunks, time.perf_counter() - started)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
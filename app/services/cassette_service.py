@@ -0,0 +1,71 @@
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core import config
+from app.utils.cassette import CassetteStore
+
+# Response headers worth keeping in a cassette; the rest describe the original transfer.
+_RECORDED_HEADERS = ("content-type", "etag", "last-modified")
+
+_store: Optional[CassetteStore] = None
+
+
+def get_cassette_store() -> Optional[CassetteStore]:
+    """Returns the shared cassette store, or None when CASSETTE_MODE is "off"."""
+    global _store
+    if config.CASSETTE_MODE == "off":
+        return None
+    if _store is None:
+        _store = CassetteStore(config.CASSETTE_DIR, config.CASSETTE_MODE, config.CASSETTE_LATENCY)
+    return _store
+
+
+def reset_cassette_store() -> None:
+    """Forgets the shared store, so the next use re-reads the cassette settings."""
+    global _store
+    _store = None
+
+
+async def http_get(client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> httpx.Response:
+    """
+    GETs `url` with `client`, or replays a recorded response for it.
+
+    Recorded pages are keyed by URL alone and recorded without the
+    conditional headers, so a cassette always holds the full page rather
+    than a 304 that depends on what the cache held at recording time.
+    """
+    store = get_cassette_store()
+    if store is None:
+        return await client.get(url, headers=headers)
+
+    request = {"kind": "http", "method": "GET", "url": url}
+    key, entry = await store.lookup(request)
+    if entry is not None:
+        await store.wait(entry["elapsed"])
+        recorded = entry["response"]
+        return httpx.Response(
+            recorded["status_code"],
+            headers=recorded["headers"],
+            content=recorded["text"].encode("utf-8"),
+            request=httpx.Request("GET", url),
+        )
+
+    started = time.perf_counter()
+    response = await client.get(url)
+    recorded: Dict[str, Any] = {
+        "status_code": response.status_code,
+        "headers": {name: response.headers[name] for name in _RECORDED_HEADERS if name in response.headers},
+        "text": response.text,
+    }
+    if "content-type" in recorded["headers"]:
+        # The body is stored decoded, so replay it as UTF-8 whatever the original charset.
+        recorded["headers"]["content-type"] = recorded["headers"]["content-type"].split(";")[0] + "; charset=utf-8"
+    await store.save(key, request, recorded, time.perf_counter() - started)
+    return response
+
+
+def get_cassette_stats() -> Dict[str, Any]:
+    store = get_cassette_store()
+    return store.stats() if store is not None else {"mode": "off"}
@@ -0,0 +1,42 @@
+from typing import Dict
+
+from app.core.chapters import CHAPTERS_DATA
+from app.models.document import ChapterDocument
+from app.services.scraper_service import fetch_and_parse_url
+from app.utils.sections import parse_chapter_text
+
+_CHAPTERS_BY_ID = {chapter["id"]: chapter for chapter in CHAPTERS_DATA}
+
+# The parsed model of each chapter, rebuilt only when the chapter text changes.
+_documents: Dict[int, ChapterDocument] = {}
+
+
+class ChapterNotFoundError(LookupError):
+    """Raised for a chapter id that is not in CHAPTERS_DATA."""
+
+
+async def get_chapter_document(chapter_id: int) -> ChapterDocument:
+    """
+    Returns the structured document for a chapter. The text comes from the
+    snapshot or document cache as usual; it is parsed once and then reused
+    for as long as the text stays the same.
+
+    Raises:
+        ChapterNotFoundError: If there is no chapter with this id.
+        RuntimeError: If the chapter text cannot be fetched.
+    """
+    chapter = _CHAPTERS_BY_ID.get(chapter_id)
+    if chapter is None:
+        raise ChapterNotFoundError(f"Chapter {chapter_id} does not exist.")
+
+    text = await fetch_and_parse_url(chapter["url"])
+    document = _documents.get(chapter_id)
+    # Cached texts are the same object, so this is normally an identity check.
+    if document is None or document.text != text:
+        document = parse_chapter_text(text, chapter_id=chapter_id, title=chapter["name"], url=chapter["url"])
+        _documents[chapter_id] = document
+    return document
+
+
+def clear_documents() -> None:
+    _documents.clear()
@@ -0,0 +1,89 @@
+import os
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from app.core import config
+from app.services.llm_backend import LLMBackend, LLMResponse
+from app.utils.admission import OverloadedError
+
+
+def _block_reason(response) -> Optional[str]:
+    feedback = getattr(response, "prompt_feedback", None)
+    if feedback and feedback.block_reason:
+        return feedback.block_reason.name
+    return None
+
+
+def _usage(response) -> dict:
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return {}
+    return {
+        "prompt_tokens": usage.prompt_token_count or None,
+        "response_tokens": usage.candidates_token_count or None,
+    }
+
+
+def _rate_limited(model: str) -> OverloadedError:
+    # A 429 from Gemini means our quota is spent; tell clients to back off rather than fail.
+    return OverloadedError(
+        f"The AI service is rate limited ({model}). Please retry shortly.",
+        config.LLM_RATE_LIMIT_RETRY_AFTER_SECONDS,
+    )
+
+
+class GeminiBackend(LLMBackend):
+    """Generates text with Google's Gemini models via the google-generativeai SDK."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None):
+        # --- SDK CONFIGURATION ---
+        # This configures the client for the entire application using the API key
+        # loaded from the .env file (see app.core.config).
+        genai.configure(api_key=api_key or os.getenv("GOOGLE_API_KEY"))
+        # Model handles and generation configs are immutable, so one of each is
+        # built per model / mode and reused by every request.
+        self._models: Dict[str, genai.GenerativeModel] = {}
+        self._json_config = genai.GenerationConfig(response_mime_type="application/json")
+
+    def _model(self, model: str) -> genai.GenerativeModel:
+        handle = self._models.get(model)
+        if handle is None:
+            handle = self._models[model] = genai.GenerativeModel(model)
+        return handle
+
+    def _generation_config(self, json_mode: bool):
+        return self._json_config if json_mode else None
+
+    def warm_up(self, models: Iterable[str]) -> None:
+        for model in models:
+            self._model(model)
+
+    async def generate(self, model: str, prompt: str, json_mode: bool = True) -> LLMResponse:
+        try:
+            response = await self._model(model).generate_content_async(
+                prompt, generation_config=self._generation_config(json_mode)
+            )
+        except google_exceptions.ResourceExhausted as e:
+            raise _rate_limited(model) from e
+        if not response.parts:
+            return LLMResponse(text="", model=model, blocked_reason=_block_reason(response) or "Unknown")
+        return LLMResponse(text=response.text, model=model, **_usage(response))
+
+    async def stream(self, model: str, prompt: str, json_mode: bool = True) -> AsyncIterator[LLMResponse]:
+        try:
+            response = await self._model(model).generate_content_async(
+                prompt, generation_config=self._generation_config(json_mode), stream=True
+            )
+        except google_exceptions.ResourceExhausted as e:
+            raise _rate_limited(model) from e
+        async for chunk in response:
+            blocked_reason = _block_reason(chunk)
+            if blocked_reason:
+                yield LLMResponse(text="", model=model, blocked_reason=blocked_reason)
+                return
+            if chunk.parts:
+                yield LLMResponse(text=chunk.text, model=model, **_usage(chunk))
@@ -0,0 +1,162 @@
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+from app.core import config
+from app.utils.admission import AdmissionController, parse_admission_limits
+
+
+@dataclass
+class LLMResponse:
+    """
+    The text a backend generated, or a piece of it when streaming.
+
+    `blocked_reason` is set (and `text` empty) when the provider refused to
+    answer, e.g. for safety reasons. Token counts are None when unknown.
+    """
+    text: str
+    model: str
+    blocked_reason: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    response_tokens: Optional[int] = None
+
+
+class LLMBackend(ABC):
+    """
+    A text-generation provider. `ai_service` only talks to models through
+    this interface, so the provider can be swapped without touching prompts.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, model: str, prompt: str, json_mode: bool = True) -> LLMResponse:
+        """Generates a complete response for `prompt` with the named model."""
+
+    @abstractmethod
+    def stream(self, model: str, prompt: str, json_mode: bool = True) -> AsyncIterator[LLMResponse]:
+        """Yields the response for `prompt` in pieces as it is generated."""
+
+    def warm_up(self, models: Iterable[str]) -> None:
+        """Prepares whatever the first calls to `models` would otherwise build. Blocking; no model calls."""
+
+    async def aclose(self) -> None:
+        """Releases any resources held by the backend."""
+
+
+_backend: Optional[LLMBackend] = None
+# Creating the backend may import a provider SDK, possibly from the warm-up
+# thread while a request asks for it too; only one of them may create it.
+_backend_lock = threading.Lock()
+
+
+def _create_backend(name: str) -> LLMBackend:
+    if name == "gemini":
+        from app.services.gemini_backend import GeminiBackend
+        return GeminiBackend()
+    if name == "stub":
+        from app.services.stub_backend import StubBackend
+        return StubBackend.from_config()
+    raise ValueError(f"Unknown LLM_BACKEND '{name}'. Expected 'gemini' or 'stub'.")
+
+
+def get_backend() -> LLMBackend:
+    """
+    Returns the active backend, creating the configured one on first use.
+    With CASSETTE_MODE set, it is wrapped to record or replay its responses.
+    """
+    global _backend
+    backend = _backend
+    if backend is not None:
+        return backend
+    with _backend_lock:
+        if _backend is None:
+            backend = _create_backend(config.LLM_BACKEND)
+            from app.services.cassette_service import get_cassette_store
+            store = get_cassette_store()
+            if store is not None:
+                from app.services.cassette_backend import CassetteBackend
+                backend = CassetteBackend(backend, store)
+            _backend = backend
+        return _backend
+
+
+def warm_up_backend(models: Iterable[str]) -> None:
+    """
+    Creates the configured backend and prepares it for `models`, so the
+    provider SDK import and setup happen now rather than in the first request.
+    Blocking, so callers on the event loop should run it in a thread.
+    """
+    get_backend().warm_up(models)
+
+
+def set_backend(backend: Optional[LLMBackend]) -> None:
+    """Replaces the active backend; None reverts to the configured one on next use."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+async def close_backend() -> None:
+    """Closes the active backend, if one was created."""
+    global _backend
+    if _backend is not None:
+        await _backend.aclose()
+        _backend = None
+
+
+# --- ADMISSION CONTROL ---
+# One controller per model, shared by every request, so a burst of traffic
+# queues (or is turned away) here instead of piling onto the provider.
+_admission_controllers: Dict[str, AdmissionController] = {}
+
+
+def get_admission_controller(model: str) -> AdmissionController:
+    """Returns the admission controller for `model`, creating it from config on first use."""
+    controller = _admission_controllers.get(model)
+    if controller is None:
+        limits = parse_admission_limits(config.LLM_ADMISSION_LIMITS).get(model) or (
+            config.LLM_MAX_CONCURRENCY, config.LLM_MAX_QUEUE, config.LLM_QUEUE_TIMEOUT_SECONDS
+        )
+        controller = AdmissionController(model, *limits)
+        _admission_controllers[model] = controller
+    return controller
+
+
+def reset_admission_controllers() -> None:
+    """Drops every controller, so the next call re-reads the configured limits."""
+    _admission_controllers.clear()
+
+
+def get_admission_stats() -> dict:
+    """Returns queue depth, wait times and rejection counters per model."""
+    return {model: controller.stats() for model, controller in _admission_controllers.items()}
+
+
+# --- USAGE ACCOUNTING ---
+# Token usage of every model call made within `track_usage()`, including calls
+# made by tasks it spawns, e.g. to attribute tokens to one evaluation stage.
+_usage: ContextVar[Optional[List[LLMResponse]]] = ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[List[LLMResponse]]:
+    """Collects a usage record (model and token counts) for each model call in the block."""
+    records: List[LLMResponse] = []
+    token = _usage.set(records)
+    try:
+        yield records
+    finally:
+        _usage.reset(token)
+
+
+def record_usage(response: LLMResponse) -> None:
+    """Adds the token counts of `response` to the innermost `track_usage()` block, if any."""
+    records = _usage.get()
+    if records is not None and (response.prompt_tokens is not None or response.response_tokens is not None):
+        records.append(LLMResponse(
+            text="", model=response.model, prompt_tokens=response.prompt_tokens, response_tokens=response.response_tokens
+        ))
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core import config
+from app.utils.cache import LRUCache
+
+
+class AnalysisResultCache:
+    """
+    A two-tier cache of parsed analysis results.
+
+    Entries are keyed by a canonical request key and tagged with the hash of
+    the document they were generated from. A lookup with a different document
+    hash treats the entry as invalid and deletes it from both tiers, so a
+    changed chapter never serves an analysis of the old text.
+
+    Tier 1 is an in-memory LRU; tier 2 is a SQLite file that survives restarts.
+    """
+
+    def __init__(self, memory_entries: int, ttl_seconds: float, disk_path: Optional[str] = None, disk_max_entries: int = 5000):
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_entries = disk_max_entries
+        self._memory = LRUCache(max_entries=memory_entries, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats_counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "invalidations": 0}
+
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_results ("
+                " request_key TEXT PRIMARY KEY,"
+                " document_hash TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    # --- Disk tier (blocking; always called via asyncio.to_thread) ---
+
+    def _disk_get(self, request_key: str, document_hash: str) -> Tuple[Optional[Dict[str, Any]], bool, float]:
+        """Returns (result, invalidated, seconds the result has left to live) for a disk lookup."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT document_hash, payload, created_at FROM analysis_results WHERE request_key = ?",
+                (request_key,),
+            ).fetchone()
+            if row is None:
+                return None, False, 0.0
+            stored_hash, payload, created_at = row
+            remaining = self.ttl_seconds - (time.time() - created_at)
+            if stored_hash != document_hash or remaining < 0:
+                self._db.execute("DELETE FROM analysis_results WHERE request_key = ?", (request_key,))
+                self._db.commit()
+                return None, stored_hash != document_hash, 0.0
+            return json.loads(payload), False, remaining
+
+    def _disk_set(self, request_key: str, document_hash: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO analysis_results (request_key, document_hash, payload, created_at) VALUES (?, ?, ?, ?)",
+                (request_key, document_hash, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+            # Keep the file bounded by dropping the oldest rows.
+            self._db.execute(
+                "DELETE FROM analysis_results WHERE request_key IN ("
+                " SELECT request_key FROM analysis_results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,),
+            )
+            self._db.commit()
+
+    # --- Public API ---
+
+    async def get(self, request_key: str, document_hash: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached result for this request and document, or None."""
+        invalidated = False
+        entry = self._memory.get_entry(request_key)
+        if entry is not None:
+            if entry.metadata.get("document_hash") == document_hash and entry.is_fresh(self._memory.now()):
+                self.stats_counters["memory_hits"] += 1
+                return entry.value
+            invalidated = entry.metadata.get("document_hash") != document_hash
+            self._memory.pop(request_key)
+
+        if self._db is not None:
+            result, disk_invalidated, remaining = await asyncio.to_thread(self._disk_get, request_key, document_hash)
+            invalidated = invalidated or disk_invalidated
+            if result is not None:
+                self.stats_counters["disk_hits"] += 1
+                # Promote with the lifetime it has left, so it expires when the disk row does.
+                self._memory.set(request_key, result, ttl_seconds=remaining, document_hash=document_hash)
+                return result
+
+        if invalidated:
+            self.stats_counters["invalidations"] += 1
+        self.stats_counters["misses"] += 1
+        return None
+
+    async def set(self, request_key: str, document_hash: str, result: Dict[str, Any]) -> None:
+        """Stores a result in both tiers."""
+        self._memory.set(request_key, result, document_hash=document_hash)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, request_key, document_hash, result)
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = sum(self.stats_counters[k] for k in ("memory_hits", "disk_hits", "misses"))
+        hits = self.stats_counters["memory_hits"] + self.stats_counters["disk_hits"]
+        return {
+            **self.stats_counters,
+            "memory_entries": len(self._memory),
+            "disk_enabled": self._db is not None,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_result_cache: Optional[AnalysisResultCache] = None
+
+
+def get_result_cache() -> Optional[AnalysisResultCache]:
+    """Returns the process-wide result cache, creating it on first use (None if disabled)."""
+    global _result_cache
+    if _result_cache is None and config.ANALYSIS_CACHE_ENABLED:
+        _result_cache = AnalysisResultCache(
+            memory_entries=config.ANALYSIS_CACHE_MEMORY_ENTRIES,
+            ttl_seconds=config.ANALYSIS_CACHE_TTL_SECONDS,
+            disk_path=config.ANALYSIS_CACHE_PATH or None,
+            disk_max_entries=config.ANALYSIS_CACHE_DISK_MAX_ENTRIES,
+        )
+    return _result_cache
+
+
+def close_result_cache() -> None:
+    """Closes the process-wide result cache; it is recreated on next use."""
+    global _result_cache
+    if _result_cache is not None:
+        _result_cache.close()
+        _result_cache = None
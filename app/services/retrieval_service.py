@@ -0,0 +1,109 @@
+import re
+from typing import List, NamedTuple, Optional
+
+from app.core import config
+from app.utils.bm25 import BM25Index, tokenize
+from app.utils.cache import LRUCache
+from app.utils.canonical import document_hash
+from app.utils.sections import Section, split_into_sections
+
+# Matches explicit references such as "s16", "s. 16", "section 25A" or "sections 9".
+_SECTION_REFERENCE = re.compile(r"\b(?:s|sec|section|sections)\.?\s*(\d{1,3}[a-z]?)\b", re.IGNORECASE)
+
+# Rough conversion used for budgeting; Gemini averages about four characters per token.
+CHARS_PER_TOKEN = 4
+
+
+class _SectionIndex(NamedTuple):
+    sections: List[Section]
+    bm25: BM25Index
+
+
+class RetrievalResult(NamedTuple):
+    text: str
+    section_numbers: List[Optional[str]]
+    is_excerpt: bool
+    estimated_tokens: int
+
+
+# Section indexes are built once per distinct document text.
+_indexes = LRUCache(max_entries=32, ttl_seconds=float("inf"))
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _get_index(document_text: str) -> _SectionIndex:
+    key = document_hash(document_text)
+    index = _indexes.get(key)
+    if index is None:
+        sections = split_into_sections(document_text)
+        bm25 = BM25Index([tokenize(f"{section.title} {section.text}") for section in sections])
+        index = _indexes.set(key, _SectionIndex(sections, bm25)).value
+    return index
+
+
+def expand_section_references(document_text: str, query: str) -> str:
+    """
+    Replaces references such as "s16" in `query` with the title of that
+    section of the document ("Freedom of expression"), leaving references
+    to sections the document does not have unchanged.
+    """
+    if not _SECTION_REFERENCE.search(query):
+        return query
+    titles = {section.number: section.title for section in _get_index(document_text).sections if section.number}
+    return _SECTION_REFERENCE.sub(lambda m: titles.get(m.group(1).upper(), m.group(0)), query)
+
+
+def select_relevant_text(
+    document_text: str,
+    query: str,
+    top_k: int = None,
+    token_budget: int = None,
+    min_score: float = None,
+) -> RetrievalResult:
+    """
+    Picks the chapter sections most relevant to `query`.
+
+    Sections explicitly referenced in the query (e.g. "s16") come first, then
+    sections in BM25 order, up to `top_k` sections and `token_budget` tokens.
+    The selection is returned in document order. If the chapter cannot be
+    split into sections, or the best match scores below `min_score` and no
+    section is referenced explicitly, the full text is returned instead.
+    """
+    top_k = config.FOLLOW_UP_TOP_K_SECTIONS if top_k is None else top_k
+    token_budget = config.FOLLOW_UP_TOKEN_BUDGET if token_budget is None else token_budget
+    min_score = config.FOLLOW_UP_MIN_RETRIEVAL_SCORE if min_score is None else min_score
+
+    full_text = RetrievalResult(document_text, [], False, estimate_tokens(document_text))
+    if estimate_tokens(document_text) <= token_budget:
+        # Nothing to gain: the whole chapter already fits the budget.
+        return full_text
+
+    index = _get_index(document_text)
+    if len(index.sections) < 2:
+        return full_text
+
+    referenced = {ref.upper() for ref in _SECTION_REFERENCE.findall(query)}
+    explicit = [i for i, section in enumerate(index.sections) if section.number in referenced]
+
+    scores = index.bm25.scores(tokenize(query))
+    ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    if not explicit and (not ranked or scores[ranked[0]] < min_score):
+        return full_text
+
+    chosen: List[int] = []
+    used_tokens = 0
+    for i in explicit + [i for i in ranked if scores[i] > 0 and i not in explicit]:
+        if len(chosen) >= top_k:
+            break
+        cost = estimate_tokens(index.sections[i].text)
+        if chosen and used_tokens + cost > token_budget:
+            continue
+        chosen.append(i)
+        used_tokens += cost
+
+    chosen.sort()
+    text = "\n\n[...]\n\n".join(index.sections[i].text for i in chosen)
+    return RetrievalResult(text, [index.sections[i].number for i in chosen], True, estimate_tokens(text))
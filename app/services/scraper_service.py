@@ -1,10 +1,146 @@
+import asyncio
+import logging
 import httpx
-from bs4 import BeautifulSoup
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core import config
+from app.core.http_client import create_http_client
+from app.core.metrics import UPSTREAM_ERRORS
+from app.core.tracing import stage
+from app.services import cassette_service
+from app.services.snapshot_service import get_snapshot_document
+from app.utils import html_text
+from app.utils.cache import LRUCache
+from app.utils.cassette import CassetteMissError
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# The long-lived, pooled client injected by the app lifespan (see app.main).
+# When it is not set (scripts, tests), each fetch opens a short-lived client.
+_http_client: Optional[httpx.AsyncClient] = None
+
+# In-process cache of cleaned document text, keyed by URL.
+# Entries carry the ETag / Last-Modified validators of the response they came from.
+_document_cache = LRUCache(
+    max_entries=config.DOCUMENT_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.DOCUMENT_CACHE_TTL_SECONDS,
+)
+
+# Concurrent requests for the same URL share a single download and parse.
+_inflight_fetches = SingleFlight()
+
+# Counters beyond plain hits/misses, so we can tell a 304 revalidation apart
+# from a full download, and see how often a stale copy saved a request.
+_revalidation_stats = {
+    "revalidated": 0,
+    "refetched": 0,
+    "stale_served": 0,
+}
+
+
+def _extract_text_blocks_bs4(html: str) -> Optional[List[str]]:
+    """
+    The original BeautifulSoup extraction, kept as the reference for the lxml
+    engine (see app.utils.html_text) and selectable with SCRAPER_PARSER=bs4.
+    """
+    # Imported here: BeautifulSoup is only needed for this reference path, and
+    # importing it adds noticeably to every cold start.
+    from bs4 import BeautifulSoup
+
+    # 1. Parse the HTML with BeautifulSoup and the fast lxml parser
+    soup = BeautifulSoup(html, 'lxml')
+
+    # 2. Find the main content container
+    # This is based on our detective work. We add fallbacks to make it more robust.
+    main_content = soup.find('div', class_='field') or soup.find('main') or soup.body
+    if not main_content:
+        return None
+
+    # 3. Extract text from relevant tags (paragraphs, headings, list items)
+    # The 'separator' ensures words aren't mashed together. 'strip' removes extra whitespace.
+    return [
+        p.get_text(separator=' ', strip=True)
+        for p in main_content.find_all(['p', 'h1', 'h2', 'h3', 'li'])
+    ]
+
+
+_EXTRACTORS = {
+    "lxml": html_text.extract_text_blocks,
+    "bs4": _extract_text_blocks_bs4,
+}
+
+
+def _parse_document(html: str, engine: Optional[str] = None) -> str:
+    """
+    Parses the HTML and extracts clean, readable text from the main content area.
+
+    `engine` is "lxml" (direct on the lxml tree) or "bs4" (BeautifulSoup);
+    both produce identical text. It defaults to the SCRAPER_PARSER setting.
+
+    Raises:
+        ValueError: If no main content container or meaningful text can be found.
+    """
+    engine = engine or config.SCRAPER_PARSER
+    if engine not in _EXTRACTORS:
+        raise ValueError(f"Unknown HTML parser engine '{engine}'. Expected 'lxml' or 'bs4'.")
+    text_blocks = _EXTRACTORS[engine](html)
+    if text_blocks is None:
+        raise ValueError("Could not find a main content container in the HTML.")
+    document_text = '\n\n'.join(text_blocks)
+
+    # 4. Validate that we actually got meaningful content
+    if not document_text or len(document_text) < 200: # Increased threshold
+        raise ValueError(f"Extracted text is too short ({len(document_text)} chars) to be valid content.")
+
+    return document_text
+
+
+async def _parse_document_off_loop(html: str) -> str:
+    """Parses small pages inline and large ones in a worker thread, keeping the event loop free."""
+    if len(html) < config.SCRAPER_PARSE_IN_THREAD_MIN_CHARS:
+        return _parse_document(html)
+    return await asyncio.to_thread(_parse_document, html)
+
+
+def set_http_client(client: Optional[httpx.AsyncClient]) -> None:
+    """Injects the shared HTTP client, or clears it with None."""
+    global _http_client
+    _http_client = client
+
+
+@asynccontextmanager
+async def _client_session() -> AsyncIterator[httpx.AsyncClient]:
+    """Yields the shared client if one was injected, otherwise a temporary one."""
+    if _http_client is not None:
+        yield _http_client
+    else:
+        async with create_http_client() as client:
+            yield client
+
+
+def _conditional_headers(metadata: Dict[str, Any]) -> Dict[str, str]:
+    """Builds If-None-Match / If-Modified-Since headers from a cached entry's validators."""
+    headers = {}
+    if metadata.get("etag"):
+        headers["If-None-Match"] = metadata["etag"]
+    if metadata.get("last_modified"):
+        headers["If-Modified-Since"] = metadata["last_modified"]
+    return headers
+
 
 async def fetch_and_parse_url(url: str) -> str:
     """
     Asynchronously fetches content from a URL, parses the HTML,
     and extracts clean, readable text from the main content area.
+
+    Results are cached per URL. A fresh entry is served without touching the
+    network; a stale one is revalidated with a conditional GET and, if the
+    server answers 304 Not Modified, reused without re-parsing. Concurrent
+    callers for the same URL share one in-flight fetch. URLs covered by the
+    offline corpus snapshot are served from it without any network I/O.
+
     Args:
         url: The URL of the webpage to scrape.
 
@@ -15,47 +151,103 @@ async def fetch_and_parse_url(url: str) -> str:
         RuntimeError: If the network request fails, the page is not found,
                     or no meaningful content can be extracted.
     """
-    print(f"Attempting to scrape URL: {url}")
+    snapshot_text = get_snapshot_document(url)
+    if snapshot_text is not None:
+        return snapshot_text
+
+    cached = _document_cache.get_entry(url)
+    if cached is not None and cached.is_fresh(_document_cache.now()):
+        _document_cache.hits += 1
+        logger.info("Document cache hit", extra={"url": url})
+        return cached.value
+
+    return await _inflight_fetches.do(url, lambda: _fetch_document(url))
+
+
+async def _fetch_document(url: str) -> str:
+    """Downloads (or revalidates) and parses `url`, updating the document cache."""
+    cached = _document_cache.get_entry(url)
+    _document_cache.misses += 1
+    headers = _conditional_headers(cached.metadata) if cached is not None else {}
+
+    logger.info("Scraping URL", extra={"url": url})
     try:
         # 1. Asynchronously fetch the HTML content
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, follow_redirects=True, timeout=15.0)
-            # Raise an exception for HTTP errors like 404 Not Found or 500 Server Error
-            response.raise_for_status()
-
-        # 2. Parse the HTML with BeautifulSoup and the fast lxml parser
-        soup = BeautifulSoup(response.text, 'lxml')
-
-        # 3. Find the main content container
-        # This is based on our detective work. We add fallbacks to make it more robust.
-        main_content = soup.find('div', class_='field') or soup.find('main') or soup.body
-        if not main_content:
-            raise ValueError("Could not find a main content container in the HTML.")
-
-        # 4. Extract text from relevant tags (paragraphs, headings, list items)
-        # The 'separator' ensures words aren't mashed together. 'strip' removes extra whitespace.
-        text_blocks = [
-            p.get_text(separator=' ', strip=True) 
-            for p in main_content.find_all(['p', 'h1', 'h2', 'h3', 'li'])
-        ]
-        document_text = '\n\n'.join(text_blocks)
-
-        # 5. Validate that we actually got meaningful content
-        if not document_text or len(document_text) < 200: # Increased threshold
-            raise ValueError(f"Extracted text is too short ({len(document_text)} chars) to be valid content.")
-
-        print("Scraping successful.")
+        async with _client_session() as client:
+            with stage("fetch"):
+                response = await cassette_service.http_get(client, url, headers)
+
+        # 2. The page has not changed since we cached it: keep our parsed copy
+        if response.status_code == 304 and cached is not None:
+            _document_cache.refresh(
+                url,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+            )
+            _revalidation_stats["revalidated"] += 1
+            logger.info("Document not modified; revalidated cached copy", extra={"url": url})
+            return cached.value
+
+        # Raise an exception for HTTP errors like 404 Not Found or 500 Server Error
+        response.raise_for_status()
+
+        # 3. Parse and clean the page
+        with stage("parse"):
+            document_text = await _parse_document_off_loop(response.text)
+
+        _document_cache.set(
+            url,
+            document_text,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+        )
+        if cached is not None:
+            _revalidation_stats["refetched"] += 1
+
+        logger.info("Scraping successful", extra={"url": url, "chars": len(document_text)})
         return document_text
 
     except httpx.RequestError as e:
         # Catches network-related errors (DNS, connection refused, etc.)
-        raise RuntimeError(f"A network error occurred while trying to fetch the URL: {e}") from e
+        cause, error = e, RuntimeError(f"A network error occurred while trying to fetch the URL: {e}")
+        UPSTREAM_ERRORS.inc(upstream="gov.za", error="network")
     except httpx.HTTPStatusError as e:
         # Catches bad HTTP status codes
-        raise RuntimeError(f"The URL returned a bad status code: {e.response.status_code} {e.response.reason_phrase}") from e
+        cause, error = e, RuntimeError(f"The URL returned a bad status code: {e.response.status_code} {e.response.reason_phrase}")
+        UPSTREAM_ERRORS.inc(upstream="gov.za", error=f"http_{e.response.status_code // 100}xx")
+    except CassetteMissError:
+        # Replay-only runs must not fall back to the network or a stale copy.
+        raise
     except ValueError as e:
         # Catches our own validation errors
-        raise RuntimeError(f"Failed to process the page content: {e}") from e
+        cause, error = e, RuntimeError(f"Failed to process the page content: {e}")
+        UPSTREAM_ERRORS.inc(upstream="gov.za", error="parse")
     except Exception as e:
         # A general catch-all for any other unexpected errors
-        raise RuntimeError(f"An unexpected error occurred during scraping: {e}") from e
\ No newline at end of file
+        cause, error = e, RuntimeError(f"An unexpected error occurred during scraping: {e}")
+        UPSTREAM_ERRORS.inc(upstream="gov.za", error="unexpected")
+
+    # A stale copy is better than no answer when the upstream site is struggling.
+    if cached is not None:
+        _revalidation_stats["stale_served"] += 1
+        logger.warning("Revalidation failed (%s); serving stale cached copy", error, extra={"url": url})
+        return cached.value
+
+    raise error from cause
+
+
+def get_document_cache_stats() -> Dict[str, Any]:
+    """Returns hit/miss and revalidation counters for the document cache."""
+    stats = _document_cache.stats()
+    stats.update(_revalidation_stats)
+    stats["coalesced"] = _inflight_fetches.coalesced
+    return stats
+
+
+def clear_document_cache() -> None:
+    """Empties the document cache and resets its counters."""
+    _document_cache.clear()
+    _inflight_fetches.reset_stats()
+    for key in _revalidation_stats:
+        _revalidation_stats[key] = 0
+
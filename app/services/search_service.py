@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import config
+from app.core.chapters import CHAPTERS_DATA
+from app.models.document import ChapterDocument
+from app.services import document_service, snapshot_service
+from app.utils.canonical import document_hash
+from app.utils.inverted_index import InvertedIndex, SearchQuery
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# One index over every section of every chapter. It is only read once built,
+# and replaced (see `_is_stale`) to retry missing chapters or follow new text.
+_index: Optional[InvertedIndex] = None
+_index_info: Dict[str, Any] = {"built": False}
+# (chapter id, text hash) of each indexed chapter, and when they were last checked.
+_index_fingerprint: Tuple[Tuple[int, str], ...] = ()
+_index_checked_at = 0.0
+_builds = SingleFlight()
+_queries = 0
+
+
+def build_index(documents: List[ChapterDocument]) -> InvertedIndex:
+    """Indexes each section of `documents`, keeping where it came from for the results."""
+    index = InvertedIndex()
+    for document in documents:
+        for section in document.sections:
+            index.add(
+                section.text,
+                chapter_id=document.chapter_id,
+                chapter_title=document.title,
+                section_number=section.number,
+                section_title=section.title,
+                start=section.start,
+                end=section.end,
+            )
+    return index
+
+
+def _is_stale() -> bool:
+    age = time.monotonic() - _index_checked_at
+    if _index_info.get("missing_chapters") and age >= config.SEARCH_INDEX_RETRY_SECONDS:
+        return True
+    return age >= config.SEARCH_INDEX_TTL_SECONDS
+
+
+async def _build() -> InvertedIndex:
+    global _index, _index_info, _index_fingerprint, _index_checked_at
+    started = time.perf_counter()
+    from_snapshot = all(snapshot_service.covers(chapter["url"]) for chapter in CHAPTERS_DATA)
+    outcomes = await asyncio.gather(
+        *(document_service.get_chapter_document(chapter["id"]) for chapter in CHAPTERS_DATA),
+        return_exceptions=True,
+    )
+    documents = [outcome for outcome in outcomes if isinstance(outcome, ChapterDocument)]
+    missing = [chapter["id"] for chapter, outcome in zip(CHAPTERS_DATA, outcomes) if not isinstance(outcome, ChapterDocument)]
+    if not documents:
+        raise RuntimeError("Could not fetch any chapter of the Constitution to search.")
+
+    fingerprint = tuple((document.chapter_id, document_hash(document.text)) for document in documents)
+    if _index is not None and fingerprint == _index_fingerprint:
+        # Same chapters, same text: the current index is still accurate.
+        _index_checked_at = time.monotonic()
+        return _index
+
+    # Indexing is CPU-bound; keep it off the event loop.
+    index = await asyncio.to_thread(build_index, documents)
+    _index = index
+    _index_fingerprint = fingerprint
+    _index_checked_at = time.monotonic()
+    _index_info = {
+        "built": True,
+        "source": "snapshot" if from_snapshot else "live",
+        "chapters": len(documents),
+        "missing_chapters": missing,
+        "build_ms": round((time.perf_counter() - started) * 1000, 2),
+        **index.stats(),
+    }
+    logger.info(
+        "Built search index over %d sections from %d chapters", len(index), len(documents),
+        extra={"build_ms": _index_info["build_ms"]},
+    )
+    return index
+
+
+async def get_search_index() -> InvertedIndex:
+    """
+    Returns the search index, building it on first use. Chapters come from
+    the corpus snapshot when it covers them and are scraped otherwise;
+    chapters that cannot be fetched are left out and listed in the stats,
+    and retried after `SEARCH_INDEX_RETRY_SECONDS`. After
+    `SEARCH_INDEX_TTL_SECONDS` the chapter texts are checked again and the
+    index is rebuilt if any changed. A failed rebuild keeps the old index.
+
+    Raises:
+        RuntimeError: If no chapter could be fetched at all.
+    """
+    if _index is not None and not _is_stale():
+        return _index
+    try:
+        return await _builds.do("index", _build)
+    except RuntimeError:
+        if _index is None:
+            raise
+        logger.warning("Could not refresh the search index; keeping the current one", exc_info=True)
+        return _index
+
+
+async def build_index_at_startup() -> bool:
+    """
+    Builds the index during startup when the snapshot covers every chapter,
+    so no request pays for it and startup never waits on gov.za. Otherwise
+    the index is built by the first search.
+    """
+    if not config.SEARCH_INDEX_AT_STARTUP:
+        return False
+    if not all(snapshot_service.covers(chapter["url"]) for chapter in CHAPTERS_DATA):
+        return False
+    await get_search_index()
+    return True
+
+
+async def search(query: str, limit: int = 10, chapter_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Searches every section of the Constitution for `query`. Words are ranked
+    with BM25, "quoted phrases" must match exactly, and each result carries
+    a snippet with the matched words wrapped in <mark> tags.
+
+    Raises:
+        RuntimeError: If the index cannot be built.
+    """
+    global _queries
+    index = await get_search_index()
+    started = time.perf_counter()
+    parsed = SearchQuery.parse(query)
+    hits, total = index.search(parsed, limit, where={"chapter_id": chapter_id} if chapter_id is not None else None)
+    results = [
+        {
+            **hit.fields,
+            "score": round(hit.score, 4),
+            "snippet": index.snippet(hit.doc_id, parsed, config.SEARCH_SNIPPET_CHARS),
+        }
+        for hit in hits
+    ]
+    _queries += 1
+    return {
+        "query": query,
+        "total": total,
+        "results": results,
+        "took_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def reset_search_index() -> None:
+    global _index, _index_info, _index_fingerprint, _index_checked_at, _queries
+    _index = None
+    _index_info = {"built": False}
+    _index_fingerprint = ()
+    _index_checked_at = 0.0
+    _queries = 0
+
+
+def get_search_stats() -> Dict[str, Any]:
+    return {**_index_info, "queries": _queries}
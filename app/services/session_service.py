@@ -0,0 +1,89 @@
+import secrets
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core import config
+from app.utils.cache import LRUCache
+
+
+class SessionNotFoundError(LookupError):
+    """Raised for a session id that is unknown, expired or evicted."""
+
+
+class Session:
+    """
+    The server-side state of one analysis conversation: the chapter text it
+    is grounded in, the initial analysis, and the follow-up Q&A so far.
+    """
+
+    __slots__ = ("session_id", "document_url", "document_text", "analysis_text", "history")
+
+    def __init__(self, session_id: str, document_url: str, document_text: str, analysis_text: str):
+        self.session_id = session_id
+        self.document_url = document_url
+        self.document_text = document_text
+        self.analysis_text = analysis_text
+        self.history: List[Tuple[str, str]] = []
+
+    def recent_history(self, max_turns: int) -> List[Tuple[str, str]]:
+        return self.history[-max_turns:] if max_turns > 0 else []
+
+    def size(self) -> int:
+        """Approximate memory footprint in characters, used for the store's memory cap."""
+        turns = sum(len(q) + len(a) for q, a in self.history)
+        return len(self.document_text) + len(self.analysis_text) + turns
+
+
+class SessionStore:
+    """
+    Keeps sessions in memory, bounded by count and by total size, and
+    expires those idle for longer than `ttl_seconds`. Every lookup or update
+    counts as activity, so active conversations are the last to be evicted.
+    """
+
+    def __init__(self, max_sessions: int, max_bytes: int, ttl_seconds: float):
+        self._sessions = LRUCache(max_entries=max_sessions, ttl_seconds=ttl_seconds, max_bytes=max_bytes, sizeof=Session.size)
+
+    def create(self, document_url: str, document_text: str, analysis_text: str) -> Session:
+        session = Session(secrets.token_urlsafe(16), document_url, document_text, analysis_text)
+        self._sessions.set(session.session_id, session)
+        return session
+
+    def get(self, session_id: str) -> Session:
+        """Returns the session and restarts its idle timer; raises SessionNotFoundError if gone."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            # Drop an expired session now rather than waiting for it to be evicted.
+            self._sessions.pop(session_id)
+            raise SessionNotFoundError(f"Session '{session_id}' was not found or has expired.")
+        self._sessions.refresh(session_id)
+        return session
+
+    def add_turns(self, session: Session, turns: Sequence[Tuple[str, str]]) -> None:
+        """Appends answered questions to the session's history and re-accounts its size."""
+        session.history.extend(turns)
+        if session.session_id in self._sessions:
+            self._sessions.set(session.session_id, session)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._sessions.stats()
+
+
+_session_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """Returns the process-wide session store, creating it on first use."""
+    global _session_store
+    if _session_store is None:
+        _session_store = SessionStore(
+            max_sessions=config.SESSION_MAX_ENTRIES,
+            max_bytes=config.SESSION_MAX_MEMORY_MB * 1024 * 1024,
+            ttl_seconds=config.SESSION_TTL_SECONDS,
+        )
+    return _session_store
+
+
+def reset_session_store() -> None:
+    """Discards every session; the store is recreated from config on next use."""
+    global _session_store
+    _session_store = None
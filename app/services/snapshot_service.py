@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Bump when the on-disk layout changes; older files are then ignored rather than misread.
+SNAPSHOT_FORMAT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+# URL -> cleaned document text, populated by `load_snapshot` at startup.
+_documents: Dict[str, str] = {}
+_snapshot_info: Dict[str, Any] = {"loaded": False}
+_hits = 0
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def write_snapshot(documents: Iterable[Tuple[str, str]], path: str) -> Dict[str, Any]:
+    """
+    Writes (url, document_text) pairs to a compact, versioned, gzip-compressed
+    JSON snapshot at `path` and returns its header.
+    """
+    entries = [{"url": url, "sha256": _sha256(text), "text": text} for url, text in documents]
+    header = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "document_count": len(entries),
+        # Identifies the exact corpus contents, independent of when it was built.
+        "corpus_hash": _sha256("".join(sorted(entry["sha256"] for entry in entries))),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with gzip.open(temp_path, "wt", encoding="utf-8", compresslevel=9) as f:
+        json.dump({**header, "documents": entries}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temp_path, path)
+    return header
+
+
+def load_snapshot(path: str) -> int:
+    """
+    Loads the snapshot at `path` into memory, replacing any previously loaded one.
+
+    Returns:
+        The number of documents loaded (0 if the file is missing or unusable).
+    """
+    global _documents, _snapshot_info
+    if not os.path.exists(path):
+        logger.info("No corpus snapshot found at %s; documents will be scraped live", path)
+        return 0
+
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read corpus snapshot at %s: %s", path, e)
+        return 0
+
+    if payload.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        logger.warning("Ignoring corpus snapshot with unsupported format version %s", payload.get("format_version"))
+        return 0
+
+    documents = {}
+    for entry in payload.get("documents", []):
+        # Skip anything that was corrupted after the snapshot was built.
+        if _sha256(entry["text"]) == entry["sha256"]:
+            documents[entry["url"]] = entry["text"]
+
+    _documents = documents
+    _snapshot_info = {
+        "loaded": True,
+        "path": path,
+        "built_at": payload.get("built_at"),
+        "corpus_hash": payload.get("corpus_hash"),
+        "document_count": len(documents),
+    }
+    logger.info("Loaded corpus snapshot with %d documents from %s", len(documents), path)
+    return len(documents)
+
+
+def get_snapshot_document(url: str) -> Optional[str]:
+    """Returns the snapshot text for `url`, or None if the snapshot does not cover it."""
+    global _hits
+    text = _documents.get(url)
+    if text is not None:
+        _hits += 1
+    return text
+
+
+def covers(url: str) -> bool:
+    """Whether the loaded snapshot has a text for `url` (without counting a hit)."""
+    return url in _documents
+
+
+def unload_snapshot() -> None:
+    """Forgets the loaded snapshot, so every document is scraped live."""
+    global _documents, _snapshot_info, _hits
+    _documents = {}
+    _snapshot_info = {"loaded": False}
+    _hits = 0
+
+
+def get_snapshot_stats() -> Dict[str, Any]:
+    return {**_snapshot_info, "hits": _hits}
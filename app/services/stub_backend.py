@@ -0,0 +1,180 @@
+import asyncio
+import json
+import random
+import re
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Optional, Sequence
+
+from app.core import config
+from app.services.llm_backend import LLMBackend, LLMResponse
+from app.utils.admission import OverloadedError
+
+# Rough conversion used for simulated usage and pacing.
+CHARS_PER_TOKEN = 4
+
+_QUESTION = re.compile(r"<question>(.*?)</question>", re.DOTALL)
+_QUESTION_ID = re.compile(r'<question id="(\d+)">')
+
+ERROR_KINDS = ("error", "blocked", "invalid_json", "rate_limited")
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    Turns a latency spec such as "fixed:0.05", "uniform:0.2,1.5",
+    "normal:0.8,0.2" or "lognormal:-0.5,0.6" into a sampler of seconds.
+    """
+    kind, _, raw_params = spec.partition(":")
+    params = [float(p) for p in raw_params.split(",") if p.strip()]
+    samplers = {
+        "fixed": lambda: params[0],
+        "uniform": lambda: rng.uniform(params[0], params[1]),
+        "normal": lambda: rng.gauss(params[0], params[1]),
+        "lognormal": lambda: rng.lognormvariate(params[0], params[1]),
+    }
+    expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+    if kind not in samplers or len(params) != expected[kind]:
+        raise ValueError(f"Invalid latency spec '{spec}'.")
+    sampler = samplers[kind]
+    return lambda: max(0.0, sampler())
+
+
+def _default_analysis(prompt: str) -> dict:
+    questions = [q.strip() for q in _QUESTION.findall(prompt)]
+    return {
+        "analysis": "## Overview\n\nThis is a **stub analysis** generated locally, without calling a real model.",
+        "answered_questions": [
+            {"question": q, "answer": "The provided text does not contain a direct answer to this question."}
+            for q in questions
+        ],
+    }
+
+
+def _default_follow_up(prompt: str) -> dict:
+    return {"answer": "This is a stub answer generated locally, without calling a real model."}
+
+
+def _default_multi_follow_up(prompt: str) -> dict:
+    return {
+        "answers": [
+            {"id": int(i), "answer": f"This is a stub answer to question {i}, generated locally."}
+            for i in _QUESTION_ID.findall(prompt)
+        ]
+    }
+
+
+class StubBackend(LLMBackend):
+    """
+    A deterministic local stand-in for a real model.
+
+    It returns canned JSON shaped like the real outputs (analyses echo the
+    questions found in the prompt), with configurable latency to first token,
+    output token rate and injected failures. A fixed seed makes every run
+    reproducible, so tests and load tests can exercise the full request path
+    offline at high request rates.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        error_kinds: Sequence[str] = ("error",),
+        responses: Optional[Dict[str, dict]] = None,
+        seed: int = 0,
+        model_latency: Optional[Dict[str, str]] = None,
+    ):
+        unknown = set(error_kinds) - set(ERROR_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown stub error kinds: {sorted(unknown)}")
+        self._rng = random.Random(seed)
+        self._latency = parse_latency(latency, self._rng)
+        self._model_latency = {m: parse_latency(spec, self._rng) for m, spec in (model_latency or {}).items()}
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_kinds = list(error_kinds)
+        self.responses = responses or {}
+        self.call_count = 0
+        # The most recent calls (prompt as text), for tests to inspect.
+        self.recent_calls: Deque[LLMResponse] = deque(maxlen=100)
+
+    @classmethod
+    def from_config(cls) -> "StubBackend":
+        responses = None
+        if config.LLM_STUB_RESPONSES_PATH:
+            with open(config.LLM_STUB_RESPONSES_PATH, "r") as f:
+                responses = json.load(f)
+        return cls(
+            latency=config.LLM_STUB_LATENCY,
+            tokens_per_second=config.LLM_STUB_TOKENS_PER_SECOND,
+            error_rate=config.LLM_STUB_ERROR_RATE,
+            error_kinds=[k.strip() for k in config.LLM_STUB_ERROR_KINDS.split(",") if k.strip()],
+            responses=responses,
+            seed=config.LLM_STUB_SEED,
+            model_latency=dict(
+                entry.strip().split("=", 1) for entry in config.LLM_STUB_MODEL_LATENCY.split(";") if entry.strip()
+            ),
+        )
+
+    def _canned_text(self, prompt: str) -> str:
+        if '"answered_questions"' in prompt:
+            payload = self.responses.get("analysis") or _default_analysis(prompt)
+        elif '"answers"' in prompt:
+            payload = self.responses.get("follow_up_multi") or _default_multi_follow_up(prompt)
+        else:
+            payload = self.responses.get("follow_up") or _default_follow_up(prompt)
+        return json.dumps(payload)
+
+    def _plan(self, model: str, prompt: str) -> LLMResponse:
+        """Decides the outcome of one call: the canned response or an injected failure."""
+        self.call_count += 1
+        self.recent_calls.append(LLMResponse(text=prompt, model=model))
+        failure = self._rng.choice(self.error_kinds) if self._rng.random() < self.error_rate else None
+        if failure == "error":
+            raise RuntimeError("Injected stub backend failure.")
+        if failure == "rate_limited":
+            raise OverloadedError("Injected stub rate limit.", retry_after=1.0)
+        if failure == "blocked":
+            return LLMResponse(text="", model=model, blocked_reason="SAFETY")
+
+        text = self._canned_text(prompt)
+        if failure == "invalid_json":
+            text = text[: len(text) // 2]
+        return LLMResponse(
+            text=text,
+            model=model,
+            prompt_tokens=len(prompt) // CHARS_PER_TOKEN + 1,
+            response_tokens=len(text) // CHARS_PER_TOKEN + 1,
+        )
+
+    def _first_token_seconds(self, model: str) -> float:
+        return self._model_latency.get(model, self._latency)()
+
+    def _generation_seconds(self, text: str) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return (len(text) / CHARS_PER_TOKEN) / self.tokens_per_second
+
+    async def generate(self, model: str, prompt: str, json_mode: bool = True) -> LLMResponse:
+        await asyncio.sleep(self._first_token_seconds(model))
+        response = self._plan(model, prompt)
+        await asyncio.sleep(self._generation_seconds(response.text))
+        return response
+
+    async def stream(self, model: str, prompt: str, json_mode: bool = True) -> AsyncIterator[LLMResponse]:
+        await asyncio.sleep(self._first_token_seconds(model))
+        response = self._plan(model, prompt)
+        if response.blocked_reason:
+            yield response
+            return
+
+        # Emit roughly eight tokens per chunk, paced at the configured token rate.
+        chunk_chars = 8 * CHARS_PER_TOKEN
+        text = response.text
+        for start in range(0, len(text), chunk_chars):
+            piece = text[start:start + chunk_chars]
+            await asyncio.sleep(self._generation_seconds(piece))
+            yield LLMResponse(text=piece, model=model)
+        # Usage arrives with the final chunk, as with the real API.
+        yield LLMResponse(text="", model=model, prompt_tokens=response.prompt_tokens, response_tokens=response.response_tokens)
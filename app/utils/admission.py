@@ -0,0 +1,144 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict
+
+
+class OverloadedError(RuntimeError):
+    """
+    Raised when work is rejected to protect an upstream dependency.
+    `retry_after` is a hint, in seconds, for when the client may try again.
+    """
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds concurrent calls to one upstream with a bounded FIFO wait queue.
+
+    Up to `max_concurrency` callers hold a slot at once. Further callers wait
+    in line, at most `max_queue` of them, each for at most `queue_timeout`
+    seconds. Anyone beyond that is rejected immediately with OverloadedError,
+    so a spike fails fast instead of every request timing out together.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Exponentially weighted average of how long a slot is held, for Retry-After hints.
+        self._average_hold = 1.0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def saturated(self) -> bool:
+        """True when every slot is taken, so a new call would queue or be rejected."""
+        return self._active >= self.max_concurrency or bool(self._waiters)
+
+    def retry_after(self) -> int:
+        """Estimates, in whole seconds, when a slot is likely to be free."""
+        backlog = (len(self._waiters) + 1) / self.max_concurrency
+        return max(1, math.ceil(backlog * self._average_hold))
+
+    def _reject(self, reason: str) -> OverloadedError:
+        return OverloadedError(f"The AI service is busy ({self.name}: {reason}). Please retry shortly.", self.retry_after())
+
+    async def _acquire(self) -> None:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise self._reject("queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            # A slot handed to us just as the wait timed out would otherwise leak.
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            self.timed_out += 1
+            raise self._reject("queue timeout")
+        except asyncio.CancelledError:
+            # If a slot was handed to us just as we were cancelled, pass it on.
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand our slot straight to the next caller in line.
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Holds one of the controller's slots for the duration of the block."""
+        queued_at = time.monotonic()
+        await self._acquire()
+        started_at = time.monotonic()
+        wait = started_at - queued_at
+        self.admitted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        try:
+            yield
+        finally:
+            self._average_hold = 0.8 * self._average_hold + 0.2 * (time.monotonic() - started_at)
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "queue_depth": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "average_wait_ms": round(self.total_wait / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+def parse_admission_limits(spec: str) -> Dict[str, tuple]:
+    """
+    Parses "model=concurrency:queue:timeout,..." into {model: (concurrency, queue, timeout)}.
+    """
+    limits = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        model, _, values = entry.strip().rpartition("=")
+        parts = values.split(":")
+        if not model or len(parts) != 3:
+            raise ValueError(f"Invalid admission limit '{entry.strip()}'. Expected 'model=concurrency:queue:timeout'.")
+        limits[model] = (int(parts[0]), int(parts[1]), float(parts[2]))
+    return limits
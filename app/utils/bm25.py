@@ -0,0 +1,55 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Words too common in legal text to help rank sections.
+STOPWORDS = frozenset(
+    "a an and any are as at be by for from has have in is it its may must not of on or "
+    "that the their this to was were which with what who does do how".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cases `text` and splits it into alphanumeric tokens, dropping stopwords."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    An in-memory Okapi BM25 ranker over a fixed list of pre-tokenized documents.
+    """
+
+    def __init__(self, documents: Sequence[Sequence[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._term_frequencies = [Counter(tokens) for tokens in documents]
+        self._lengths = [len(tokens) for tokens in documents]
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+        document_frequency: Counter = Counter()
+        for frequencies in self._term_frequencies:
+            document_frequency.update(frequencies.keys())
+        count = len(self._term_frequencies)
+        self._idf: Dict[str, float] = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._term_frequencies)
+
+    def scores(self, query_tokens: Sequence[str]) -> List[float]:
+        """Returns the BM25 score of every document for the given query tokens."""
+        terms = [term for term in set(query_tokens) if term in self._idf]
+        results = []
+        for frequencies, length in zip(self._term_frequencies, self._lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self._average_length) if self._average_length else self.k1
+            for term in terms:
+                tf = frequencies.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
@@ -0,0 +1,141 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class CacheEntry:
+    """A single cached value plus the metadata needed to revalidate it."""
+
+    __slots__ = ("value", "stored_at", "expires_at", "metadata", "size")
+
+    def __init__(self, value: Any, stored_at: float, expires_at: float, metadata: Dict[str, Any], size: int = 0):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.metadata = metadata
+        self.size = size
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+
+class LRUCache:
+    """
+    A size-bounded, TTL-aware LRU cache.
+
+    Stale entries are not dropped on read: callers can fetch them with
+    `get_entry` to revalidate (e.g. with a conditional GET) and then either
+    `refresh` them or overwrite them with `set`.
+
+    With `max_bytes` and a `sizeof` function, the cache also evicts least
+    recently used entries until the total size of its values fits.
+    `on_evict(key, entry)` is called for each entry evicted to make room.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        on_evict: Optional[Callable[[Hashable, CacheEntry], None]] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes requires a sizeof function.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._on_evict = on_evict
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def now(self) -> float:
+        """Returns the current time according to the cache's clock."""
+        return self._clock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the value for `key` if it is present and fresh, otherwise None."""
+        entry = self.get_entry(key)
+        if entry is None or not entry.is_fresh(self._clock()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.value
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Returns the entry for `key` (fresh or stale) and marks it as recently used."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None, **metadata: Any) -> CacheEntry:
+        """
+        Stores `value` under `key`, evicting the least recently used entries if
+        needed. `ttl_seconds` overrides the cache's TTL for this entry, e.g. to
+        keep the remaining lifetime of a value copied from another tier.
+        """
+        now = self._clock()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        entry = CacheEntry(value, now, now + ttl, metadata, self._sizeof(value) if self._sizeof else 0)
+        self.pop(key)
+        self._entries[key] = entry
+        self.total_bytes += entry.size
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes and len(self._entries) > 1
+        ):
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted.size
+            self.evictions += 1
+            if self._on_evict is not None:
+                self._on_evict(evicted_key, evicted)
+        return entry
+
+    def refresh(self, key: Hashable, **metadata: Any) -> Optional[CacheEntry]:
+        """Restarts the TTL of an existing entry, optionally updating its metadata."""
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        now = self._clock()
+        entry.stored_at = now
+        entry.expires_at = now + self.ttl_seconds
+        entry.metadata.update({k: v for k, v in metadata.items() if v is not None})
+        return entry
+
+    def pop(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            **({"bytes": self.total_bytes, "max_bytes": self.max_bytes} if self.max_bytes is not None else {}),
+        }
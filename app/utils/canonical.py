@@ -0,0 +1,59 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+from app.models.schemas import AnalysisRequest
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize_text(value: Optional[str]) -> Optional[str]:
+    """Collapses whitespace and case so trivially different inputs compare equal."""
+    if value is None:
+        return None
+    normalized = _WHITESPACE.sub(" ", value).strip().casefold()
+    return normalized or None
+
+
+def canonicalize_analysis_request(request: AnalysisRequest) -> Dict[str, Any]:
+    """
+    Reduces an AnalysisRequest to the fields that affect the generated analysis,
+    normalized so that equivalent requests produce identical dictionaries.
+    """
+    questions = [_normalize_text(q) for q in request.follow_up_questions]
+    return {
+        "chapter_url": str(request.chapter_url),
+        "explanation_scope": request.explanation_scope.value,
+        "analysis_role": _normalize_text(request.analysis_role),
+        "target_audience": _normalize_text(request.target_audience),
+        "follow_up_questions": [q for q in questions if q],
+    }
+
+
+def analysis_request_key(request: AnalysisRequest) -> str:
+    """A stable hex digest identifying the canonical form of an AnalysisRequest."""
+    canonical = json.dumps(canonicalize_analysis_request(request), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def canonical_analysis_query(chapter_id: int, request: AnalysisRequest) -> str:
+    """
+    The query string of `GET /api/analyze` for a chapter's AnalysisRequest, in
+    canonical form: fixed parameter order, normalized text, no empty values.
+    Equivalent requests share one URL, and so one entry in shared caches.
+    """
+    canonical = canonicalize_analysis_request(request)
+    params = {
+        "chapter_id": chapter_id,
+        "scope": canonical["explanation_scope"],
+        "role": canonical["analysis_role"],
+        "audience": canonical["target_audience"],
+    }
+    return urlencode({name: value for name, value in params.items() if value is not None})
+
+
+def document_hash(document_text: str) -> str:
+    """A stable hex digest of a document's cleaned text."""
+    return hashlib.sha256(document_text.encode("utf-8")).hexdigest()
@@ -0,0 +1,115 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+MODES = ("off", "record", "replay", "auto")
+LATENCIES = ("zero", "original")
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode for a request that has no recorded response."""
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """A stable hex digest of a request, used as its address in the store."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """
+    A content-addressed store of recorded responses, one gzipped JSON file
+    per request at `<directory>/<kind>/<key[:2]>/<key>.json.gz`, where the
+    key is the hash of the request.
+
+    Modes:
+        record  always call through and (re)record the response
+        replay  only serve recorded responses; a miss raises CassetteMissError
+        auto    serve recorded responses, record the ones that are missing
+
+    With latency "original", replays wait as long as the recorded call took,
+    so timing-sensitive code behaves as it did live; "zero" replays at once.
+    """
+
+    def __init__(self, directory: str, mode: str = "auto", latency: str = "zero"):
+        if mode not in MODES or mode == "off":
+            raise ValueError(f"Unknown cassette mode '{mode}'. Expected 'record', 'replay' or 'auto'.")
+        if latency not in LATENCIES:
+            raise ValueError(f"Unknown cassette latency '{latency}'. Expected 'zero' or 'original'.")
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, key[:2], f"{key}.json.gz")
+
+    async def lookup(self, request: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Returns the request's key and its recorded entry, or None when the
+        caller should go live (and `save` the result under that key). The
+        file is read in a worker thread, off the event loop.
+
+        Raises:
+            CassetteMissError: In replay mode, if nothing was recorded.
+        """
+        key = request_key(request)
+        if self.mode == "record":
+            return key, None
+        entry = await asyncio.to_thread(self._read, self._path(request["kind"], key))
+        if entry is None:
+            self.misses += 1
+            if self.mode == "replay":
+                summary = request.get("url") or request.get("model")
+                raise CassetteMissError(f"No cassette recorded for this {request['kind']} request ({summary}, key {key[:12]}).")
+            return key, None
+        self.hits += 1
+        return key, entry
+
+    async def save(self, key: str, request: Dict[str, Any], response: Any, elapsed: float) -> None:
+        """
+        Records `response` for the request with `key`, in a worker thread.
+        `request` is stored alongside for reference.
+        """
+        entry = {"request": request, "response": response, "elapsed": round(elapsed, 4), "recorded_at": time.time()}
+        await asyncio.to_thread(self._write, self._path(request["kind"], key), entry)
+        self.recorded += 1
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write(path: str, entry: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so a crash never leaves a torn cassette.
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(temporary, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temporary, path)
+
+    async def wait(self, seconds: float) -> None:
+        """Sleeps for a recorded duration when replaying with the original latency."""
+        if self.latency == "original" and seconds > 0:
+            await asyncio.sleep(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "latency": self.latency,
+            "directory": self.directory,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
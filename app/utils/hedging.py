@@ -0,0 +1,142 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Hedger:
+    """
+    Cuts tail latency by racing a backup call against a slow primary one.
+
+    The primary call starts immediately. If it has not finished after the
+    hedge delay, a second (hedge) call is started and whichever of the two
+    first returns successfully wins; the other is cancelled. The delay is the
+    given percentile of recent primary latencies (a primary cancelled before
+    it finished counts with its elapsed time), or `default_delay` until
+    `min_samples` have been seen. At most `budget_fraction` of calls may fire
+    a hedge, which bounds the extra cost.
+
+    Time a call spends queued for admission is not the model being slow: when
+    the caller signals admission, the delay (and the recorded latency) only
+    start once the primary is admitted, and no hedge is fired while the
+    caller reports that it is overloaded.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        default_delay: float = 20.0,
+        min_samples: int = 20,
+        window: int = 200,
+        budget_fraction: float = 0.1,
+    ):
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.budget_fraction = budget_fraction
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.fired = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self.overload_denied = 0
+
+    def delay(self) -> float:
+        """Seconds to wait for the primary call before firing a hedge."""
+        if len(self._latencies) < self.min_samples:
+            return self.default_delay
+        ordered = sorted(self._latencies)
+        rank = max(1, math.ceil(self.percentile * len(ordered)))
+        return ordered[rank - 1]
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]],
+        admitted: Optional[asyncio.Event] = None,
+        overloaded: Optional[Callable[[], bool]] = None,
+    ) -> T:
+        """
+        Returns the first successful result of `primary()` or, if the primary
+        is slow, of a hedged `hedge()` call. When both fail, the primary's
+        exception is raised.
+
+        If given, `admitted` is set by the primary once it holds its admission
+        slot, and the hedge delay is counted from then. `overloaded()` is
+        checked before firing a hedge, which is skipped while it is true.
+        """
+        self.calls += 1
+        started = time.monotonic()
+
+        async def timed_primary() -> T:
+            try:
+                result = await primary()
+            except asyncio.CancelledError:
+                # A cancelled primary (usually one that lost to a hedge) took at
+                # least this long. Dropping it would bias the percentile toward
+                # fast calls and fire hedges more often than intended, so its
+                # elapsed time is kept as a censored sample, unless it never
+                # got past admission.
+                if admitted is None or admitted.is_set():
+                    self.record(time.monotonic() - started)
+                raise
+            self.record(time.monotonic() - started)
+            return result
+
+        primary_task = asyncio.ensure_future(timed_primary())
+        hedge_task = None
+        try:
+            if admitted is not None:
+                admission = asyncio.ensure_future(admitted.wait())
+                try:
+                    await asyncio.wait({primary_task, admission}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    admission.cancel()
+                if primary_task.done():
+                    return primary_task.result()
+                started = time.monotonic()
+
+            done, _ = await asyncio.wait({primary_task}, timeout=self.delay())
+            if done:
+                return primary_task.result()
+            if overloaded is not None and overloaded():
+                self.overload_denied += 1
+                return await primary_task
+            if self.fired >= self.budget_fraction * self.calls:
+                self.budget_denied += 1
+                return await primary_task
+
+            self.fired += 1
+            hedge_task = asyncio.ensure_future(hedge())
+            pending = {primary_task, hedge_task}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            self.hedge_wins += 1
+                        return task.result()
+            return primary_task.result()
+        finally:
+            for task in (primary_task, hedge_task):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "fired": self.fired,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "overload_denied": self.overload_denied,
+            "fire_rate": round(self.fired / self.calls, 4) if self.calls else 0.0,
+            "win_rate": round(self.hedge_wins / self.fired, 4) if self.fired else 0.0,
+            "current_delay_seconds": round(self.delay(), 3),
+            "latency_samples": len(self._latencies),
+        }
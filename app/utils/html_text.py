@@ -0,0 +1,58 @@
+from typing import List, Optional
+
+from lxml import etree
+
+# Elements whose text makes up the readable content of a chapter page.
+TEXT_TAGS = ("p", "h1", "h2", "h3", "li")
+
+# Text anywhere inside these elements is not readable page text. BeautifulSoup
+# stores it as Script, Stylesheet, TemplateString, RubyTextString or
+# RubyParenthesisString, which `get_text` skips, so we skip it too.
+_NON_TEXT_ANCESTORS = ("script", "style", "template", "rt", "rp")
+
+# The main content container, with the same fallbacks as the BeautifulSoup path:
+# the first <div> with a "field" class, else the first <main>, else the <body>.
+_CONTAINERS = [
+    etree.XPath("(//div[contains(concat(' ', normalize-space(@class), ' '), ' field ')])[1]"),
+    etree.XPath("(//main)[1]"),
+    etree.XPath("(//body)[1]"),
+]
+
+_TEXT_ELEMENTS = etree.XPath("descendant::*[" + " or ".join(f"self::{tag}" for tag in TEXT_TAGS) + "]")
+
+# Text nodes (an element's own text and its children's tails) beneath an
+# element. Comments and processing instructions are not text nodes in XPath.
+_TEXT_NODES = etree.XPath(
+    "descendant::text()[not(" + " or ".join(f"ancestor::{tag}" for tag in _NON_TEXT_ANCESTORS) + ")]",
+    smart_strings=False,
+)
+
+
+def extract_text_blocks(html: str) -> Optional[List[str]]:
+    """
+    Extracts the text of every p/h1/h2/h3/li element in the main content
+    container, in document order, or returns None when there is no container.
+
+    Works directly on the lxml tree and matches BeautifulSoup's
+    `find_all(TEXT_TAGS)` plus `get_text(separator=' ', strip=True)` output
+    exactly, including text repeated by nested matches (e.g. <p> in <li>).
+    """
+    # Parsers are not thread-safe, and this may run in a worker thread, so each call gets its own.
+    root = etree.fromstring(html.encode("utf-8"), etree.HTMLParser(encoding="utf-8")) if html.strip() else None
+    if root is None:
+        return None
+
+    container = None
+    for find in _CONTAINERS:
+        found = find(root)
+        if found:
+            container = found[0]
+            break
+    if container is None:
+        return None
+
+    blocks = []
+    for element in _TEXT_ELEMENTS(container):
+        strings = (text.strip() for text in _TEXT_NODES(element))
+        blocks.append(" ".join(text for text in strings if text))
+    return blocks
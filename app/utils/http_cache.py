@@ -0,0 +1,30 @@
+import hashlib
+from typing import Optional
+
+
+def entity_tag(*parts: str) -> str:
+    """A strong, quoted ETag that changes whenever any of `parts` does."""
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """
+    True when an If-None-Match header matches `etag`, i.e. the client's copy
+    is current and a 304 can be sent instead of the body.
+
+    Follows RFC 9110: `*` matches anything, the header may list several tags,
+    and the comparison is weak, so `W/"x"` matches `"x"`.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def cache_control(max_age: int, shared_max_age: int) -> str:
+    """A Cache-Control value letting browsers keep a response for `max_age`
+    seconds and shared caches (CDNs, proxies) for `shared_max_age`."""
+    return f"public, max-age={max_age}, s-maxage={shared_max_age}"
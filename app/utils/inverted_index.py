@@ -0,0 +1,229 @@
+import heapq
+import html
+import math
+import re
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.bm25 import STOPWORDS
+
+# Same tokens as app.utils.bm25, but matched on the original text so that
+# each token keeps its character offsets for highlighting.
+_TOKEN = re.compile(r"[A-Za-z0-9]+")
+_PHRASE = re.compile(r'"([^"]*)"')
+
+
+class SearchQuery:
+    """A parsed query: quoted phrases that must all match, plus free terms that rank."""
+
+    __slots__ = ("phrases", "terms", "_highlight")
+
+    def __init__(self, phrases: List[List[str]], terms: List[str]):
+        self.phrases = phrases
+        self.terms = terms
+        self._highlight: Optional[re.Pattern] = None
+
+    @classmethod
+    def parse(cls, query: str) -> "SearchQuery":
+        phrases = []
+        for match in _PHRASE.finditer(query):
+            tokens = [token.lower() for token in _TOKEN.findall(match.group(1))]
+            if tokens:
+                phrases.append(tokens)
+        rest = _PHRASE.sub(" ", query)
+        terms = [token.lower() for token in _TOKEN.findall(rest) if token.lower() not in STOPWORDS]
+        return cls(phrases, terms)
+
+    def scoring_terms(self) -> List[str]:
+        """The distinct non-stopword terms of the query, phrases included."""
+        terms = [token for phrase in self.phrases for token in phrase if token not in STOPWORDS] + self.terms
+        return list(dict.fromkeys(terms))
+
+    def highlight_pattern(self) -> Optional[re.Pattern]:
+        """A compiled pattern matching any scoring term as a whole token, or None."""
+        terms = self.scoring_terms()
+        if self._highlight is None and terms:
+            alternatives = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+            self._highlight = re.compile(rf"(?<![A-Za-z0-9])(?:{alternatives})(?![A-Za-z0-9])", re.IGNORECASE)
+        return self._highlight
+
+    def __bool__(self) -> bool:
+        return bool(self.phrases or self.terms)
+
+
+class SearchHit:
+    __slots__ = ("doc_id", "score", "fields")
+
+    def __init__(self, doc_id: int, score: float, fields: Dict[str, Any]):
+        self.doc_id = doc_id
+        self.score = score
+        self.fields = fields
+
+
+class InvertedIndex:
+    """
+    A positional inverted index with BM25 ranking.
+
+    Every token is indexed with its position (stopwords included, so phrases
+    like "freedom of expression" match exactly); stopwords are ignored when
+    ranking. Postings are compact `array("I")` position lists keyed by
+    document id, so the index stays small and is built once.
+
+    Documents are added with their text plus arbitrary `fields` that are
+    returned with each hit (e.g. the chapter and section they came from).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, array]] = {}
+        self._texts: List[str] = []
+        self._fields: List[Dict[str, Any]] = []
+        self._lengths: List[int] = []
+        self._total_length = 0
+        self._token_count = 0
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    def add(self, text: str, **fields: Any) -> int:
+        """Indexes `text` and returns its document id."""
+        doc_id = len(self._texts)
+        postings = self._postings
+        position = length = 0
+        for position, match in enumerate(_TOKEN.finditer(text), 1):
+            term = match.group().lower()
+            by_doc = postings.get(term)
+            if by_doc is None:
+                by_doc = postings[term] = {}
+            positions = by_doc.get(doc_id)
+            if positions is None:
+                positions = by_doc[doc_id] = array("I")
+            positions.append(position - 1)
+            if term not in STOPWORDS:
+                length += 1
+        self._texts.append(text)
+        self._fields.append(fields)
+        self._lengths.append(length)
+        self._total_length += length
+        self._token_count += position
+        return doc_id
+
+    def text(self, doc_id: int) -> str:
+        return self._texts[doc_id]
+
+    def _idf(self, term: str) -> float:
+        count = len(self._texts)
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (count - df + 0.5) / (df + 0.5))
+
+    def _phrase_documents(self, phrase: Sequence[str]) -> set:
+        """Ids of the documents containing the tokens of `phrase` consecutively."""
+        postings = [self._postings.get(token) for token in phrase]
+        if not all(postings):
+            return set()
+        # Check the rarest token's documents first.
+        candidates = set(min(postings, key=len))
+        for by_doc in postings:
+            candidates.intersection_update(by_doc)
+            if not candidates:
+                return candidates
+        if len(phrase) == 1:
+            return candidates
+
+        matches = set()
+        for doc_id in candidates:
+            following = [set(by_doc[doc_id]) for by_doc in postings[1:]]
+            for start in postings[0][doc_id]:
+                if all(start + offset + 1 in positions for offset, positions in enumerate(following)):
+                    matches.add(doc_id)
+                    break
+        return matches
+
+    def search(self, query: SearchQuery, limit: int = 10, where: Optional[Dict[str, Any]] = None) -> Tuple[List[SearchHit], int]:
+        """
+        Returns the `limit` best hits for `query` and the total number of
+        matching documents. A document matches when it contains every phrase
+        and, if there are free terms, at least one of them. `where` keeps only
+        documents whose fields equal the given values.
+        """
+        if not query or not self._texts:
+            return [], 0
+
+        candidates: Optional[set] = None
+        for phrase in query.phrases:
+            found = self._phrase_documents(phrase)
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return [], 0
+
+        if query.terms:
+            with_terms = set()
+            for term in query.terms:
+                with_terms.update(self._postings.get(term, ()))
+            candidates = with_terms if candidates is None else candidates & with_terms
+        if where:
+            candidates = {d for d in candidates if all(self._fields[d].get(k) == v for k, v in where.items())}
+        if not candidates:
+            return [], 0
+
+        average_length = self._total_length / len(self._texts) or 1.0
+        scores = dict.fromkeys(candidates, 0.0)
+        for term in query.scoring_terms():
+            by_doc = self._postings.get(term)
+            if not by_doc:
+                continue
+            idf = self._idf(term)
+            # Walk whichever side is smaller: the term's postings or the candidates.
+            if len(by_doc) < len(candidates):
+                matched = ((d, p) for d, p in by_doc.items() if d in scores)
+            else:
+                matched = ((d, by_doc[d]) for d in candidates if d in by_doc)
+            for doc_id, positions in matched:
+                tf = len(positions)
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        # Highest score first; earlier documents win ties so results are stable.
+        ranked = heapq.nsmallest(limit, scores, key=lambda d: (-scores[d], d))
+        return [SearchHit(d, scores[d], self._fields[d]) for d in ranked], len(candidates)
+
+    def snippet(self, doc_id: int, query: SearchQuery, width: int = 240) -> str:
+        """
+        Returns an HTML-escaped excerpt of about `width` characters around the
+        first match, with matched terms wrapped in <mark> tags.
+        """
+        text = self._texts[doc_id]
+        pattern = query.highlight_pattern()
+        first = pattern.search(text) if pattern else None
+        window_start = max(0, first.start() - width // 4) if first else 0
+        window_end = min(len(text), window_start + width)
+        # Widen to token boundaries so the excerpt does not cut words in half.
+        while window_start > 0 and text[window_start - 1].isalnum():
+            window_start -= 1
+        while window_end < len(text) and text[window_end].isalnum():
+            window_end += 1
+
+        parts = ["…"] if window_start > 0 else []
+        cursor = window_start
+        spans = [m.span() for m in pattern.finditer(text, window_start, window_end)] if pattern else []
+        for start, end in spans:
+            parts.append(html.escape(text[cursor:start]))
+            parts.append("<mark>" + html.escape(text[start:end]) + "</mark>")
+            cursor = end
+        parts.append(html.escape(text[cursor:window_end]))
+        if window_end < len(text):
+            parts.append("…")
+        return "".join(parts).replace("\n", " ")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self._texts),
+            "terms": len(self._postings),
+            "postings": sum(len(by_doc) for by_doc in self._postings.values()),
+            "tokens": self._token_count,
+        }
@@ -0,0 +1,108 @@
+import random
+import zlib
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Set, Tuple
+
+# A Mersenne prime larger than any 32-bit shingle hash.
+_PRIME = (1 << 61) - 1
+
+
+def char_shingles(tokens: Iterable[str], size: int = 3) -> FrozenSet[int]:
+    """
+    Hashes the character n-grams of each token (padded with "#" so short
+    tokens and word boundaries count). The result ignores word order, and
+    small inflections such as "limit"/"limits" still share most shingles.
+    """
+    shingles = set()
+    for token in tokens:
+        padded = f"#{token}#"
+        for i in range(max(1, len(padded) - size + 1)):
+            shingles.add(zlib.crc32(padded[i:i + size].encode("utf-8")))
+    return frozenset(shingles)
+
+
+def word_shingles(tokens: Iterable[str], size: int = 2, weight: int = 1) -> FrozenSet[int]:
+    """
+    Hashes the n-grams of consecutive tokens, so that word order counts:
+    "president dismiss parliament" and "parliament dismiss president" share
+    none. Each n-gram yields `weight` distinct hashes, to give order more
+    say next to the (more numerous) character shingles.
+    """
+    tokens = list(tokens)
+    shingles = set()
+    for i in range(len(tokens) - size + 1):
+        gram = " ".join(tokens[i:i + size])
+        for copy in range(weight):
+            shingles.add(zlib.crc32(f"{copy}|{gram}".encode("utf-8")))
+    return frozenset(shingles)
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashLSH:
+    """
+    Finds sets that are probably similar to a query set without comparing it
+    to every stored set.
+
+    Each set gets a MinHash signature of `num_perm` values, split into `bands`
+    bands; sets that agree on every value of at least one band share a bucket
+    and become candidates. Candidates are then scored by their exact Jaccard
+    similarity, so the signatures only decide what is worth comparing.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self._rows = num_perm // bands
+        rng = random.Random(seed)
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._sets: Dict[Hashable, Tuple[FrozenSet[int], Tuple[int, ...]]] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._sets
+
+    def signature(self, shingles: FrozenSet[int]) -> Tuple[int, ...]:
+        if not shingles:
+            return (0,) * self.num_perm
+        return tuple(min((a * s + b) % _PRIME for s in shingles) for a, b in self._permutations)
+
+    def _bands(self, signature: Tuple[int, ...]):
+        rows = self._rows
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows]
+
+    def add(self, key: Hashable, shingles: FrozenSet[int]) -> None:
+        self.remove(key)
+        signature = self.signature(shingles)
+        self._sets[key] = (shingles, signature)
+        for bucket in self._bands(signature):
+            self._buckets.setdefault(bucket, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        stored = self._sets.pop(key, None)
+        if stored is None:
+            return
+        for bucket in self._bands(stored[1]):
+            keys = self._buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[bucket]
+
+    def query(self, shingles: FrozenSet[int]) -> List[Tuple[Hashable, float]]:
+        """Returns the candidate keys with their exact Jaccard similarity, most similar first."""
+        candidates: Set[Hashable] = set()
+        for bucket in self._bands(self.signature(shingles)):
+            candidates.update(self._buckets.get(bucket, ()))
+        scored = [(key, jaccard(shingles, self._sets[key][0])) for key in candidates]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored
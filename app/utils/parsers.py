@@ -1,10 +1,222 @@
 import json
+import logging
 import re
+from typing import Iterator, List, Optional, Tuple
 
-def extract_json_from_string(text: str) -> dict | None:
+logger = logging.getLogger(__name__)
+
+# A complete JSON string literal. The alternatives start with different
+# characters, so a failed match backtracks at most once per character.
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+# The characters that change the structure of a JSON document.
+_STRUCTURE = re.compile(r'["{}\[\]:,]')
+_CONTROL = re.compile(r"[\x00-\x1f]")
+_LITERAL = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null")
+# A lone backslash or an incomplete \u escape at the end of a cut-off string.
+_PARTIAL_ESCAPE = re.compile(r"(?<!\\)((?:\\\\)*)\\(?:u[0-9a-fA-F]{0,3})?$")
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+
+
+def _escape_control(match: re.Match) -> str:
+    char = match.group()
+    return _CONTROL_ESCAPES.get(char, f"\\u{ord(char):04x}")
+
+
+def find_json_spans(text: str) -> Iterator[Tuple[int, int, bool]]:
+    """
+    Yields `(start, end, complete)` for each top-level `{...}` in `text`, in
+    order. Braces inside string literals are skipped, and a span that is never
+    closed runs to the end of the text with `complete` False.
+
+    Each character is looked at once, so the scan is linear in `len(text)`.
+    """
+    start = text.find("{")
+    while start != -1:
+        depth = 0
+        position = start
+        end = None
+        while end is None:
+            token = _STRUCTURE.search(text, position)
+            if token is None:
+                break
+            char = token.group()
+            if char == '"':
+                string = _STRING.match(text, token.start())
+                if string is None:
+                    break
+                position = string.end()
+                continue
+            position = token.end()
+            if char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+                if depth == 0:
+                    end = position
+        if end is None:
+            yield start, len(text), False
+            return
+        yield start, end, True
+        start = text.find("{", end)
+
+
+class _Level:
+    """An open object or array while repairing."""
+
+    __slots__ = ("bracket", "state", "opened_at", "complete_at")
+
+    def __init__(self, bracket: str, opened_at: int):
+        self.bracket = bracket
+        # "key" (an object expecting a key), "colon", "value" or "after" (a member is complete)
+        self.state = "key" if bracket == "{" else "value"
+        self.opened_at = opened_at
+        # Where the output can be cut to keep only complete members.
+        self.complete_at = opened_at + 1
+
+
+def repair_json(fragment: str) -> str:
+    """
+    Rewrites a damaged JSON object so that it can be decoded, fixing the
+    defects models commonly produce:
+
+    - raw newlines, tabs and other control characters inside strings
+    - trailing commas before `}` or `]`
+    - truncation: an unterminated string value is closed, a dangling key,
+      colon, comma or cut-off literal is dropped (along with a container it
+      leaves empty), a cut-off element of an array is dropped, and open
+      containers are closed in order
+
+    `fragment` should start at the object's opening brace. Defects it does not
+    know about (e.g. unquoted keys) are left alone, so callers must still
+    decode the result.
+    """
+    out: List[str] = []
+    length = 0
+    stack: List[_Level] = []
+    position = 0
+
+    def emit(piece: str) -> None:
+        nonlocal length
+        out.append(piece)
+        length += len(piece)
+
+    def cut(to: int) -> None:
+        nonlocal out, length
+        text = "".join(out)[:to]
+        out, length = [text], len(text)
+
+    while True:
+        token = _STRUCTURE.search(fragment, position)
+        if token is None:
+            break
+        char = token.group()
+        gap = fragment[position:token.start()]
+
+        if char in "}]":
+            # `gap` is outside any string, so a trailing comma before it can be dropped.
+            if not gap.strip() and out and out[-1] == ",":
+                out.pop()
+                length -= 1
+            emit(gap + char)
+            position = token.end()
+            if stack:
+                stack.pop()
+            if not stack:
+                return "".join(out)
+            stack[-1].state = "after"
+            continue
+
+        emit(gap)
+        position = token.start()
+        if gap.strip() and stack and stack[-1].state == "value":
+            stack[-1].state = "after"
+
+        if char == '"':
+            string = _STRING.match(fragment, position)
+            if string is None:
+                break
+            if stack and stack[-1].state == "key":
+                stack[-1].state = "colon"
+            elif stack and stack[-1].state == "value":
+                stack[-1].state = "after"
+            emit(_CONTROL.sub(_escape_control, string.group()))
+            position = string.end()
+            continue
+
+        position = token.end()
+        if char in "{[":
+            stack.append(_Level(char, length))
+            emit(char)
+        elif char == ":":
+            emit(char)
+            if stack:
+                stack[-1].state = "value"
+        elif char == ",":
+            if stack:
+                stack[-1].complete_at = length
+                stack[-1].state = "key" if stack[-1].bracket == "{" else "value"
+            emit(char)
+
+    # The fragment ended inside a container: it was truncated.
+    element = next((i for i in range(1, len(stack)) if stack[i - 1].bracket == "["), None)
+    if element is not None:
+        # A cut-off object or array inside an array is likely missing required
+        # fields, so keep only the array's complete elements.
+        del stack[element:]
+        cut(stack[-1].complete_at)
+    elif stack:
+        level = stack[-1]
+        tail = fragment[position:]
+        if tail.startswith('"') and level.state == "value":
+            content = _PARTIAL_ESCAPE.sub(r"\1", tail[1:])
+            emit('"' + _CONTROL.sub(_escape_control, content) + '"')
+            level.state = "after"
+        elif level.state == "value" and _LITERAL.fullmatch(tail.strip()):
+            emit(tail.strip())
+            level.state = "after"
+        if level.state != "after":
+            cut(level.complete_at)
+            # A container left empty by the cut was itself cut off; drop it too.
+            if level.complete_at == level.opened_at + 1 and len(stack) > 1:
+                stack.pop()
+                cut(stack[-1].complete_at)
+    for level in reversed(stack):
+        emit("}" if level.bracket == "{" else "]")
+    return "".join(out)
+
+
+def iter_json_objects(text: str) -> Iterator[Tuple[dict, str]]:
+    """
+    Yields each JSON object found in `text` (e.g. inside a Markdown code block
+    or surrounded by prose), with how it was obtained: "extracted" if it
+    decoded as-is, "repaired" if it needed `repair_json` first.
+    """
+    if not text:
+        return
+    for start, end, complete in find_json_spans(text):
+        candidate = text[start:end]
+        if complete:
+            try:
+                value = json.loads(candidate)
+            except ValueError:
+                pass
+            else:
+                if isinstance(value, dict):
+                    yield value, "extracted"
+                continue
+        try:
+            value = json.loads(repair_json(candidate))
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            yield value, "repaired"
+
+
+def extract_json_from_string(text: str) -> Optional[dict]:
     """
     Finds and parses the first valid JSON object from a string,
-    even if it's embedded in a Markdown code block.
+    even if it's embedded in a Markdown code block, followed by prose,
+    or slightly malformed (see `repair_json`).
 
     Args:
         text: The string potentially containing a JSON object.
@@ -12,30 +224,8 @@ def extract_json_from_string(text: str) -> dict | None:
     Returns:
         A dictionary if a JSON object is found and parsed, otherwise None.
     """
-    if not text:
-        return None
-
-    # This regex pattern looks for a Markdown JSON code block ```json ... ```
-    # It uses a non-greedy match `(.+?)` to find the first complete block.
-    match = re.search(r"```json\s*(\{.*?\})\s*```", text, re.DOTALL)
-    
-    json_string = ""
-    if match:
-        json_string = match.group(1)
-    else:
-        # If no Markdown block is found, assume the whole string might be JSON,
-        # or a JSON object might start with '{'.
-        start_index = text.find('{')
-        if start_index != -1:
-            json_string = text[start_index:]
-    
-    if not json_string:
-        return None
-
-    try:
-        # Attempt to parse the extracted string
-        return json.loads(json_string)
-    except json.JSONDecodeError:
-        # Handle cases where the extracted string is still not valid JSON
-        print("Warning: Failed to decode JSON from the extracted string.")
-        return None
\ No newline at end of file
+    for value, _ in iter_json_objects(text):
+        return value
+    if text:
+        logger.warning("Failed to decode JSON from the extracted string.")
+    return None
@@ -0,0 +1,97 @@
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from app.models.document import ChapterDocument, Item, Section, Subsection
+
+# A section heading block, e.g. "16. Freedom of expression" or "25A. Property".
+_SECTION_HEADING = re.compile(r"^(\d{1,3}[A-Z]?)\.\s+([^(\s].{0,150})$")
+# A subsection block, e.g. "(1) Everyone has the right ...".
+_SUBSECTION = re.compile(r"^\((\d{1,3}[A-Z]?)\)")
+# An item block, e.g. "(a) ..." or "(iv) ...".
+_ITEM = re.compile(r"^\(([a-z]{1,4})\)")
+
+_BLOCK_SEPARATOR = "\n\n"
+
+
+def _blocks(document_text: str) -> Iterator[Tuple[str, int, int]]:
+    """Yields each non-blank block of the text with its start and end offsets."""
+    start = 0
+    for block in document_text.split(_BLOCK_SEPARATOR):
+        end = start + len(block)
+        if block.strip():
+            yield block, start, end
+        start = end + len(_BLOCK_SEPARATOR)
+
+
+def _section_order(number: str) -> Tuple[int, str]:
+    return int(number.rstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ")), number.lstrip("0123456789")
+
+
+def _build_subsections(document_text: str, blocks: List[Tuple[str, int, int]]) -> List[Subsection]:
+    subsections: List[Subsection] = []
+    current: Optional[Subsection] = None
+    previous = None
+    for block, start, end in blocks:
+        stripped = block.strip()
+        if stripped == previous:
+            # A repeat of the block before it, from nested markup such as <li><p>...</p></li>.
+            current.end = end
+            continue
+        previous = stripped
+        subsection_match = _SUBSECTION.match(stripped)
+        if subsection_match or current is None:
+            current = Subsection(subsection_match.group(1) if subsection_match else None, "", start, end)
+            subsections.append(current)
+        item_match = _ITEM.match(stripped)
+        if item_match and not subsection_match:
+            current.items.append(Item(item_match.group(1), block, start, end))
+        current.end = end
+
+    for subsection in subsections:
+        subsection.text = document_text[subsection.start:subsection.end]
+    return subsections
+
+
+def parse_chapter_text(document_text: str, **chapter_fields) -> ChapterDocument:
+    """
+    Parses cleaned chapter text (blocks joined by blank lines) into a
+    ChapterDocument of numbered sections, subsections and items, each with
+    its offsets into `document_text`. A heading counts only if its number
+    follows the previous section's. Text before the first numbered heading
+    becomes an unnumbered "Introduction" section. `chapter_fields` (chapter_id,
+    title, url) are passed through to the document.
+    """
+    sections: List[Section] = []
+    number: Optional[str] = None
+    title = "Introduction"
+    heading: Optional[Tuple[str, int, int]] = None
+    body: List[Tuple[str, int, int]] = []
+
+    def close_section() -> None:
+        parts = ([heading] if heading else []) + body
+        if not parts:
+            return
+        start, end = parts[0][1], parts[-1][2]
+        sections.append(Section(number, title, document_text[start:end], start, end, _build_subsections(document_text, body)))
+
+    for block in _blocks(document_text):
+        match = _SECTION_HEADING.match(block[0].strip())
+        # Section numbers only ever increase, so e.g. a "1. ..." footnote is body text.
+        if match and (number is None or _section_order(match.group(1)) > _section_order(number)):
+            close_section()
+            number, title = match.group(1), match.group(2).strip()
+            heading, body = block, []
+        else:
+            body.append(block)
+    close_section()
+
+    return ChapterDocument(document_text, sections, **chapter_fields)
+
+
+def split_into_sections(document_text: str) -> List[Section]:
+    """
+    Splits cleaned chapter text (blocks joined by blank lines) into numbered
+    constitutional sections. Text before the first numbered heading becomes
+    an unnumbered introductory section.
+    """
+    return parse_chapter_text(document_text).sections
@@ -0,0 +1,230 @@
+import json
+from typing import Any, Iterable, List, Optional, Tuple
+
+# Events produced by IncrementalObjectParser.feed():
+#   ("string_delta", key, text)   newly decoded text of a top-level string value
+#   ("field", key, value)         a top-level value that has been fully received
+#   ("item", key, index, value)   an element of a top-level array that has been fully received
+#   ("end", object)               the closing brace of the top-level object
+Event = Tuple[Any, ...]
+
+_WHITESPACE = " \t\r\n"
+
+
+def _safe_string_end(raw: str, start: int, end: int) -> int:
+    """
+    Returns the largest index <= `end` at which `raw[start:index]` can be decoded
+    on its own, i.e. it does not stop inside an escape sequence or between the
+    two halves of a UTF-16 surrogate pair.
+    """
+    index = end
+    # Look back at most 12 characters: the longest escape is a surrogate pair "\\uXXXX\\uXXXX".
+    lookback = raw[max(start, end - 12):end]
+    backslash = lookback.rfind("\\")
+    if backslash == -1:
+        return index
+    escape_at = end - len(lookback) + backslash
+
+    # A backslash that is itself escaped ("\\\\") is a complete escape.
+    run = 0
+    while escape_at - run - 1 >= start and raw[escape_at - run - 1] == "\\":
+        run += 1
+    if run % 2 == 1:
+        return index
+
+    escape = raw[escape_at:end]
+    if len(escape) < 2 or (escape[1] == "u" and len(escape) < 6):
+        # An incomplete escape; what precedes it may itself be a lone high surrogate.
+        return _safe_string_end(raw, start, escape_at)
+    if escape[1] != "u":
+        return index
+    code = int(escape[2:6], 16) if all(c in "0123456789abcdefABCDEF" for c in escape[2:6]) else 0
+    # A high surrogate must be decoded together with the low surrogate that follows it.
+    if 0xD800 <= code <= 0xDBFF and len(escape) < 12:
+        return escape_at
+    return index
+
+
+class _Capture:
+    """The raw text of a value that may span several chunks."""
+
+    __slots__ = ("parts", "start")
+
+    def __init__(self, start: int):
+        self.parts: List[str] = []
+        # Where the value starts in the current chunk (0 once carried over).
+        self.start = start
+
+    def carry(self, chunk: str) -> None:
+        """Keeps the rest of `chunk` when the value continues in the next one."""
+        self.parts.append(chunk[self.start:])
+        self.start = 0
+
+    def text(self, chunk: str, end: int) -> str:
+        return "".join(self.parts) + chunk[self.start:end]
+
+
+class IncrementalObjectParser:
+    """
+    A single-pass, incremental scanner for a streamed JSON object.
+
+    It reports each top-level field as soon as its value is complete, each
+    element of a top-level array as soon as that element is complete, and the
+    decoded text of selected top-level string fields as it arrives. Every
+    character is scanned once, and kept only (as a chunk piece) by the value
+    and array element it belongs to, so total work is linear in the response
+    size.
+    """
+
+    def __init__(self, stream_keys: Iterable[str] = ()):
+        self._stream_keys = set(stream_keys)
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        # The string being scanned: a key's raw text, or which capture it opened.
+        self._key_capture: Optional[_Capture] = None
+        self._string_owner: Optional[str] = None
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._value: Optional[_Capture] = None
+        self._value_is_primitive = False
+        self._item: Optional[_Capture] = None
+        self._item_is_primitive = False
+        self._item_index = 0
+        # Raw text of a streamed string not yet decoded (an incomplete escape),
+        # and where the rest of it starts in the current chunk.
+        self._delta_carry: Optional[str] = None
+        self._delta_start = 0
+        self._fields: dict = {}
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Event]:
+        """Consumes the next chunk of text and returns the events it completed."""
+        events: List[Event] = []
+
+        for i, c in enumerate(chunk):
+            if self.done:
+                break
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._end_string(chunk, i, events)
+                continue
+
+            if c in _WHITESPACE:
+                continue
+
+            depth = len(self._stack)
+            if c == '"':
+                self._in_string = True
+                if depth == 1 and self._expect_key:
+                    self._key_capture = _Capture(i)
+                    self._string_owner = None
+                else:
+                    self._string_owner = self._start_value(c, i, primitive=False)
+            elif c in "{[":
+                self._start_value(c, i, primitive=False)
+                self._stack.append(c)
+                if len(self._stack) == 1:
+                    self._expect_key = c == "{"
+                elif len(self._stack) == 2 and c == "[":
+                    self._item_index = 0
+            elif c in "}]":
+                self._end_primitive(chunk, i, events)
+                self._stack.pop()
+                self._end_container(chunk, i, events)
+            elif c == ":":
+                if depth == 1:
+                    self._expect_key = False
+            elif c == ",":
+                self._end_primitive(chunk, i, events)
+                if depth == 1:
+                    self._expect_key = True
+            else:
+                self._start_value(c, i, primitive=True)
+
+        if not self.done:
+            self._emit_string_delta(chunk, len(chunk), events)
+            self._delta_start = 0
+            for capture in (self._key_capture, self._value, self._item):
+                if capture is not None:
+                    capture.carry(chunk)
+        return events
+
+    # --- Slot tracking ---
+
+    def _start_value(self, c: str, i: int, primitive: bool) -> Optional[str]:
+        """Opens the capture of a top-level value or array element starting at `i`, if any, and names it."""
+        depth = len(self._stack)
+        if depth == 1 and not self._expect_key and self._value is None:
+            self._value = _Capture(i)
+            self._value_is_primitive = primitive
+            if c == '"' and self._key in self._stream_keys:
+                self._delta_carry = ""
+                self._delta_start = i + 1
+            return "value"
+        if depth == 2 and self._stack[1] == "[" and self._item is None:
+            self._item = _Capture(i)
+            self._item_is_primitive = primitive
+            return "item"
+        return None
+
+    def _end_string(self, chunk: str, i: int, events: List[Event]) -> None:
+        if self._string_owner is None and self._key_capture is not None:
+            self._key = json.loads(self._key_capture.text(chunk, i + 1))
+            self._key_capture = None
+        elif self._string_owner == "value":
+            self._emit_string_delta(chunk, i, events)
+            self._delta_carry = None
+            self._emit_field(self._value.text(chunk, i + 1), events)
+        elif self._string_owner == "item":
+            self._emit_item(self._item.text(chunk, i + 1), events)
+        self._string_owner = None
+
+    def _end_primitive(self, chunk: str, i: int, events: List[Event]) -> None:
+        depth = len(self._stack)
+        if depth == 1 and self._value is not None and self._value_is_primitive:
+            self._emit_field(self._value.text(chunk, i).strip(), events)
+        elif depth == 2 and self._item is not None and self._item_is_primitive:
+            self._emit_item(self._item.text(chunk, i).strip(), events)
+
+    def _end_container(self, chunk: str, i: int, events: List[Event]) -> None:
+        depth = len(self._stack)
+        if depth == 0:
+            self.done = True
+            events.append(("end", dict(self._fields)))
+        elif depth == 1 and self._value is not None:
+            self._emit_field(self._value.text(chunk, i + 1), events)
+        elif depth == 2 and self._item is not None and self._stack[1] == "[":
+            self._emit_item(self._item.text(chunk, i + 1), events)
+
+    # --- Event emission ---
+
+    def _emit_field(self, raw: str, events: List[Event]) -> None:
+        value = json.loads(raw, strict=False)
+        self._fields[self._key] = value
+        events.append(("field", self._key, value))
+        self._value = None
+
+    def _emit_item(self, raw: str, events: List[Event]) -> None:
+        events.append(("item", self._key, self._item_index, json.loads(raw, strict=False)))
+        self._item_index += 1
+        self._item = None
+
+    def _emit_string_delta(self, chunk: str, end: int, events: List[Event]) -> None:
+        if self._delta_carry is None:
+            return
+        raw = self._delta_carry + chunk[self._delta_start:end]
+        safe_end = _safe_string_end(raw, 0, len(raw))
+        self._delta_carry = raw[safe_end:]
+        self._delta_start = end
+        if safe_end == 0:
+            return
+        decoded = json.loads('"' + raw[:safe_end] + '"', strict=False)
+        if decoded:
+            events.append(("string_delta", self._key, decoded))
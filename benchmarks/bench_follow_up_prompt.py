@@ -0,0 +1,94 @@
+# benchmarks/bench_follow_up_prompt.py
+"""
+Compares follow-up prompt size and construction latency for the full-document
+approach against section-level retrieval (app.services.retrieval_service),
+and one prompt per question against a single combined prompt for all of them.
+
+Uses a synthetic gov.za-like chapter, so no network access is needed. Prompt
+tokens are estimated at four characters per token.
+
+Usage:
+    python -m benchmarks.bench_follow_up_prompt --sections 120 --repeat 200
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from app.models.schemas import FollowUpRequest
+from app.services import ai_service, retrieval_service
+from app.services.scraper_service import _parse_document
+from benchmarks.local_servers import TOPICS, build_chapter_html
+
+QUESTIONS = [
+    "What does s16 say about freedom of expression?",
+    "Can the right to privacy be limited?",
+    "Who must protect the environment?",
+    "What rights do arrested and detained persons have?",
+    "Is there a right to basic education?",
+]
+
+
+def _time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main(sections: int, repeat: int) -> dict:
+    document_text = _parse_document(build_chapter_html(sections))
+    analysis = "The chapter protects " + ", ".join(TOPICS) + "."
+    results = []
+
+    for question in QUESTIONS:
+        request = FollowUpRequest(question=question, initial_analysis_text=analysis, original_url="https://www.gov.za/x")
+
+        full_prompt = ai_service._construct_follow_up_prompt(request, document_text)
+
+        def build_with_retrieval():
+            retrieval = retrieval_service.select_relevant_text(document_text, question)
+            return ai_service._construct_follow_up_prompt(request, retrieval.text, retrieval.is_excerpt)
+
+        retrieval_prompt = build_with_retrieval()
+        results.append({
+            "question": question,
+            "full_prompt_tokens": retrieval_service.estimate_tokens(full_prompt),
+            "retrieval_prompt_tokens": retrieval_service.estimate_tokens(retrieval_prompt),
+            "full_build_ms": round(_time(lambda: ai_service._construct_follow_up_prompt(request, document_text), repeat), 4),
+            "retrieval_build_ms": round(_time(build_with_retrieval, repeat), 4),
+        })
+
+    full_tokens = sum(r["full_prompt_tokens"] for r in results)
+    retrieval_tokens = sum(r["retrieval_prompt_tokens"] for r in results)
+
+    # All questions in one round trip, with retrieval over their combined text.
+    combined_request = FollowUpRequest(questions=QUESTIONS, initial_analysis_text=analysis, original_url="https://www.gov.za/x")
+    combined_retrieval = retrieval_service.select_relevant_text(document_text, " ".join(QUESTIONS))
+    combined_prompt = ai_service._construct_multi_follow_up_prompt(
+        combined_request, QUESTIONS, combined_retrieval.text, combined_retrieval.is_excerpt
+    )
+    combined_tokens = retrieval_service.estimate_tokens(combined_prompt)
+
+    return {
+        "document_chars": len(document_text),
+        "per_question": results,
+        "prompt_token_reduction": round(1 - retrieval_tokens / full_tokens, 4),
+        "combined": {
+            "model_calls": 1,
+            "separate_model_calls": len(QUESTIONS),
+            "prompt_tokens": combined_tokens,
+            "token_reduction_vs_separate_retrieval": round(1 - combined_tokens / retrieval_tokens, 4),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=120, help="Sections in the synthetic chapter.")
+    parser.add_argument("--repeat", type=int, default=200, help="Timing repetitions per measurement.")
+    args = parser.parse_args()
+    print(json.dumps(main(args.sections, args.repeat), indent=2))
@@ -0,0 +1,74 @@
+# benchmarks/bench_http_client.py
+"""
+Compares per-request latency of a fresh httpx.AsyncClient per request (the old
+scraper behaviour) against the shared, pooled client from app.core.http_client.
+
+Runs against a local HTTP stand-in, so the numbers show connection setup cost
+only; against gov.za over TLS the savings per request are larger.
+
+Usage:
+    python -m benchmarks.bench_http_client --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from app.core.http_client import create_http_client
+from benchmarks.local_servers import FakeGovZaServer
+
+
+async def _time_fresh_clients(url: str, requests: int) -> list[float]:
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url, follow_redirects=True, timeout=15.0)
+            response.raise_for_status()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def _time_shared_client(url: str, requests: int) -> list[float]:
+    timings = []
+    async with create_http_client() as client:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(url)
+            response.raise_for_status()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _summarize(timings: list[float]) -> dict:
+    ordered = sorted(timings)
+    return {
+        "requests": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 3),
+    }
+
+
+async def main(requests: int) -> dict:
+    with FakeGovZaServer() as server:
+        url = f"{server.base_url}/documents/constitution/chapter-2-bill-rights"
+        fresh = _summarize(await _time_fresh_clients(url, requests))
+        shared = _summarize(await _time_shared_client(url, requests))
+
+    return {
+        "fresh_client_per_request": fresh,
+        "shared_pooled_client": shared,
+        "mean_saved_per_request_ms": round(fresh["mean_ms"] - shared["mean_ms"], 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per strategy.")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.requests)), indent=2))
@@ -0,0 +1,105 @@
+# benchmarks/bench_parser.py
+"""
+Compares the BeautifulSoup and lxml extraction engines of the scraper on the
+saved gov.za HTML fixtures in tests/fixtures (and optionally a synthetic
+chapter scaled up to a given number of sections), after checking that both
+engines produce identical text.
+
+Also measures how long a parse blocks the event loop: the longest gap in a
+1 ms ticker while pages are parsed inline versus in a worker thread.
+
+Usage:
+    python -m benchmarks.bench_parser --repeat 50 --sections 400
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import statistics
+import time
+
+from app.services.scraper_service import _parse_document
+from benchmarks.local_servers import build_chapter_html
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "tests", "fixtures")
+
+
+def _time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+async def _max_loop_stall(parse, html: str, pages: int) -> float:
+    """Longest gap, in ms, between ticks of a 1 ms ticker while `pages` are parsed."""
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stalls.append(now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.005)
+    for _ in range(pages):
+        await parse(html)
+        await asyncio.sleep(0.002)  # let the ticker run between pages
+    done.set()
+    await task
+    return round(max(stalls) * 1000, 2)
+
+
+async def _inline(html: str) -> str:
+    return _parse_document(html, "lxml")
+
+
+async def _threaded(html: str) -> str:
+    return await asyncio.to_thread(_parse_document, html, "lxml")
+
+
+def main(repeat: int, sections: int) -> dict:
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages[os.path.basename(path)] = f.read()
+    if sections:
+        pages[f"synthetic_{sections}_sections"] = build_chapter_html(sections)
+
+    results = {}
+    for name, html in pages.items():
+        if _parse_document(html, "lxml") != _parse_document(html, "bs4"):
+            raise SystemExit(f"Engines disagree on {name}.")
+        bs4_ms = _time(lambda: _parse_document(html, "bs4"), repeat)
+        lxml_ms = _time(lambda: _parse_document(html, "lxml"), repeat)
+        results[name] = {
+            "html_kb": round(len(html) / 1024, 1),
+            "bs4_ms": round(bs4_ms, 3),
+            "lxml_ms": round(lxml_ms, 3),
+            "speedup": round(bs4_ms / lxml_ms, 2),
+        }
+
+    largest = max(pages.values(), key=len)
+    return {
+        "pages": results,
+        "event_loop_max_stall_ms": {
+            "inline": asyncio.run(_max_loop_stall(_inline, largest, 10)),
+            "worker_thread": asyncio.run(_max_loop_stall(_threaded, largest, 10)),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30, help="Timing repetitions per measurement.")
+    parser.add_argument("--sections", type=int, default=400, help="Sections in an extra synthetic page (0 to skip).")
+    args = parser.parse_args()
+    print(json.dumps(main(args.repeat, args.sections), indent=2))
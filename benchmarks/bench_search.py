@@ -0,0 +1,103 @@
+# benchmarks/bench_search.py
+"""
+Measures the full-text search index (app.utils.inverted_index): how long it
+takes to build over a whole-Constitution-sized corpus, how much memory it
+holds (tracemalloc), and the latency of ranked, phrase and highlighted
+queries against it.
+
+The corpus is one synthetic gov.za-like chapter per entry in CHAPTERS_DATA,
+so no network access is needed.
+
+Usage:
+    python -m benchmarks.bench_search --sections 40 --repeat 500
+"""
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from app.core.chapters import CHAPTERS_DATA
+from app.services.scraper_service import _parse_document
+from app.services.search_service import build_index
+from app.utils.inverted_index import SearchQuery
+from app.utils.sections import parse_chapter_text
+from benchmarks.local_servers import build_chapter_html
+
+QUERIES = [
+    "freedom of expression",
+    '"freedom of expression"',
+    '"right to privacy" limits',
+    "environment protect future generations",
+    "arrested detained persons",
+    "basic education",
+]
+
+
+def _percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main(sections: int, repeat: int) -> dict:
+    documents = [
+        parse_chapter_text(
+            _parse_document(build_chapter_html(sections, first_section=1 + i * sections)),
+            chapter_id=chapter["id"],
+            title=chapter["name"],
+        )
+        for i, chapter in enumerate(CHAPTERS_DATA)
+    ]
+    corpus_chars = sum(len(document.text) for document in documents)
+
+    build_ms = []
+    for _ in range(5):
+        start = time.perf_counter()
+        build_index(documents)
+        build_ms.append((time.perf_counter() - start) * 1000)
+
+    # Memory held by the index itself; the chapter texts already exist.
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    index = build_index(documents)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queries = []
+    for query in QUERIES:
+        parsed = SearchQuery.parse(query)
+        search_ms, snippet_ms = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            hits, total = index.search(parsed, 10)
+            middle = time.perf_counter()
+            for hit in hits:
+                index.snippet(hit.doc_id, parsed)
+            search_ms.append((middle - start) * 1000)
+            snippet_ms.append((time.perf_counter() - middle) * 1000)
+        queries.append({
+            "query": query,
+            "matches": total,
+            "search_p50_ms": round(statistics.median(search_ms), 4),
+            "search_p99_ms": round(_percentile(search_ms, 0.99), 4),
+            "snippets_p50_ms": round(statistics.median(snippet_ms), 4),
+        })
+
+    return {
+        "chapters": len(documents),
+        "corpus_chars": corpus_chars,
+        "index": index.stats(),
+        "build_ms_median": round(statistics.median(build_ms), 2),
+        "index_memory_kib": round((current - before) / 1024, 1),
+        "build_peak_memory_kib": round((peak - before) / 1024, 1),
+        "queries": queries,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=40, help="Sections in each synthetic chapter.")
+    parser.add_argument("--repeat", type=int, default=500, help="Timing repetitions per query.")
+    args = parser.parse_args()
+    print(json.dumps(main(args.sections, args.repeat), indent=2))
@@ -0,0 +1,257 @@
+# benchmarks/load_test.py
+"""
+End-to-end load test for the API.
+
+Starts a local fake gov.za server and the FastAPI app (in a uvicorn
+subprocess, using the local stub LLM backend), then drives /api/chapters,
+/api/analyze and /api/follow-up at a configurable concurrency. Reports
+throughput, p50/p95/p99 latency and error rates per endpoint, and saves the
+results as JSON. With --baseline, compares against an earlier results file
+and exits non-zero on a regression.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 32 --duration 20 --output load.json
+    python -m benchmarks.load_test --baseline load.json --max-regression 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.core.chapters import CHAPTERS_DATA
+from benchmarks.local_servers import FakeGovZaServer
+
+ROLES = ["Journalist", "Civic Educator", "Constitutional Law Professor", "High School Teacher"]
+AUDIENCES = ["the general public", "High School Students", "first-year law students"]
+QUESTIONS = [
+    "Can this right be limited?",
+    "Who is responsible for protecting these rights?",
+    "What does section 16 say about freedom of expression?",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class AppServer:
+    """Runs the API in a uvicorn subprocess with the given environment overrides."""
+
+    def __init__(self, env: Dict[str, str], port: int):
+        self.port = port
+        self.base_url = f"http://127.0.0.1:{port}"
+        self._env = {**os.environ, **env}
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "AppServer":
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(self.port), "--log-level", "warning"],
+            env=self._env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"{self.base_url}/", timeout=1).status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        self.__exit__()
+        raise RuntimeError("The API server did not become ready within 30 seconds.")
+
+    def __exit__(self, *exc_info) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait(timeout=10)
+
+
+class LoadTest:
+    def __init__(self, base_url: str, chapter_urls: List[str], mix: Dict[str, float], seed: int):
+        self.base_url = base_url
+        self.chapter_urls = chapter_urls
+        self.mix = mix
+        self.rng = random.Random(seed)
+        self.latencies: Dict[str, List[float]] = {name: [] for name in mix}
+        self.errors: Dict[str, Dict[str, int]] = {name: {} for name in mix}
+
+    def _analysis_body(self) -> dict:
+        return {
+            "chapter_url": self.rng.choice(self.chapter_urls),
+            "explanation_scope": self.rng.choice(["A", "B", "C"]),
+            "analysis_role": self.rng.choice(ROLES),
+            "target_audience": self.rng.choice(AUDIENCES),
+            "follow_up_questions": self.rng.sample(QUESTIONS, self.rng.randint(0, 2)),
+        }
+
+    async def _request(self, client: httpx.AsyncClient, endpoint: str) -> None:
+        if endpoint == "chapters":
+            call = client.get("/api/chapters")
+        elif endpoint == "analyze":
+            call = client.post("/api/analyze", json=self._analysis_body())
+        else:
+            call = client.post("/api/follow-up", json={
+                "question": self.rng.choice(QUESTIONS),
+                "initial_analysis_text": "The chapter sets out the rights of everyone in South Africa.",
+                "original_url": self.rng.choice(self.chapter_urls),
+            })
+
+        start = time.perf_counter()
+        try:
+            response = await call
+            outcome = None if response.status_code < 400 else str(response.status_code)
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        elapsed = time.perf_counter() - start
+
+        if outcome is None:
+            self.latencies[endpoint].append(elapsed)
+        else:
+            self.errors[endpoint][outcome] = self.errors[endpoint].get(outcome, 0) + 1
+
+    async def _worker(self, client: httpx.AsyncClient, deadline: float, remaining: List[int]) -> None:
+        endpoints, weights = list(self.mix), list(self.mix.values())
+        while time.monotonic() < deadline and remaining[0] > 0:
+            remaining[0] -= 1
+            await self._request(client, self.rng.choices(endpoints, weights)[0])
+
+    async def run(self, concurrency: int, duration: float, max_requests: int) -> dict:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + duration
+            remaining = [max_requests]
+            start = time.perf_counter()
+            await asyncio.gather(*[self._worker(client, deadline, remaining) for _ in range(concurrency)])
+            wall_time = time.perf_counter() - start
+
+        endpoints = {}
+        for name in self.mix:
+            latencies = sorted(self.latencies[name])
+            error_count = sum(self.errors[name].values())
+            total = len(latencies) + error_count
+            endpoints[name] = {
+                "requests": total,
+                "throughput_rps": round(total / wall_time, 2),
+                "error_rate": round(error_count / total, 4) if total else 0.0,
+                "errors": self.errors[name],
+                "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+                "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            }
+
+        total_requests = sum(e["requests"] for e in endpoints.values())
+        return {
+            "wall_time_s": round(wall_time, 3),
+            "total_requests": total_requests,
+            "throughput_rps": round(total_requests / wall_time, 2),
+            "endpoints": endpoints,
+        }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> List[str]:
+    """Returns a description of every metric that regressed by more than `max_regression`."""
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous or not current["requests"]:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if previous[metric] and current[metric] > previous[metric] * (1 + max_regression):
+                regressions.append(f"{name}.{metric}: {previous[metric]} -> {current[metric]}")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - max_regression):
+            regressions.append(f"{name}.throughput_rps: {previous['throughput_rps']} -> {current['throughput_rps']}")
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            regressions.append(f"{name}.error_rate: {previous['error_rate']} -> {current['error_rate']}")
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    mix = {"chapters": args.chapters_weight, "analyze": args.analyze_weight, "follow-up": args.follow_up_weight}
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+
+    with FakeGovZaServer() as gov_za:
+        # Point every chapter at the fake server, keeping the real paths.
+        chapter_urls = [gov_za.base_url + httpx.URL(chapter["url"]).path for chapter in CHAPTERS_DATA]
+        env = {
+            "LLM_BACKEND": "stub",
+            "LLM_STUB_LATENCY": args.llm_latency,
+            "LLM_STUB_TOKENS_PER_SECOND": str(args.llm_tokens_per_second),
+            "LLM_STUB_ERROR_RATE": str(args.llm_error_rate),
+            "LLM_STUB_SEED": str(args.seed),
+            # Scrape through the fake server rather than any snapshot, and keep nothing on disk.
+            "CORPUS_SNAPSHOT_PATH": "",
+            "ANALYSIS_CACHE_PATH": "",
+            "ANALYSIS_CACHE_ENABLED": "0" if args.no_result_cache else "1",
+        }
+        with AppServer(env, args.port or _free_port()) as app_server:
+            results = asyncio.run(
+                LoadTest(app_server.base_url, chapter_urls, mix, args.seed).run(args.concurrency, args.duration, args.requests)
+            )
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        **results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client connections.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Maximum run time in seconds.")
+    parser.add_argument("--requests", type=int, default=10**9, help="Maximum total requests.")
+    parser.add_argument("--chapters-weight", type=float, default=1.0)
+    parser.add_argument("--analyze-weight", type=float, default=1.0)
+    parser.add_argument("--follow-up-weight", type=float, default=2.0)
+    parser.add_argument("--llm-latency", default="lognormal:-1.5,0.5", help="Stub latency spec (see LLM_STUB_LATENCY).")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--no-result-cache", action="store_true", help="Disable the analysis result cache.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=0, help="Port for the API (default: a free port).")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--baseline", help="Compare against this earlier JSON report.")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Tolerated relative regression (0.2 = 20%%).")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,92 @@
+# benchmarks/local_servers.py
+"""
+Local stand-ins for external services, so benchmarks never touch the network.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+DEFAULT_PAGE = """
+<html><body><div class="field">
+<h2>Chapter 2: Bill of Rights</h2>
+{sections}
+</div></body></html>
+"""
+
+
+# Topics used to give each synthetic section distinct, searchable wording.
+TOPICS = [
+    "equality", "human dignity", "life", "freedom and security of the person", "slavery and forced labour",
+    "privacy", "freedom of religion", "freedom of expression", "assembly and petition", "freedom of association",
+    "political rights", "citizenship", "freedom of movement", "freedom of trade and profession", "labour relations",
+    "environment", "property", "housing", "health care, food, water and social security", "children",
+    "education", "language and culture", "access to information", "just administrative action", "access to courts",
+    "arrested, detained and accused persons", "limitation of rights", "states of emergency", "enforcement of rights",
+    "interpretation of the Bill of Rights",
+]
+
+
+def build_chapter_html(sections: int = 40, first_section: int = 9) -> str:
+    """
+    Builds a gov.za-like chapter page with `sections` numbered sections.
+    Numbering starts at 9 so the first topics line up with the real Bill of
+    Rights (section 9 equality, section 16 freedom of expression, ...).
+    """
+    blocks = []
+    for offset in range(sections):
+        number = first_section + offset
+        topic = TOPICS[offset % len(TOPICS)]
+        blocks.append(f"<h3>{number}. {topic.capitalize()}</h3>")
+        blocks.append(f"<p>(1) Everyone has the right to {topic}, as protected by section {number}, which includes the following.</p>")
+        blocks.append("<ul>")
+        for letter in "abc":
+            blocks.append(f"<li>({letter}) an aspect of {topic} that the state must respect, protect, promote and fulfil;</li>")
+        blocks.append("</ul>")
+        blocks.append(f"<p>(2) The right to {topic} in subsection (1) may be limited only in terms of law of general application.</p>")
+    return DEFAULT_PAGE.format(sections="\n".join(blocks))
+
+
+class FakeGovZaServer:
+    """
+    A threaded HTTP/1.1 server with keep-alive that serves chapter pages.
+
+    `pages` maps request paths to HTML; any other path gets a generic chapter.
+    """
+
+    def __init__(self, pages: Optional[Dict[str, str]] = None, host: str = "127.0.0.1", port: int = 0):
+        default_page = build_chapter_html()
+        pages = pages or {}
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                body = pages.get(self.path, default_page).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", f'"{hash(body) & 0xFFFFFFFF:x}"')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeGovZaServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,153 @@
+# benchmarks/startup_profile.py
+"""
+Profiles a cold start of the API, as Cloud Run sees it:
+
+- import time of `app.main`, from `python -X importtime`, with the slowest
+  modules and packages by self time
+- time to first byte: from launching uvicorn to the first byte of a
+  `GET /api/chapters` response
+- for reference, the import time of the Gemini SDK, which the app only
+  loads lazily (in its startup warm-up thread or on the first model call)
+
+Each measurement is repeated in fresh processes and the median is reported.
+With --budget-ms and/or --ttfb-budget-ms, exits non-zero when a median is
+over budget, so CI can catch startup regressions.
+
+Usage:
+    python -m benchmarks.startup_profile --runs 5 --output startup.json
+    python -m benchmarks.startup_profile --budget-ms 1500 --ttfb-budget-ms 4000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.load_test import _free_port
+
+SDK_MODULE = "google.generativeai"
+
+
+def _import_times(module: str, env: Dict[str, str]) -> List[dict]:
+    """Runs `import module` in a fresh interpreter and parses its -X importtime report."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append({"module": name.strip(), "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return entries
+
+
+def profile_imports(module: str, runs: int, top: int, env: Dict[str, str]) -> dict:
+    totals, self_times = [], defaultdict(list)
+    for _ in range(runs):
+        entries = _import_times(module, env)
+        totals.append(next(e["cumulative_us"] for e in entries if e["module"] == module) / 1000)
+        for entry in entries:
+            self_times[entry["module"]].append(entry["self_us"] / 1000)
+
+    medians = {name: statistics.median(samples) for name, samples in self_times.items()}
+    packages: Dict[str, float] = defaultdict(float)
+    for name, ms in medians.items():
+        packages[name.split(".")[0]] += ms
+    return {
+        "module": module,
+        "total_ms": round(statistics.median(totals), 1),
+        "slowest_modules": [
+            {"module": name, "self_ms": round(ms, 2)}
+            for name, ms in sorted(medians.items(), key=lambda item: -item[1])[:top]
+        ],
+        "slowest_packages": [
+            {"package": name, "self_ms": round(ms, 2)}
+            for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+    }
+
+
+def time_to_first_byte(path: str, env: Dict[str, str], timeout: float = 60.0) -> float:
+    """Milliseconds from launching uvicorn to the first byte of a successful GET `path`."""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        with httpx.Client(timeout=1) as client:
+            while time.perf_counter() < deadline:
+                try:
+                    with client.stream("GET", f"http://127.0.0.1:{port}{path}") as response:
+                        if response.status_code == 200:
+                            next(response.iter_raw())
+                            return (time.perf_counter() - started) * 1000
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+        raise RuntimeError(f"The API did not answer {path} within {timeout} seconds.")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main(args: argparse.Namespace) -> int:
+    env = {**os.environ, "LOG_LEVEL": "WARNING"}
+
+    imports = profile_imports("app.main", args.runs, args.top, env)
+    ttfb = [time_to_first_byte(args.path, env) for _ in range(args.runs)]
+    try:
+        sdk_ms: Optional[float] = round(statistics.median(
+            next(e["cumulative_us"] for e in _import_times(SDK_MODULE, env) if e["module"] == SDK_MODULE) / 1000
+            for _ in range(args.runs)
+        ), 1)
+    except subprocess.CalledProcessError:
+        sdk_ms = None  # Not installed here.
+
+    report = {
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "imports": imports,
+        "time_to_first_byte": {
+            "path": args.path,
+            "median_ms": round(statistics.median(ttfb), 1),
+            "max_ms": round(max(ttfb), 1),
+        },
+        "lazy_sdk_import_ms": sdk_ms,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    over_budget = []
+    if args.budget_ms is not None and imports["total_ms"] > args.budget_ms:
+        over_budget.append(f"import of app.main took {imports['total_ms']} ms (budget {args.budget_ms} ms)")
+    ttfb_ms = report["time_to_first_byte"]["median_ms"]
+    if args.ttfb_budget_ms is not None and ttfb_ms > args.ttfb_budget_ms:
+        over_budget.append(f"time to first byte was {ttfb_ms} ms (budget {args.ttfb_budget_ms} ms)")
+    for problem in over_budget:
+        print(f"OVER BUDGET {problem}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement.")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules and packages to list.")
+    parser.add_argument("--path", default="/api/chapters", help="Endpoint for the time-to-first-byte probe.")
+    parser.add_argument("--budget-ms", type=float, help="Fail if importing app.main takes longer (median).")
+    parser.add_argument("--ttfb-budget-ms", type=float, help="Fail if the time to first byte is longer (median).")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    sys.exit(main(parser.parse_args()))
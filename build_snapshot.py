@@ -0,0 +1,57 @@
+"""
+Builds the offline corpus snapshot: scrapes and cleans every chapter in
+CHAPTERS_DATA and writes them to a compact, versioned snapshot file that the
+API loads at startup.
+
+Usage:
+    python build_snapshot.py [--output PATH] [--allow-partial]
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.core import config
+from app.core.chapters import CHAPTERS_DATA
+from app.core.http_client import create_http_client
+from app.services import scraper_service, snapshot_service
+
+
+async def build(output: str, allow_partial: bool) -> int:
+    documents = []
+    failures = []
+
+    async with create_http_client() as client:
+        scraper_service.set_http_client(client)
+        try:
+            for chapter in CHAPTERS_DATA:
+                try:
+                    text = await scraper_service.fetch_and_parse_url(chapter["url"])
+                    documents.append((chapter["url"], text))
+                    print(f"  OK    {chapter['name']} ({len(text)} chars)")
+                except RuntimeError as e:
+                    failures.append(chapter["name"])
+                    print(f"  FAIL  {chapter['name']}: {e}")
+        finally:
+            scraper_service.set_http_client(None)
+
+    if failures and not allow_partial:
+        print(f"Snapshot not written: {len(failures)} chapter(s) failed. Use --allow-partial to write the rest.")
+        return 1
+    if not documents:
+        # With --allow-partial an empty build is still a success: without a
+        # snapshot the API scrapes every chapter live, as it did before.
+        print("Snapshot not written: no chapters could be scraped.")
+        return 0 if allow_partial else 1
+
+    header = snapshot_service.write_snapshot(documents, output)
+    print(f"Wrote {header['document_count']} documents to {output} (corpus {header['corpus_hash'][:12]}).")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=config.CORPUS_SNAPSHOT_PATH, help="Where to write the snapshot file.")
+    parser.add_argument("--allow-partial", action="store_true", help="Write the snapshot even if some chapters fail, and succeed without one if all do.")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(build(args.output, args.allow_partial)))
@@ -1,17 +1,45 @@
+# run_evals.py
+"""
+Runs the "AI grading AI" evaluation pipeline over eval_dataset.json: each
+case's initial analysis and its follow-up questions are generated with the
+app's own services and graded against the rubric by a second model.
+
+Cases and follow-ups run concurrently, with at most --concurrency model
+stages (generation or grading) in flight at once. Every finished unit is
+appended to a JSONL checkpoint, so an interrupted run resumes where it
+stopped; use --fresh to start over. The run ends with a JSON report of
+scores, per-stage latency and token usage, optionally compared against a
+previous report.
+
+Usage:
+    python run_evals.py --concurrency 4
+    python run_evals.py --compare .cache/evals/baseline.json
+    LLM_BACKEND=stub python run_evals.py --fresh   # offline smoke run
+    CASSETTE_MODE=auto python run_evals.py --fresh  # record once, then replay deterministically
+"""
+
+import argparse
 import asyncio
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
 import os
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core import config
+from app.models.schemas import AnalysisRequest, FollowUpRequest
+from app.services import ai_service, snapshot_service
+from app.services.ai_service import generate_initial_analysis, generate_follow_up_answer
+from app.services.llm_backend import get_backend, record_usage, track_usage
+from app.utils.parsers import extract_json_from_string
 
-from ai_service import generate_initial_analysis, generate_follow_up_answer
-from models import AnalysisRequest, FollowUpRequest
-from utils import extract_json_from_string
+GRADER_MODEL = 'models/gemini-2.0-flash'
+STAGES = ("analysis", "grade_initial", "follow_up", "grade_follow_up")
+EVALS_DIR = os.path.join(".cache", "evals")
 
 async def grade_initial_output(eval_case: dict, actual_output: dict) -> dict:
     """Uses Gemini to grade the main analysis output against a rubric."""
-    model = genai.GenerativeModel('models/gemini-2.0-flash') # Using the updated flash model name
-    
     # --- THIS IS THE CORRECTED PROMPT ---
     prompt = f"""
     <prompt>
@@ -59,13 +87,13 @@ async def grade_initial_output(eval_case: dict, actual_output: dict) -> dict:
     </prompt>
     """
     
-    response = await model.generate_content_async(prompt)
+    response = await get_backend().generate(GRADER_MODEL, prompt)
+    record_usage(response)
     parsed = extract_json_from_string(response.text)
     return parsed if parsed else {"scores": {}, "reasoning": "Failed to parse grader response."}
 
 async def grade_follow_up(question: str, ideal_answer: str, actual_answer: str) -> dict:
     """Uses Gemini to grade a single follow-up answer."""
-    model = genai.GenerativeModel('models/gemini-2.0-flash')
     prompt = f"""
     <prompt>
     <system_instructions>
@@ -107,86 +135,323 @@ async def grade_follow_up(question: str, ideal_answer: str, actual_answer: str)
     </output_format>
     </prompt>
     """
-    response = await model.generate_content_async(prompt)
+    response = await get_backend().generate(GRADER_MODEL, prompt)
+    record_usage(response)
     parsed = extract_json_from_string(response.text)
     return parsed if parsed else {"score": 0, "reasoning": "Failed to parse grader response."}
 
 
-async def main():
-    """Runs the full evaluation pipeline, including follow-ups."""
-    load_dotenv()
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-    
-    with open('eval_dataset.json', 'r') as f:
-        eval_cases = json.load(f)
-        
-    print("--- Starting Evaluation Pipeline ---")
-    
-    for case in eval_cases:
-        print(f"\n--- Running Initial Eval: {case['eval_id']} ---")
-        actual_initial_output = None
-        try:
-            request_data = {
-                "chapter_url": case['request']['source_url'],
-                "explanation_scope": case['request']['user_request']['scope'],
-                "analysis_role": case['request']['persona_and_audience'].get('role'),
-                "target_audience": case['request']['persona_and_audience'].get('audience'),
-                "follow_up_questions": case['request']['user_request'].get('specific_questions', [])
-            }
-            request_model = AnalysisRequest(**request_data)
-            
-            raw_response = await generate_initial_analysis(request_model)
-            actual_initial_output = extract_json_from_string(raw_response)
-
-            # request_model = AnalysisRequest(**case['input_data'])
-            # raw_response = await generate_initial_analysis(request_model)
-            # actual_initial_output = extract_json_from_string(raw_response)
-
-            if not actual_initial_output:
-                print("  EVALUATION FAILED: Could not parse JSON from the initial analysis response.")
-                continue
-
-            evaluation = await grade_initial_output(case, actual_initial_output)
-            print(f"  Initial Scores: {evaluation.get('scores')}")
-            print(f"  Reasoning: {evaluation.get('reasoning')}")
-
-        except Exception as e:
-            print(f"  INITIAL EVALUATION FAILED with error: {e}")
-            continue # If the initial analysis fails, we can't test follow-ups
-
-        # --- NEW: RUN FOLLOW-UP EVALUATIONS ---
-        if actual_initial_output and 'follow_up_evals' in case:
-            print(f"  --- Running Follow-up Evals for {case['eval_id']} ---")
-            for follow_up_case in case['follow_up_evals']:
-                question = follow_up_case['question']
-                ideal_answer = follow_up_case['ideal_answer']
-                
-                print(f"    Testing Question: '{question[:50]}...'")
-                
-                try:
-                    follow_up_request = FollowUpRequest(
-                        question=question,
-                        initial_analysis_text=json.dumps(actual_initial_output),
-                        original_url=case['request']['source_url']
-                    )
-                    
-                    raw_follow_up_response = await generate_follow_up_answer(follow_up_request)
-                    actual_follow_up_output = extract_json_from_string(raw_follow_up_response)
-                    
-                    if not actual_follow_up_output or 'answer' not in actual_follow_up_output:
-                        print("      ERROR: Could not parse valid answer from follow-up response.")
+class Checkpoint:
+    """
+    An append-only JSONL file with one record per finished unit (an initial
+    analysis or a follow-up). Units that finished with status "ok" are
+    skipped on resume; failed ones are run again.
+    """
+
+    def __init__(self, path: str, fresh: bool = False):
+        self.path = path
+        self.records: Dict[str, dict] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if fresh and os.path.exists(path):
+            os.remove(path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A run killed mid-write leaves a partial last line.
                         continue
-                        
-                    actual_answer = actual_follow_up_output['answer']
-                    
-                    follow_up_eval = await grade_follow_up(question, ideal_answer, actual_answer)
-                    print(f"      Score: {follow_up_eval.get('score')}/5")
-                    print(f"      Reasoning: {follow_up_eval.get('reasoning')}")
+                    self.records[record["unit"]] = record
+
+    def done(self, unit: str) -> Optional[dict]:
+        record = self.records.get(unit)
+        return record if record is not None and record["status"] == "ok" else None
+
+    def write(self, record: dict) -> None:
+        self.records[record["unit"]] = record
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+async def _stage(name: str, stages: dict, limiter: asyncio.Semaphore, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """Runs one model stage under the concurrency limit, recording its latency and tokens."""
+    async with limiter:
+        started = time.perf_counter()
+        with track_usage() as usage:
+            try:
+                return await fn()
+            finally:
+                stages[name] = {
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "calls": len(usage),
+                    "prompt_tokens": sum(u.prompt_tokens or 0 for u in usage),
+                    "response_tokens": sum(u.response_tokens or 0 for u in usage),
+                }
+
+
+def _analysis_request(case: dict) -> AnalysisRequest:
+    return AnalysisRequest(
+        chapter_url=case['request']['source_url'],
+        explanation_scope=case['request']['user_request']['scope'],
+        analysis_role=case['request']['persona_and_audience'].get('role'),
+        target_audience=case['request']['persona_and_audience'].get('audience'),
+        follow_up_questions=case['request']['user_request'].get('specific_questions', []),
+    )
+
+
+def _score(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def _run_initial(case: dict, limiter: asyncio.Semaphore) -> dict:
+    record = {"unit": f"{case['eval_id']}/initial", "kind": "initial", "eval_id": case['eval_id'], "stages": {}}
+    try:
+        request_model = _analysis_request(case)
+        output = await _stage("analysis", record["stages"], limiter, lambda: generate_initial_analysis(request_model))
+        evaluation = await _stage("grade_initial", record["stages"], limiter, lambda: grade_initial_output(case, output))
+        scores = evaluation.get("scores") if isinstance(evaluation.get("scores"), dict) else {}
+        record.update(
+            status="ok",
+            output=output,
+            scores={k: _score(v) for k, v in scores.items()},
+            reasoning=evaluation.get("reasoning"),
+        )
+        print(f"  {case['eval_id']}: initial scores {record['scores']}")
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+        print(f"  {case['eval_id']}: INITIAL EVALUATION FAILED with error: {e}")
+    return record
+
+
+async def _run_follow_up(case: dict, index: int, initial_output: dict, limiter: asyncio.Semaphore) -> dict:
+    follow_up_case = case['follow_up_evals'][index]
+    question = follow_up_case['question']
+    record = {
+        "unit": f"{case['eval_id']}/follow_up/{index}",
+        "kind": "follow_up",
+        "eval_id": case['eval_id'],
+        "question": question,
+        "stages": {},
+    }
+    try:
+        follow_up_request = FollowUpRequest(
+            question=question,
+            # What the frontend sends: the analysis text the user was shown.
+            initial_analysis_text=initial_output.get("analysis") or json.dumps(initial_output),
+            original_url=case['request']['source_url'],
+        )
+        response = await _stage("follow_up", record["stages"], limiter, lambda: generate_follow_up_answer(follow_up_request))
+        answer = response.get("answer") if isinstance(response, dict) else None
+        if not answer:
+            raise ValueError("Could not parse a valid answer from the follow-up response.")
+        evaluation = await _stage(
+            "grade_follow_up", record["stages"], limiter,
+            lambda: grade_follow_up(question, follow_up_case['ideal_answer'], answer),
+        )
+        record.update(status="ok", answer=answer, score=_score(evaluation.get("score")), reasoning=evaluation.get("reasoning"))
+        print(f"  {case['eval_id']}: '{question[:50]}' scored {record['score']}/5")
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+        print(f"  {case['eval_id']}: FOLLOW-UP EVAL FAILED for '{question[:50]}' with error: {e}")
+    return record
+
+
+async def _run_case(case: dict, checkpoint: Checkpoint, limiter: asyncio.Semaphore) -> None:
+    """Runs a case's initial analysis, then all of its follow-ups concurrently."""
+    initial = checkpoint.done(f"{case['eval_id']}/initial")
+    if initial is None:
+        initial = await _run_initial(case, limiter)
+        checkpoint.write(initial)
+    if initial["status"] != "ok":
+        # If the initial analysis fails, we can't test follow-ups.
+        return
+
+    async def follow_up(index: int) -> None:
+        checkpoint.write(await _run_follow_up(case, index, initial["output"], limiter))
+
+    pending = [
+        i for i in range(len(case.get('follow_up_evals', [])))
+        if checkpoint.done(f"{case['eval_id']}/follow_up/{i}") is None
+    ]
+    await asyncio.gather(*(follow_up(i) for i in pending))
+
+
+def _mean(values: List[Optional[float]]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return round(statistics.fmean(values), 3) if values else None
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summarize(records: List[dict]) -> dict:
+    initial = [r for r in records if r["kind"] == "initial"]
+    follow_ups = [r for r in records if r["kind"] == "follow_up"]
+    ok_initial = [r for r in initial if r["status"] == "ok"]
+
+    stages = {}
+    for name in STAGES:
+        timings = [r["stages"][name] for r in records if name in r.get("stages", {})]
+        if not timings:
+            continue
+        latencies = [t["latency_ms"] for t in timings]
+        stages[name] = {
+            "count": len(timings),
+            "p50_ms": round(statistics.median(latencies), 1),
+            "p95_ms": _percentile(latencies, 0.95),
+            "max_ms": max(latencies),
+            "prompt_tokens": sum(t["prompt_tokens"] for t in timings),
+            "response_tokens": sum(t["response_tokens"] for t in timings),
+        }
+
+    criteria = sorted({k for r in ok_initial for k in r["scores"]})
+    return {
+        "cases": len(initial),
+        "initial": {"ok": len(ok_initial), "error": len(initial) - len(ok_initial)},
+        "follow_ups": {
+            "ok": sum(r["status"] == "ok" for r in follow_ups),
+            "error": sum(r["status"] != "ok" for r in follow_ups),
+        },
+        "scores": {
+            **{k: _mean([r["scores"].get(k) for r in ok_initial]) for k in criteria},
+            "follow_up": _mean([r.get("score") for r in follow_ups if r["status"] == "ok"]),
+        },
+        "stages": stages,
+        "tokens": {
+            "prompt": sum(s["prompt_tokens"] for s in stages.values()),
+            "response": sum(s["response_tokens"] for s in stages.values()),
+        },
+    }
+
+
+def _unit_score(record: dict) -> Optional[float]:
+    if record["status"] != "ok":
+        return None
+    if record["kind"] == "initial":
+        return _mean(list(record["scores"].values()))
+    return record.get("score")
+
+
+def _delta(current: Optional[float], previous: Optional[float]) -> dict:
+    delta = round(current - previous, 3) if current is not None and previous is not None else None
+    return {"previous": previous, "current": current, "delta": delta}
+
+
+def compare_reports(current: dict, previous: dict) -> dict:
+    """Diffs two reports: mean scores, stage latency and tokens, and per-unit score changes."""
+    scores = {
+        k: _delta(current["summary"]["scores"].get(k), previous["summary"]["scores"].get(k))
+        for k in sorted(set(current["summary"]["scores"]) | set(previous["summary"]["scores"]))
+    }
+    stages = {}
+    for name in STAGES:
+        now, before = current["summary"]["stages"].get(name), previous["summary"]["stages"].get(name)
+        if now and before:
+            stages[name] = {
+                metric: _delta(now[metric], before[metric])
+                for metric in ("p50_ms", "p95_ms", "prompt_tokens", "response_tokens")
+            }
+
+    previous_units = {r["unit"]: r for r in previous["results"]}
+    units = {}
+    for record in current["results"]:
+        before = previous_units.get(record["unit"])
+        if before is not None:
+            units[record["unit"]] = _delta(_unit_score(record), _unit_score(before))
+    return {
+        "previous_generated_at": previous.get("generated_at"),
+        "scores": scores,
+        "stages": stages,
+        "units": units,
+        "regressions": sorted(u for u, d in units.items() if d["delta"] is not None and d["delta"] < 0),
+    }
+
+
+def _print_summary(report: dict) -> None:
+    summary = report["summary"]
+    print("\n--- Evaluation Summary ---")
+    print(f"  Cases: {summary['cases']}  initial ok/error: {summary['initial']['ok']}/{summary['initial']['error']}"
+          f"  follow-ups ok/error: {summary['follow_ups']['ok']}/{summary['follow_ups']['error']}")
+    print(f"  Scores: {summary['scores']}")
+    for name, stage in summary["stages"].items():
+        print(f"  {name:16} p50 {stage['p50_ms']:>9} ms  p95 {stage['p95_ms']:>9} ms"
+              f"  tokens {stage['prompt_tokens']} in / {stage['response_tokens']} out")
+    comparison = report.get("comparison")
+    if comparison:
+        print(f"  Compared with the report of {comparison['previous_generated_at']}:")
+        for name, delta in comparison["scores"].items():
+            print(f"    {name:14} {delta['previous']} -> {delta['current']} ({delta['delta']:+})" if delta["delta"] is not None
+                  else f"    {name:14} {delta['previous']} -> {delta['current']}")
+        if comparison["regressions"]:
+            print(f"  Regressed units: {', '.join(comparison['regressions'])}")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with open(args.dataset, 'r') as f:
+        eval_cases = json.load(f)
+
+    # Measure the pipeline itself, not the caches in front of it.
+    if not args.use_cache:
+        config.ANALYSIS_CACHE_ENABLED = False
+        config.FOLLOW_UP_CACHE_ENABLED = False
+    snapshot_service.load_snapshot(config.CORPUS_SNAPSHOT_PATH)
+
+    checkpoint = Checkpoint(args.checkpoint, fresh=args.fresh)
+    if checkpoint.records:
+        print(f"Resuming from {args.checkpoint} ({len(checkpoint.records)} units recorded).")
+
+    print(f"--- Starting Evaluation Pipeline ({len(eval_cases)} cases, concurrency {args.concurrency}) ---")
+    limiter = asyncio.Semaphore(args.concurrency)
+    started = time.perf_counter()
+    await asyncio.gather(*(_run_case(case, checkpoint, limiter) for case in eval_cases))
+
+    units = [f"{case['eval_id']}/initial" for case in eval_cases] + [
+        f"{case['eval_id']}/follow_up/{i}" for case in eval_cases for i in range(len(case.get('follow_up_evals', [])))
+    ]
+    results = [checkpoint.records[u] for u in units if u in checkpoint.records]
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "dataset": args.dataset,
+        "run": {
+            "backend": get_backend().name,
+            "analysis_model": ai_service.ANALYSIS_MODEL,
+            "follow_up_model": ai_service.FOLLOW_UP_MODEL,
+            "grader_model": GRADER_MODEL,
+            "concurrency": args.concurrency,
+            "wall_seconds": round(time.perf_counter() - started, 2),
+        },
+        "summary": _summarize(results),
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["comparison"] = compare_reports(report, json.load(f))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    _print_summary(report)
+    print(f"\n--- Evaluation Pipeline Complete: report written to {args.output} ---")
+    return report
+
 
-                except Exception as e:
-                    print(f"      FOLLOW-UP EVAL FAILED with error: {e}")
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="eval_dataset.json", help="Evaluation cases to run.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Model stages allowed in flight at once.")
+    parser.add_argument("--output", default=os.path.join(EVALS_DIR, "report.json"), help="Where to write the JSON report.")
+    parser.add_argument("--checkpoint", default=os.path.join(EVALS_DIR, "checkpoint.jsonl"), help="JSONL checkpoint to resume from.")
+    parser.add_argument("--fresh", action="store_true", help="Discard the checkpoint and run every unit again.")
+    parser.add_argument("--compare", help="A previous report to compare scores, latency and tokens against.")
+    parser.add_argument("--use-cache", action="store_true", help="Allow analysis and follow-up answers to come from the caches.")
+    return parser.parse_args(argv)
 
-    print("\n--- Evaluation Pipeline Complete ---")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import llm_backend, result_cache, snapshot_service
+from app.services.stub_backend import StubBackend
+from app.utils.admission import AdmissionController, OverloadedError, parse_admission_limits
+from tests.test_result_cache import CHAPTER_TEXT, CHAPTER_URL
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_and_waiters_run_in_order():
+    controller = AdmissionController("m", max_concurrency=2, max_queue=10, queue_timeout=5)
+    running, peak, order = 0, 0, []
+
+    async def call(i):
+        nonlocal running, peak
+        async with controller.slot():
+            running += 1
+            peak = max(peak, running)
+            order.append(i)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*[call(i) for i in range(6)])
+
+    assert peak == 2
+    assert order == list(range(6))
+    stats = controller.stats()
+    assert stats["admitted"] == 6 and stats["active"] == 0 and stats["queue_depth"] == 0
+    assert stats["max_wait_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_fails_fast_with_retry_after():
+    controller = AdmissionController("m", max_concurrency=1, max_queue=1, queue_timeout=5)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    assert controller.queue_depth == 1
+
+    with pytest.raises(OverloadedError) as excinfo:
+        async with controller.slot():
+            pass
+
+    assert excinfo.value.retry_after >= 1
+    release.set()
+    await asyncio.gather(holder, queued)
+    assert controller.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_and_cancelled_waiters_free_their_place():
+    controller = AdmissionController("m", max_concurrency=1, max_queue=5, queue_timeout=0.05)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(OverloadedError):
+        async with controller.slot():
+            pass
+
+    cancelled = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    release.set()
+    await holder
+    assert controller.stats()["timed_out"] == 1
+    assert controller.stats()["queue_depth"] == 0 and controller.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_handed_over_as_the_wait_times_out_is_released(monkeypatch):
+    controller = AdmissionController("m", max_concurrency=1, max_queue=5, queue_timeout=0.05)
+    await controller._acquire()
+
+    async def wait_for(waiter, timeout):
+        # The holder hands its slot to the waiter in the same iteration as the timeout.
+        controller._release()
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(asyncio, "wait_for", wait_for)
+    with pytest.raises(OverloadedError):
+        await controller._acquire()
+
+    assert controller.stats()["active"] == 0 and controller.stats()["timed_out"] == 1
+
+
+def test_parse_admission_limits():
+    assert parse_admission_limits("models/a=2:8:1.5, models/b=4:16:3") == {
+        "models/a": (2, 8, 1.5),
+        "models/b": (4, 16, 3.0),
+    }
+    with pytest.raises(ValueError):
+        parse_admission_limits("models/a=2:8")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    llm_backend.reset_admission_controllers()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+    result_cache.close_result_cache()
+    llm_backend.reset_admission_controllers()
+
+
+def test_upstream_rate_limit_returns_503_with_retry_after(client):
+    llm_backend.set_backend(StubBackend(error_rate=1.0, error_kinds=["rate_limited"]))
+
+    response = client.post("/api/analyze", json={"chapter_url": CHAPTER_URL, "explanation_scope": "A"})
+    stats = client.get("/api/stats").json()["admission"]
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert stats["models/gemini-2.5-pro"]["admitted"] == 1
+
+
+def test_full_queue_returns_503(client, monkeypatch):
+    monkeypatch.setattr(config, "LLM_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(config, "LLM_MAX_QUEUE", 0)
+    llm_backend.set_backend(StubBackend())
+    controller = llm_backend.get_admission_controller("models/gemini-2.0-flash")
+    controller._active = 1  # simulate a call already holding the only slot
+
+    response = client.post("/api/follow-up", json={
+        "question": "What is s1?",
+        "initial_analysis_text": "An analysis.",
+        "original_url": CHAPTER_URL,
+    })
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert controller.stats()["rejected"] == 1
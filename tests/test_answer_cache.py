@@ -0,0 +1,101 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.chapters import CHAPTERS_DATA
+from app.main import app
+from app.services import llm_backend, result_cache, snapshot_service
+from app.services.answer_cache import FollowUpAnswerCache, normalize_question
+from app.services.scraper_service import _parse_document
+from app.services.stub_backend import StubBackend
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+CHAPTER_2_URL = next(c["url"] for c in CHAPTERS_DATA if c["id"] == 2)
+
+
+def _cache(max_entries=100):
+    return FollowUpAnswerCache(max_entries=max_entries, ttl_seconds=60, threshold=0.8)
+
+
+def test_rewordings_normalize_to_the_same_question():
+    assert normalize_question("What are the limits on freedom of expression?") == normalize_question("Limits on freedom of expression")
+    assert normalize_question("Is privacy limited?").text != normalize_question("Is privacy not limited?").text
+
+
+def test_near_duplicate_questions_share_an_answer():
+    cache = _cache()
+    cache.set("doc", "What are the limits on freedom of expression?", "Propaganda for war is excluded.")
+
+    hit = cache.get("doc", "What are the limits of freedom of expresion?")
+
+    assert hit.answer == "Propaganda for war is excluded."
+    assert 0.8 <= hit.similarity < 1.0
+    assert cache.get("doc", "Who appoints the judges?") is None
+    stats = cache.stats()
+    assert (stats["near_hits"], stats["misses"], stats["near_hit_similarity"]["0.8-0.9"]) == (1, 1, 1)
+
+
+def test_questions_with_swapped_subject_and_object_do_not_share_an_answer():
+    cache = _cache()
+    question, swapped = "Can the President dismiss Parliament?", "Can Parliament dismiss the President?"
+    cache.set("doc", question, "No. Parliament can only be dissolved in the circumstances of section 50.")
+
+    assert normalize_question(question).text != normalize_question(swapped).text
+    assert cache.get("doc", swapped) is None
+    assert cache.get("doc", question).similarity == 1.0
+
+
+def test_answers_never_cross_documents_or_numbers():
+    cache = _cache()
+    cache.set("chapter-2", "What does section 25 say about property?", "Property may be expropriated only ...")
+
+    assert cache.get("chapter-3", "What does section 25 say about property?") is None
+    assert cache.get("chapter-2", "What does section 26 say about property?") is None
+    assert cache.get("chapter-2", "section 25 property") is not None
+
+
+def test_evicted_questions_leave_the_similarity_index():
+    cache = _cache(max_entries=2)
+    for question in ["Who is sovereign?", "What are the national languages?", "What is the national flag?"]:
+        cache.set("doc", question, "An answer.")
+
+    assert cache.get("doc", "Who is sovereign") is None
+    assert len(cache._indexes["doc"]) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    with open(os.path.join(FIXTURES, "gov_za_chapter_2.html"), encoding="utf-8") as f:
+        snapshot_service.write_snapshot([(CHAPTER_2_URL, _parse_document(f.read()))], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+    result_cache.close_result_cache()
+
+
+def _ask(client, question):
+    return client.post("/api/follow-up", json={
+        "question": question,
+        "initial_analysis_text": "The Bill of Rights protects everyone.",
+        "original_url": CHAPTER_2_URL,
+    }).json()
+
+
+def test_reworded_follow_up_is_answered_from_the_cache(client):
+    backend = StubBackend()
+    llm_backend.set_backend(backend)
+
+    first = _ask(client, "What does s16 limit?")
+    second = _ask(client, "Limits on freedom of expression")
+
+    assert second == {"answer": first["answer"]}
+    assert backend.call_count == 1
+    stats = client.get("/api/stats").json()["follow_up_answer_cache"]
+    # "What does Freedom of expression limit?": the same words in another order.
+    assert stats["near_hits"] == 1 and stats["hit_ratio"] == 0.5
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import ai_service, llm_backend, result_cache
+from app.services.stub_backend import StubBackend
+from tests.test_result_cache import CHAPTER_TEXT
+
+CHAPTER_URLS = [f"https://www.gov.za/documents/constitution/chapter-{n}" for n in (1, 2)]
+MISSING_URL = "https://www.gov.za/documents/constitution/chapter-99"
+
+
+@pytest.fixture
+def scrapes(monkeypatch):
+    calls = []
+
+    async def fake_fetch(url):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        if url == MISSING_URL:
+            raise RuntimeError(f"Failed to fetch URL: {url}")
+        return CHAPTER_TEXT + url
+
+    monkeypatch.setattr(ai_service, "fetch_and_parse_url", fake_fetch)
+    return calls
+
+
+@pytest.fixture
+def client(monkeypatch, scrapes):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", "")
+    monkeypatch.setattr(config, "BATCH_MAX_CONCURRENCY", 4)
+    result_cache.close_result_cache()
+    llm_backend.set_backend(StubBackend(latency="fixed:0.3"))
+    with TestClient(app) as test_client:
+        yield test_client
+    result_cache.close_result_cache()
+
+
+def _items():
+    return [
+        {"chapter_url": CHAPTER_URLS[0], "explanation_scope": "A"},
+        {"chapter_url": CHAPTER_URLS[0], "explanation_scope": "B"},
+        {"chapter_url": CHAPTER_URLS[1], "explanation_scope": "A"},
+        {"chapter_url": MISSING_URL, "explanation_scope": "A"},
+    ]
+
+
+def test_batch_runs_items_concurrently_with_partial_failure(client, scrapes):
+    start = time.monotonic()
+    response = client.post("/api/analyze/batch", json={"items": _items()})
+    elapsed = time.monotonic() - start
+
+    body = response.json()
+    assert response.status_code == 200
+    assert [item["status"] for item in body["items"]] == ["ok", "ok", "ok", "error"]
+    assert body["items"][3]["status_code"] == 400
+    assert body["succeeded"] == 3 and body["failed"] == 1
+    # Three 0.3s generations ran side by side, and chapter 1 was scraped once.
+    assert elapsed < 0.8
+    assert sorted(scrapes) == sorted([*CHAPTER_URLS, MISSING_URL])
+
+
+def test_batch_concurrency_is_bounded(client, monkeypatch):
+    monkeypatch.setattr(config, "BATCH_MAX_CONCURRENCY", 1)
+
+    start = time.monotonic()
+    response = client.post("/api/analyze/batch", json={"items": _items()[:3]})
+
+    assert response.json()["succeeded"] == 3
+    assert time.monotonic() - start >= 0.9
+
+
+def test_batch_stream_emits_items_as_they_complete(client):
+    with client.stream("POST", "/api/analyze/batch/stream", json={"items": _items()}) as response:
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    # The failed scrape finishes long before any generation does.
+    assert events[0]["event"] == "item" and events[0]["index"] == 3 and events[0]["status"] == "error"
+    assert sorted(e["index"] for e in events[:-1]) == [0, 1, 2, 3]
+    assert events[-1] == {"event": "complete", "succeeded": 3, "failed": 1}
+
+
+def test_batch_rejects_empty_request(client):
+    assert client.post("/api/analyze/batch", json={"items": []}).status_code == 422
@@ -0,0 +1,135 @@
+import os
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import cassette_service, llm_backend, result_cache, scraper_service, snapshot_service
+from app.services.cassette_backend import CassetteBackend
+from app.services.stub_backend import StubBackend
+from app.utils.cassette import CassetteMissError, CassetteStore
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+URL = "https://www.gov.za/documents/constitution/chapter-1-founding-provisions"
+
+
+@pytest.fixture
+def cassette_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CASSETTE_DIR", str(tmp_path / "cassettes"))
+    cassette_service.reset_cassette_store()
+    scraper_service.clear_document_cache()
+    yield tmp_path / "cassettes"
+    scraper_service.set_http_client(None)
+    cassette_service.reset_cassette_store()
+    scraper_service.clear_document_cache()
+    llm_backend.set_backend(None)
+
+
+def _use_mode(monkeypatch, mode):
+    monkeypatch.setattr(config, "CASSETTE_MODE", mode)
+    cassette_service.reset_cassette_store()
+    scraper_service.clear_document_cache()
+
+
+@pytest.mark.asyncio
+async def test_scraper_replays_recorded_pages_without_the_network(cassette_dir, monkeypatch):
+    with open(os.path.join(FIXTURES, "gov_za_chapter_1.html"), encoding="utf-8") as f:
+        page = f.read()
+    requests = []
+
+    def serve(request):
+        requests.append(request)
+        return httpx.Response(200, text=page, headers={"etag": '"v1"'})
+
+    def unreachable(request):
+        raise httpx.ConnectError("offline", request=request)
+
+    _use_mode(monkeypatch, "auto")
+    scraper_service.set_http_client(httpx.AsyncClient(transport=httpx.MockTransport(serve)))
+    recorded = await scraper_service.fetch_and_parse_url(URL)
+
+    _use_mode(monkeypatch, "replay")
+    scraper_service.set_http_client(httpx.AsyncClient(transport=httpx.MockTransport(unreachable)))
+    replayed = await scraper_service.fetch_and_parse_url(URL)
+
+    assert replayed == recorded
+    assert len(requests) == 1
+    assert cassette_service.get_cassette_stats()["hits"] == 1
+    with pytest.raises(CassetteMissError):
+        await scraper_service.fetch_and_parse_url(URL + "-unrecorded")
+
+
+@pytest.mark.asyncio
+async def test_model_responses_are_replayed_per_prompt(cassette_dir):
+    recorder = CassetteBackend(StubBackend(), CassetteStore(str(cassette_dir), "record"))
+    recorded = await recorder.generate("models/flash", "Answer the question.")
+    recorded_chunks = [c async for c in recorder.stream("models/flash", "Stream the answer.")]
+
+    # A backend that would fail every call proves nothing reaches it.
+    player = CassetteBackend(StubBackend(error_rate=1.0), CassetteStore(str(cassette_dir), "replay"))
+
+    assert await player.generate("models/flash", "Answer the question.") == recorded
+    assert [c async for c in player.stream("models/flash", "Stream the answer.")] == recorded_chunks
+    with pytest.raises(CassetteMissError):
+        await player.generate("models/pro", "Answer the question.")
+
+
+@pytest.mark.asyncio
+async def test_replay_can_keep_the_original_latency(cassette_dir):
+    recorder = CassetteBackend(StubBackend(latency="fixed:0.05"), CassetteStore(str(cassette_dir), "record"))
+    await recorder.generate("models/flash", "Slow call.")
+
+    timings = {}
+    for latency in ("zero", "original"):
+        player = CassetteBackend(StubBackend(), CassetteStore(str(cassette_dir), "replay", latency))
+        started = time.perf_counter()
+        await player.generate("models/flash", "Slow call.")
+        timings[latency] = time.perf_counter() - started
+
+    assert timings["zero"] < 0.02
+    assert timings["original"] >= 0.045
+
+
+def test_replay_miss_is_a_clear_error_response(cassette_dir, monkeypatch):
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(cassette_dir / "no-snapshot.json.gz"))
+    monkeypatch.setattr(config, "SEARCH_INDEX_AT_STARTUP", False)
+    _use_mode(monkeypatch, "replay")
+    with TestClient(app) as client:
+        response = client.get("/api/chapters/1/sections")
+
+    assert response.status_code == 503
+    assert "No cassette recorded" in response.json()["detail"]
+
+
+def test_replay_miss_of_a_model_call_is_a_clear_error_response(cassette_dir, monkeypatch):
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(cassette_dir / "snapshot.json.gz"))
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "LLM_BACKEND", "stub")
+    snapshot_service.write_snapshot([(URL, "1. Republic of South Africa\n\nThe Republic is one, sovereign, democratic state.")], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    _use_mode(monkeypatch, "replay")
+    llm_backend.set_backend(None)
+    try:
+        with TestClient(app) as client:
+            analysis = client.post("/api/analyze", json={"chapter_url": URL, "explanation_scope": "A"})
+            follow_up = client.post("/api/follow-up", json={
+                "question": "Who is sovereign?", "initial_analysis_text": "Founding provisions.", "original_url": URL,
+            })
+    finally:
+        snapshot_service.unload_snapshot()
+        result_cache.close_result_cache()
+
+    for response in (analysis, follow_up):
+        assert response.status_code == 503
+        assert "No cassette recorded for this llm request" in response.json()["detail"]
+
+
+def test_configured_backend_is_wrapped_when_cassettes_are_on(cassette_dir, monkeypatch):
+    monkeypatch.setattr(config, "LLM_BACKEND", "stub")
+    _use_mode(monkeypatch, "auto")
+    llm_backend.set_backend(None)
+
+    assert llm_backend.get_backend().name == "cassette:stub"
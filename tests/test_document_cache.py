@@ -0,0 +1,107 @@
+import httpx
+import pytest
+
+from app.services import scraper_service
+from app.utils.cache import LRUCache
+
+REAL_ASYNC_CLIENT = httpx.AsyncClient
+
+TEST_URL = "https://www.gov.za/documents/constitution/chapter-1-founding-provisions"
+
+PAGE_HTML = """
+<html><body><div class="field">
+  <h2>1. Republic of South Africa</h2>
+  <p>The Republic of South Africa is one, sovereign, democratic state founded on the following values:</p>
+  <ul>
+    <li>(a) Human dignity, the achievement of equality and the advancement of human rights and freedoms.</li>
+    <li>(b) Non-racialism and non-sexism.</li>
+  </ul>
+</div></body></html>
+"""
+
+
+@pytest.fixture
+def fake_gov_za(monkeypatch):
+    """
+    Routes the scraper's HTTP client to an in-memory handler that honours
+    If-None-Match, and records every request it receives.
+    """
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, text=PAGE_HTML, headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(
+        scraper_service.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: REAL_ASYNC_CLIENT(transport=httpx.MockTransport(handler)),
+    )
+    scraper_service.clear_document_cache()
+    yield requests
+    scraper_service.clear_document_cache()
+
+
+@pytest.mark.asyncio
+async def test_repeat_fetch_is_served_from_cache(fake_gov_za):
+    first = await scraper_service.fetch_and_parse_url(TEST_URL)
+    second = await scraper_service.fetch_and_parse_url(TEST_URL)
+
+    assert first == second
+    assert "Non-racialism and non-sexism." in first
+    assert len(fake_gov_za) == 1
+
+    stats = scraper_service.get_document_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_revalidated_with_conditional_get(fake_gov_za, monkeypatch):
+    await scraper_service.fetch_and_parse_url(TEST_URL)
+
+    # Move the cache's clock past the TTL so the entry becomes stale.
+    cache = scraper_service._document_cache
+    now = cache.now()
+    monkeypatch.setattr(cache, "_clock", lambda: now + cache.ttl_seconds + 1)
+
+    text = await scraper_service.fetch_and_parse_url(TEST_URL)
+
+    assert "Human dignity" in text
+    assert fake_gov_za[-1].headers["if-none-match"] == '"v1"'
+    assert scraper_service.get_document_cache_stats()["revalidated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_when_revalidation_fails(fake_gov_za, monkeypatch):
+    original = await scraper_service.fetch_and_parse_url(TEST_URL)
+
+    cache = scraper_service._document_cache
+    now = cache.now()
+    monkeypatch.setattr(cache, "_clock", lambda: now + cache.ttl_seconds + 1)
+
+    def failing_handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("gov.za is down", request=request)
+
+    monkeypatch.setattr(
+        scraper_service.httpx,
+        "AsyncClient",
+        lambda *args, **kwargs: REAL_ASYNC_CLIENT(transport=httpx.MockTransport(failing_handler)),
+    )
+
+    assert await scraper_service.fetch_and_parse_url(TEST_URL) == original
+    assert scraper_service.get_document_cache_stats()["stale_served"] == 1
+
+
+def test_lru_eviction_respects_max_entries():
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "a" is now the most recently used entry
+    cache.set("c", 3)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.evictions == 1
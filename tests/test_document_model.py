@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.chapters import CHAPTERS_DATA
+from app.main import app
+from app.models.document import ChapterDocument
+from app.services import document_service, snapshot_service
+from app.services.scraper_service import _parse_document
+from app.utils import sections
+from app.utils.sections import parse_chapter_text
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _fixture_text(number):
+    with open(os.path.join(FIXTURES, f"gov_za_chapter_{number}.html"), encoding="utf-8") as f:
+        return _parse_document(f.read())
+
+
+def _records(document):
+    for section in document.sections:
+        yield section
+        for subsection in section.subsections:
+            yield subsection
+            yield from subsection.items
+
+
+def test_chapter_is_parsed_into_sections_subsections_and_items():
+    document = parse_chapter_text(_fixture_text(1))
+
+    assert [s.number for s in document.sections] == [None, "1", "2", "3", "4", "5", "6"]
+    citizenship = document.section("3")
+    assert citizenship.title == "Citizenship"
+    assert [s.label for s in citizenship.subsections] == ["1", "2", "3"]
+    assert [i.label for i in citizenship.subsections[1].items] == ["a", "b"]
+    # Nested <li><p> markup repeats blocks; they are not separate subsections.
+    assert [s.label for s in document.section("6").subsections] == ["1", "2", "3"]
+    # A numbered footnote after section 6 is body text, not a new "section 1".
+    assert document.section("1").title == "Republic of South Africa"
+    assert "Schedule 1 was substituted" in document.section("6").text
+
+
+def test_every_record_carries_its_offsets():
+    document = parse_chapter_text(_fixture_text(2))
+
+    for record in _records(document):
+        assert document.text[record.start:record.end] == record.text
+
+
+def test_document_round_trips_through_json():
+    document = parse_chapter_text(_fixture_text(2), chapter_id=2, title="Chapter 2: Bill of Rights")
+
+    restored = ChapterDocument.from_dict(json.loads(json.dumps(document.to_dict())))
+
+    assert restored.to_dict() == document.to_dict()
+    assert restored.section("16").title == document.section("16").title
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    chapter_2_url = next(c["url"] for c in CHAPTERS_DATA if c["id"] == 2)
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    snapshot_service.write_snapshot([(chapter_2_url, _fixture_text(2))], config.CORPUS_SNAPSHOT_PATH)
+    document_service.clear_documents()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+    document_service.clear_documents()
+
+
+def test_section_endpoint_serves_a_section_without_reparsing(client, monkeypatch):
+    parses = []
+    original = document_service.parse_chapter_text
+    monkeypatch.setattr(document_service, "parse_chapter_text", lambda *a, **kw: parses.append(1) or original(*a, **kw))
+
+    listing = client.get("/api/chapters/2/sections").json()
+    section = client.get("/api/chapters/2/sections/16").json()
+
+    assert listing["title"] == "Chapter 2: Bill of Rights"
+    assert "text" not in listing["sections"][1]
+    assert section["number"] == "16" and section["title"] == "Freedom of expression"
+    assert [s["label"] for s in section["subsections"]] == ["1", "2", "3"]
+    assert len(parses) == 1
+
+
+def test_unknown_chapter_or_section_returns_404(client):
+    assert client.get("/api/chapters/99/sections").status_code == 404
+    assert client.get("/api/chapters/2/sections/999").status_code == 404
+
+
+def test_split_into_sections_is_backed_by_the_document_model():
+    text = _fixture_text(2)
+
+    assert [s.number for s in sections.split_into_sections(text)] == [s.number for s in parse_chapter_text(text).sections]
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import ai_service, llm_backend, result_cache, snapshot_service
+from app.services.stub_backend import StubBackend
+from tests.test_result_cache import CHAPTER_TEXT, CHAPTER_URL
+
+QUESTIONS = ["What is the Republic founded on?", "Who is sovereign?", "What are the national languages?"]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+    result_cache.close_result_cache()
+
+
+def _ask(client, **fields):
+    return client.post("/api/follow-up", json={
+        "initial_analysis_text": "The chapter sets out the founding provisions.",
+        "original_url": CHAPTER_URL,
+        **fields,
+    })
+
+
+def test_several_questions_are_answered_in_one_call(client):
+    backend = StubBackend()
+    llm_backend.set_backend(backend)
+
+    response = _ask(client, questions=QUESTIONS)
+
+    assert response.status_code == 200
+    answers = response.json()["answers"]
+    assert [a["question"] for a in answers] == QUESTIONS
+    assert "question 3" in answers[2]["answer"]
+    assert backend.call_count == 1
+    assert backend.recent_calls[0].text.count(CHAPTER_TEXT[:40]) == 1
+
+
+def test_skipped_questions_are_retried_individually(client):
+    # Answers only the second question, in a different order and keyed by text.
+    backend = StubBackend(responses={"follow_up_multi": {"answers": [
+        {"question": QUESTIONS[1].upper(), "answer": "The people."},
+        {"id": 1, "answer": ""},
+    ]}})
+    llm_backend.set_backend(backend)
+
+    answers = _ask(client, questions=QUESTIONS).json()["answers"]
+
+    assert answers[1]["answer"] == "The people."
+    assert "stub answer" in answers[0]["answer"] and "stub answer" in answers[2]["answer"]
+    assert backend.call_count == 3
+    assert QUESTIONS[0] in backend.recent_calls[1].text or QUESTIONS[0] in backend.recent_calls[2].text
+
+
+class FailingQuestionBackend(StubBackend):
+    """Fails every call that asks `question` on its own."""
+
+    def __init__(self, question, **kwargs):
+        super().__init__(**kwargs)
+        self.question = question
+
+    async def generate(self, model, prompt, json_mode=True):
+        if self.question in prompt and QUESTIONS[1] not in prompt:
+            raise RuntimeError("Injected failure.")
+        return await super().generate(model, prompt, json_mode)
+
+
+def test_one_failed_question_does_not_discard_the_other_answers(client):
+    # The combined call answers only the second question; retrying the third fails.
+    backend = FailingQuestionBackend(QUESTIONS[2], responses={"follow_up_multi": {"answers": [
+        {"id": 2, "answer": "The people."},
+    ]}})
+    llm_backend.set_backend(backend)
+
+    response = _ask(client, questions=QUESTIONS)
+
+    assert response.status_code == 200
+    first, second, third = response.json()["answers"]
+    assert "stub answer" in first["answer"] and second["answer"] == "The people."
+    assert third["question"] == QUESTIONS[2] and third["answer"] is None and third["error"]
+
+
+def test_invalid_combined_response_falls_back_to_individual_calls(client):
+    backend = StubBackend(responses={"follow_up_multi": {"unexpected": True}})
+    llm_backend.set_backend(backend)
+
+    answers = _ask(client, questions=QUESTIONS[:2]).json()["answers"]
+
+    assert len(answers) == 2 and all(a["answer"] for a in answers)
+    # The combined call, one request to fix its JSON, then one call per question.
+    assert backend.call_count == 4
+    assert "<broken_json>" in backend.recent_calls[1].text
+
+
+def test_single_question_keeps_its_response_shape(client):
+    llm_backend.set_backend(StubBackend())
+
+    assert "answer" in _ask(client, question=QUESTIONS[0]).json()
+    assert _ask(client).status_code == 422
+
+
+def test_match_answers_ignores_bad_entries():
+    parsed = json.loads('{"answers": [{"id": 0, "answer": "x"}, {"id": "2", "answer": "b"}, "junk", {"id": 2, "answer": "dup"}]}')
+
+    assert ai_service._match_answers(["a", "b"], parsed) == {"b": "b"}
@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import ai_service, llm_backend, result_cache, snapshot_service
+from app.services.stub_backend import StubBackend
+from app.utils.hedging import Hedger
+from tests.test_result_cache import CHAPTER_TEXT, CHAPTER_URL
+
+
+def _call(result, delay, log=None, fail=False):
+    async def fn():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(f"{result} cancelled")
+            raise
+        if fail:
+            raise RuntimeError(f"{result} failed")
+        return result
+    return fn
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_does_not_fire_a_hedge():
+    hedger = Hedger(default_delay=0.5)
+
+    assert await hedger.run(_call("primary", 0), _call("hedge", 0)) == "primary"
+    assert hedger.stats()["fired"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_loses_to_hedge_and_is_cancelled():
+    hedger = Hedger(default_delay=0.02, budget_fraction=1.0)
+    log = []
+
+    start = time.monotonic()
+    result = await hedger.run(_call("primary", 5, log), _call("hedge", 0.01))
+
+    assert result == "hedge"
+    assert time.monotonic() - start < 1
+    await asyncio.sleep(0)
+    assert log == ["primary cancelled"]
+    assert hedger.stats()["fired"] == 1 and hedger.stats()["hedge_wins"] == 1
+    # The cancelled primary still counts, with the time it ran for.
+    assert hedger.stats()["latency_samples"] == 1 and hedger._latencies[0] >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_falls_back_to_primary():
+    hedger = Hedger(default_delay=0.01, budget_fraction=1.0)
+
+    assert await hedger.run(_call("primary", 0.05), _call("hedge", 0, fail=True)) == "primary"
+    assert hedger.stats()["hedge_wins"] == 0
+
+    with pytest.raises(RuntimeError, match="primary failed"):
+        await hedger.run(_call("primary", 0.05, fail=True), _call("hedge", 0, fail=True))
+
+
+@pytest.mark.asyncio
+async def test_budget_limits_hedges():
+    hedger = Hedger(default_delay=0.001, budget_fraction=0.5)
+
+    for _ in range(4):
+        await hedger.run(_call("primary", 0.01), _call("hedge", 0.05))
+
+    stats = hedger.stats()
+    assert stats["fired"] == 2 and stats["budget_denied"] == 2
+
+
+def test_delay_tracks_latency_percentile():
+    hedger = Hedger(percentile=0.9, default_delay=30, min_samples=10)
+    assert hedger.delay() == 30
+
+    for latency in range(1, 11):
+        hedger.record(latency / 10)
+
+    assert hedger.delay() == pytest.approx(0.9)
+
+
+@pytest.mark.asyncio
+async def test_admission_queueing_does_not_fire_a_hedge():
+    hedger = Hedger(default_delay=0.03, budget_fraction=1.0)
+    admitted = asyncio.Event()
+
+    async def queued_primary():
+        await asyncio.sleep(0.1)  # waiting for an admission slot
+        admitted.set()
+        await asyncio.sleep(0.01)
+        return "primary"
+
+    assert await hedger.run(queued_primary, _call("hedge", 0), admitted=admitted) == "primary"
+    assert hedger.stats()["fired"] == 0
+    # Only the time after admission counts towards the hedge delay.
+    assert hedger._latencies[0] < 0.05
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_fires_while_overloaded():
+    hedger = Hedger(default_delay=0.01, budget_fraction=1.0)
+
+    assert await hedger.run(_call("primary", 0.05), _call("hedge", 0), overloaded=lambda: True) == "primary"
+    assert hedger.stats()["fired"] == 0 and hedger.stats()["overload_denied"] == 1
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    monkeypatch.setattr(config, "ANALYSIS_HEDGING_ENABLED", True)
+    monkeypatch.setattr(config, "ANALYSIS_HEDGE_MODEL", ai_service.FOLLOW_UP_MODEL)
+    monkeypatch.setattr(config, "ANALYSIS_HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(config, "ANALYSIS_HEDGE_BUDGET_FRACTION", 1.0)
+    monkeypatch.setattr(ai_service, "_analysis_hedger", None)
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+    result_cache.close_result_cache()
+
+
+def test_hedged_analysis_against_slow_stub_model(client):
+    backend = StubBackend(model_latency={ai_service.ANALYSIS_MODEL: "fixed:5", ai_service.FOLLOW_UP_MODEL: "fixed:0"})
+    llm_backend.set_backend(backend)
+
+    start = time.monotonic()
+    response = client.post("/api/analyze", json={"chapter_url": CHAPTER_URL, "explanation_scope": "A"})
+    elapsed = time.monotonic() - start
+
+    assert response.status_code == 200
+    assert elapsed < 2
+    assert [call.model for call in backend.recent_calls] == [ai_service.FOLLOW_UP_MODEL]
+    stats = client.get("/api/stats").json()["analysis_hedging"]
+    assert stats["fired"] == 1 and stats["hedge_wins"] == 1
@@ -0,0 +1,79 @@
+import os
+import threading
+
+import pytest
+
+from app.core import config
+from app.services import scraper_service
+from app.services.scraper_service import _parse_document
+from app.utils.html_text import extract_text_blocks
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+FIXTURE_FILES = sorted(name for name in os.listdir(FIXTURES) if name.endswith(".html"))
+
+# Markup that exercises the corners of BeautifulSoup's get_text(separator=' ', strip=True).
+EDGE_CASES = [
+    "<div class='a field b'><p>Hi &amp; <b>there</b><!--c-->x<script>s</script>tail</p></div>",
+    "<div class='field'><li>outer<ul><li>inner <p>para</p></li></ul> after</li></div>",
+    "<div class='field'><template><p>hidden</p></template><p>shown<style>p{}</style></p></div>",
+    "<div class='field'><p><ruby>漢<rt>kan</rt><rp>(</rp></ruby> text</p><h1> </h1></div>",
+    "<div class='fieldset'><p>no match</p></div><main><h2>main</h2><p>body</p></main>",
+    "<html><body><h3>only body</h3><p>text\n\n  with   spacing</p></body></html>",
+    "<div class='field'><p>unclosed<p>second<li>item</div><p>outside</p>",
+    "plain text without any tags",
+]
+
+
+def _bs4_blocks(html):
+    return scraper_service._extract_text_blocks_bs4(html)
+
+
+@pytest.mark.parametrize("name", FIXTURE_FILES)
+def test_lxml_engine_matches_beautifulsoup_on_fixtures(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        html = f.read()
+
+    assert extract_text_blocks(html) == _bs4_blocks(html)
+    assert _parse_document(html, "lxml") == _parse_document(html, "bs4")
+
+
+@pytest.mark.parametrize("html", EDGE_CASES)
+def test_lxml_engine_matches_beautifulsoup_on_edge_cases(html):
+    assert extract_text_blocks(html) == _bs4_blocks(html)
+
+
+def test_page_chrome_is_excluded():
+    with open(os.path.join(FIXTURES, "gov_za_chapter_1.html"), encoding="utf-8") as f:
+        text = _parse_document(f.read(), "lxml")
+
+    assert text.startswith("Chapter 1 – Founding Provisions")
+    assert "Main navigation" not in text and "Privacy Policy" not in text and "not content" not in text
+
+
+def test_missing_container_is_rejected_by_both_engines():
+    for engine in ("lxml", "bs4"):
+        with pytest.raises(ValueError):
+            _parse_document("", engine)
+        with pytest.raises(ValueError):
+            _parse_document("<html><body><p>short</p></body></html>", engine)
+
+
+@pytest.mark.asyncio
+async def test_large_pages_are_parsed_off_the_event_loop(monkeypatch):
+    with open(os.path.join(FIXTURES, "gov_za_chapter_2.html"), encoding="utf-8") as f:
+        html = f.read()
+    threads = []
+    original = scraper_service._parse_document
+
+    def recording_parse(page):
+        threads.append(threading.current_thread())
+        return original(page)
+
+    monkeypatch.setattr(scraper_service, "_parse_document", recording_parse)
+    monkeypatch.setattr(config, "SCRAPER_PARSE_IN_THREAD_MIN_CHARS", len(html))
+
+    assert await scraper_service._parse_document_off_loop(html) == original(html)
+    await scraper_service._parse_document_off_loop(html[:-1])
+
+    assert threads[0] is not threading.main_thread()
+    assert threads[1] is threading.main_thread()
@@ -0,0 +1,82 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import ai_service, llm_backend, result_cache, snapshot_service
+from app.services.stub_backend import StubBackend
+from app.utils.http_cache import if_none_match
+from tests.test_result_cache import CHAPTER_TEXT, CHAPTER_URL
+
+ANALYSIS_URL = "/api/analyze?chapter_id=1&scope=A&role=journalist"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+    result_cache.close_result_cache()
+    llm_backend.set_backend(None)
+
+
+def test_if_none_match_parsing():
+    assert if_none_match('"a", W/"b"', '"b"')
+    assert if_none_match("*", '"b"')
+    assert not if_none_match('"a"', '"b"')
+    assert not if_none_match(None, '"b"')
+
+
+def test_revalidated_analysis_is_not_modified_without_a_model_call(client, monkeypatch):
+    backend = StubBackend()
+    llm_backend.set_backend(backend)
+    fetches = []
+
+    async def fetch_and_parse_url(url):
+        fetches.append(url)
+        return CHAPTER_TEXT
+
+    monkeypatch.setattr(ai_service, "fetch_and_parse_url", fetch_and_parse_url)
+
+    first = client.get(ANALYSIS_URL)
+    # One fetch, so the ETag and the body describe the same chapter text.
+    assert fetches == [CHAPTER_URL]
+    assert first.status_code == 200 and "analysis" in first.json() and "session_id" not in first.json()
+    etag = first.headers["ETag"]
+    assert etag.startswith('"') and first.headers["Cache-Control"].startswith("public")
+
+    again = client.get(ANALYSIS_URL, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == etag
+    assert backend.call_count == 1
+
+
+def test_etag_changes_with_the_request_and_the_prompt_version(client, monkeypatch):
+    llm_backend.set_backend(StubBackend())
+    etag = client.get(ANALYSIS_URL).headers["ETag"]
+
+    assert client.get("/api/analyze?chapter_id=1&scope=B&role=journalist").headers["ETag"] != etag
+    monkeypatch.setattr(ai_service, "PROMPT_VERSION", "next")
+    assert client.get(ANALYSIS_URL, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_equivalent_queries_redirect_to_the_canonical_url(client):
+    llm_backend.set_backend(StubBackend())
+
+    response = client.get("/api/analyze?role=%20Journalist&scope=A&chapter_id=1", follow_redirects=False)
+
+    assert response.status_code == 308
+    assert response.headers["Location"] == ANALYSIS_URL
+    assert client.get("/api/analyze?chapter_id=99&scope=A").status_code == 404
+
+
+def test_chapters_are_cacheable(client):
+    first = client.get("/api/chapters")
+    assert first.status_code == 200 and first.headers["Cache-Control"].startswith("public")
+
+    again = client.get("/api/chapters", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
@@ -0,0 +1,55 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.http_client import create_http_client
+from app.main import app
+from app.services import scraper_service
+from tests.test_document_cache import PAGE_HTML, TEST_URL
+
+
+def test_lifespan_injects_and_closes_shared_client():
+    with TestClient(app):
+        client = scraper_service._http_client
+        assert isinstance(client, httpx.AsyncClient)
+        assert not client.is_closed
+
+    assert scraper_service._http_client is None
+    assert client.is_closed
+
+
+def test_client_uses_configured_pool_and_timeouts(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_READ_TIMEOUT_SECONDS", 7.5)
+    monkeypatch.setattr(config, "HTTP_CONNECT_TIMEOUT_SECONDS", 2.0)
+
+    client = create_http_client()
+
+    assert client.timeout.read == 7.5
+    assert client.timeout.connect == 2.0
+    assert client.follow_redirects is True
+
+
+@pytest.mark.asyncio
+async def test_scraper_reuses_injected_client(monkeypatch):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        return httpx.Response(200, text=PAGE_HTML)
+
+    def fail_if_called(*args, **kwargs):
+        raise AssertionError("A new client must not be created when one is injected.")
+
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    scraper_service.set_http_client(shared)
+    scraper_service.clear_document_cache()
+    monkeypatch.setattr(scraper_service, "create_http_client", fail_if_called)
+    try:
+        await scraper_service.fetch_and_parse_url(TEST_URL)
+    finally:
+        scraper_service.set_http_client(None)
+        scraper_service.clear_document_cache()
+        await shared.aclose()
+
+    assert len(calls) == 1
@@ -0,0 +1,141 @@
+import asyncio
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import llm_backend, result_cache, snapshot_service
+from app.services.stub_backend import StubBackend, parse_latency
+from tests.test_result_cache import CHAPTER_TEXT, CHAPTER_URL
+
+
+def test_latency_specs():
+    rng = random.Random(1)
+
+    assert parse_latency("fixed:0.25", rng)() == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1,0.2", rng)() <= 0.2
+    assert parse_latency("normal:-5,0.1", rng)() == 0.0  # clamped at zero
+    with pytest.raises(ValueError):
+        parse_latency("uniform:1", rng)
+
+
+@pytest.mark.asyncio
+async def test_stub_echoes_questions_and_reports_usage():
+    backend = StubBackend()
+    prompt = '<question>What is s16?</question> "answered_questions"'
+
+    response = await backend.generate("models/test", prompt)
+
+    assert '"What is s16?"' in response.text
+    assert response.prompt_tokens and response.response_tokens
+    assert backend.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stub_error_injection_is_seeded():
+    async def outcomes(seed):
+        backend = StubBackend(error_rate=0.5, error_kinds=["error", "blocked"], seed=seed)
+        results = []
+        for _ in range(20):
+            try:
+                response = await backend.generate("m", "p")
+                results.append(response.blocked_reason or "ok")
+            except RuntimeError:
+                results.append("error")
+        return results
+
+    first, second = await outcomes(7), await outcomes(7)
+    assert first == second
+    assert {"ok", "error", "SAFETY"} <= set(first)
+
+
+@pytest.mark.asyncio
+async def test_stub_streams_at_configured_token_rate():
+    backend = StubBackend(tokens_per_second=2000)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    chunks = [chunk async for chunk in backend.stream("m", "follow-up prompt")]
+    elapsed = loop.time() - start
+
+    text = "".join(c.text for c in chunks)
+    assert len(chunks) > 1
+    assert elapsed >= (len(text) / 4) / 2000 * 0.9
+    assert chunks[-1].response_tokens
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    backend = StubBackend()
+    llm_backend.set_backend(backend)
+    with TestClient(app) as test_client:
+        yield test_client, backend
+    snapshot_service.unload_snapshot()
+    result_cache.close_result_cache()
+
+
+def test_full_pipeline_runs_offline_with_stub(client):
+    test_client, backend = client
+
+    analysis = test_client.post("/api/analyze", json={
+        "chapter_url": CHAPTER_URL,
+        "explanation_scope": "C",
+        "follow_up_questions": ["Who is sovereign?"],
+    })
+    follow_up = test_client.post("/api/follow-up", json={
+        "question": "What values is the state founded on?",
+        "initial_analysis_text": analysis.json()["analysis"],
+        "original_url": CHAPTER_URL,
+    })
+
+    assert analysis.status_code == 200
+    assert analysis.json()["answered_questions"][0]["question"] == "Who is sovereign?"
+    assert follow_up.status_code == 200
+    assert "stub answer" in follow_up.json()["answer"]
+    assert [call.model for call in backend.recent_calls] == ["models/gemini-2.5-pro", "models/gemini-2.0-flash"]
+
+
+def test_blocked_stub_response_surfaces_as_error(client):
+    test_client, _ = client
+    llm_backend.set_backend(StubBackend(error_rate=1.0, error_kinds=["blocked"]))
+
+    response = test_client.post("/api/analyze", json={"chapter_url": CHAPTER_URL, "explanation_scope": "A"})
+
+    assert response.status_code == 400
+
+
+class WarmUpRecorder(StubBackend):
+    def __init__(self):
+        super().__init__()
+        self.warmed_up = []
+
+    def warm_up(self, models):
+        self.warmed_up.extend(models)
+
+
+def test_startup_warms_up_every_model_the_service_calls(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "missing.json.gz"))
+    backend = WarmUpRecorder()
+    llm_backend.set_backend(backend)
+
+    with TestClient(app):
+        pass
+
+    assert backend.warmed_up == ["models/gemini-2.5-pro", "models/gemini-2.0-flash"]
+
+
+def test_gemini_backend_reuses_model_handles_and_configs():
+    from app.services.gemini_backend import GeminiBackend
+
+    backend = GeminiBackend(api_key="test-key")
+    backend.warm_up(["models/gemini-2.0-flash"])
+
+    assert backend._model("models/gemini-2.0-flash") is backend._model("models/gemini-2.0-flash")
+    assert backend._generation_config(True) is backend._generation_config(True)
+    assert backend._generation_config(False) is None
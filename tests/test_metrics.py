@@ -0,0 +1,106 @@
+import re
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.metrics import REGISTRY, Registry
+from app.main import app
+from app.services import llm_backend, result_cache, scraper_service, snapshot_service
+from app.services.stub_backend import StubBackend
+from tests.test_result_cache import CHAPTER_TEXT, CHAPTER_URL
+
+
+def _sample(text, name, **labels):
+    """The value of one sample in a Prometheus text exposition, or None."""
+    for line in text.splitlines():
+        if line.startswith(name + "{") or line.startswith(name + " "):
+            sample_labels = dict(re.findall(r'(\w+)="([^"]*)"', line.split(" ")[0]))
+            if all(sample_labels.get(k) == v for k, v in labels.items()):
+                return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_render_follows_the_text_format():
+    registry = Registry()
+    calls = registry.counter("calls", "Calls made.", ["model"])
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    calls.inc(model='models/"pro"')
+    calls.inc(2, model='models/"pro"')
+    for seconds in (0.05, 0.1, 0.5, 3):
+        latency.observe(seconds)
+
+    text = registry.render()
+
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{model="models/\\"pro\\""} 3' in text
+    # Buckets are cumulative and inclusive of their upper bound.
+    assert _sample(text, "latency_seconds_bucket", le="0.1") == 2
+    assert _sample(text, "latency_seconds_bucket", le="1") == 3
+    assert _sample(text, "latency_seconds_bucket", le="+Inf") == 4
+    assert _sample(text, "latency_seconds_sum") == pytest.approx(3.65)
+    with pytest.raises(ValueError):
+        registry.counter("calls", "Again.")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    REGISTRY.clear()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+    result_cache.close_result_cache()
+    llm_backend.set_backend(None)
+
+
+def test_metrics_endpoint_reports_stages_tokens_and_caches(client):
+    llm_backend.set_backend(StubBackend())
+    body = {"chapter_url": CHAPTER_URL, "explanation_scope": "A", "analysis_role": "Journalist"}
+    client.post("/api/analyze", json=body)
+    client.post("/api/analyze", json=body)
+
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    model = "models/gemini-2.5-pro"
+    assert _sample(text, "analyzer_model_call_duration_seconds_count", model=model, outcome="ok") == 1
+    assert _sample(text, "analyzer_model_tokens_total", model=model, kind="prompt") > 0
+    assert _sample(text, "analyzer_model_tokens_total", model=model, kind="response") > 0
+    for stage in ("prompt", "model", "decode"):
+        assert _sample(text, "analyzer_stage_duration_seconds_count", stage=stage) == 1
+    assert _sample(text, "analyzer_cache_lookups_total", cache="analysis_result", result="hit") == 1
+    assert _sample(text, "analyzer_cache_hit_ratio", cache="analysis_result") == 0.5
+    assert _sample(text, "analyzer_admission_active", model=model) == 0
+
+
+@pytest.mark.asyncio
+async def test_scraper_records_fetch_parse_and_upstream_errors():
+    with open("tests/fixtures/gov_za_chapter_1.html", encoding="utf-8") as f:
+        page = f.read()
+
+    def serve(request):
+        if request.url.path.endswith("missing"):
+            return httpx.Response(503)
+        return httpx.Response(200, text=page)
+
+    REGISTRY.clear()
+    scraper_service.clear_document_cache()
+    scraper_service.set_http_client(httpx.AsyncClient(transport=httpx.MockTransport(serve)))
+    try:
+        await scraper_service.fetch_and_parse_url(CHAPTER_URL + "-live")
+        with pytest.raises(RuntimeError):
+            await scraper_service.fetch_and_parse_url(CHAPTER_URL + "-missing")
+    finally:
+        scraper_service.set_http_client(None)
+        scraper_service.clear_document_cache()
+
+    text = REGISTRY.render()
+    assert _sample(text, "analyzer_stage_duration_seconds_count", stage="fetch") == 2
+    assert _sample(text, "analyzer_stage_duration_seconds_count", stage="parse") == 1
+    assert _sample(text, "analyzer_upstream_errors_total", upstream="gov.za", error="http_5xx") == 1
@@ -0,0 +1,88 @@
+import json
+import time
+
+import pytest
+
+from app.core.metrics import JSON_RECOVERIES
+from app.models.schemas import AnalysisResponse
+from app.services import ai_service, llm_backend
+from app.services.stub_backend import StubBackend
+from app.utils.parsers import extract_json_from_string, find_json_spans, iter_json_objects, repair_json
+
+ANALYSIS = {"analysis": "Chapter 1 sets out the founding values.", "answered_questions": [{"question": "Q1", "answer": "A1"}]}
+
+
+def test_objects_are_found_among_prose_and_braces_in_strings():
+    text = 'Here is the {result}: ```json\n{"answer": "Use {braces} and \\"quotes\\"."}\n``` Anything else?'
+
+    assert [complete for _, _, complete in find_json_spans(text)] == [True, True]
+    assert extract_json_from_string(text) == {"answer": 'Use {braces} and "quotes".'}
+    assert extract_json_from_string("No JSON here.") is None
+
+
+@pytest.mark.parametrize("damaged, expected", [
+    ('{"answer": "a", "items": [1, 2,],}', {"answer": "a", "items": [1, 2]}),
+    ('{"answer": "line one\nline\ttwo"}', {"answer": "line one\nline\ttwo"}),
+    ('{"analysis": "The Republic is one, sovereign', {"analysis": "The Republic is one, sovereign"}),
+    ('{"analysis": "ends mid-escape \\u00', {"analysis": "ends mid-escape "}),
+    ('{"analysis": "x", "count": 12', {"analysis": "x", "count": 12}),
+    ('{"analysis": "x", "answered_questions": [{"question": "Q1", "answer": "A1"}, {"question": "Q2", "answer": "A',
+     {"analysis": "x", "answered_questions": [{"question": "Q1", "answer": "A1"}]}),
+    ('{"analysis": "x", "sections": ["s1", "s2", "s', {"analysis": "x", "sections": ["s1", "s2", "s"]}),
+    ('{"analysis": "x", "meta": {"source": "gov.za", "ver', {"analysis": "x", "meta": {"source": "gov.za"}}),
+    ('{"analysis": "x", "answered_', {"analysis": "x"}),
+    ('{"analysis": "x", "flag": tr', {"analysis": "x"}),
+])
+def test_common_defects_are_repaired(damaged, expected):
+    assert json.loads(repair_json(damaged)) == expected
+
+
+def test_scanning_is_linear_in_the_text_size():
+    def seconds(size):
+        text = "Notes {" + json.dumps({"analysis": "word \\\"{[ " * size})[1:-1]
+        started = time.perf_counter()
+        assert list(iter_json_objects(text))[0][1] == "repaired"
+        return time.perf_counter() - started
+
+    small, large = seconds(5_000), seconds(50_000)
+    assert large < small * 30
+
+
+class ScriptedBackend(StubBackend):
+    """Answers the analysis prompt with `text`, and fix requests with a valid analysis."""
+
+    def __init__(self, text):
+        super().__init__()
+        self.text = text
+
+    def _canned_text(self, prompt):
+        return json.dumps(ANALYSIS) if "<broken_json>" in prompt else self.text
+
+
+@pytest.mark.asyncio
+async def test_malformed_response_is_repaired_without_another_call():
+    backend = ScriptedBackend("Sure! ```json\n" + json.dumps(ANALYSIS, indent=2)[:-20])
+    llm_backend.set_backend(backend)
+    before = JSON_RECOVERIES.value(method="repaired")
+    try:
+        parsed = await ai_service._generate_json(ai_service.ANALYSIS_MODEL, "Analyze.", AnalysisResponse)
+    finally:
+        llm_backend.set_backend(None)
+
+    assert parsed["analysis"] == ANALYSIS["analysis"]
+    assert backend.call_count == 1
+    assert JSON_RECOVERIES.value(method="repaired") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_unrepairable_response_gets_one_fix_call_to_the_fast_model():
+    backend = ScriptedBackend("I'm sorry, I cannot format this as JSON.")
+    llm_backend.set_backend(backend)
+    try:
+        parsed = await ai_service._generate_json(ai_service.ANALYSIS_MODEL, "Analyze.", AnalysisResponse)
+    finally:
+        llm_backend.set_backend(None)
+
+    assert parsed == ANALYSIS
+    assert [call.model for call in backend.recent_calls] == [ai_service.ANALYSIS_MODEL, ai_service.FOLLOW_UP_MODEL]
+    assert "I'm sorry" in backend.recent_calls[1].text
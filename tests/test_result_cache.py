@@ -0,0 +1,98 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import ai_service, result_cache, snapshot_service
+from app.services.result_cache import AnalysisResultCache
+
+RESULT = {"analysis": "Chapter 1 sets out the founding values.", "answered_questions": []}
+CHAPTER_URL = "https://www.gov.za/documents/constitution/chapter-1-founding-provisions"
+CHAPTER_TEXT = "1. Republic of South Africa\n\n" + "The Republic is one, sovereign, democratic state. " * 10
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_hit(tmp_path):
+    cache = AnalysisResultCache(memory_entries=4, ttl_seconds=60, disk_path=str(tmp_path / "cache.sqlite3"))
+    await cache.set("request", "doc-v1", RESULT)
+
+    assert await cache.get("request", "doc-v1") == RESULT
+    assert cache.stats()["memory_hits"] == 1
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = AnalysisResultCache(memory_entries=4, ttl_seconds=60, disk_path=path)
+    await first.set("request", "doc-v1", RESULT)
+    first.close()
+
+    second = AnalysisResultCache(memory_entries=4, ttl_seconds=60, disk_path=path)
+    assert await second.get("request", "doc-v1") == RESULT
+    assert second.stats()["disk_hits"] == 1
+    second.close()
+
+
+@pytest.mark.asyncio
+async def test_disk_hit_is_promoted_with_its_remaining_ttl(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = AnalysisResultCache(memory_entries=4, ttl_seconds=60, disk_path=path)
+    await first.set("request", "doc-v1", RESULT)
+    # Stored 50 seconds ago, so 10 of its 60 seconds are left.
+    first._db.execute("UPDATE analysis_results SET created_at = created_at - 50")
+    first._db.commit()
+    first.close()
+
+    second = AnalysisResultCache(memory_entries=4, ttl_seconds=60, disk_path=path)
+    assert await second.get("request", "doc-v1") == RESULT
+    entry = second._memory.get_entry("request")
+    assert 9 < entry.expires_at - entry.stored_at <= 10
+    second.close()
+
+
+@pytest.mark.asyncio
+async def test_changed_document_hash_invalidates_both_tiers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = AnalysisResultCache(memory_entries=4, ttl_seconds=60, disk_path=path)
+    await cache.set("request", "doc-v1", RESULT)
+
+    assert await cache.get("request", "doc-v2") is None
+    assert cache.stats()["invalidations"] == 1
+    cache.close()
+
+    reopened = AnalysisResultCache(memory_entries=4, ttl_seconds=60, disk_path=path)
+    assert await reopened.get("request", "doc-v1") is None
+    reopened.close()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+
+
+def test_analyze_reports_cache_status_in_header(client, monkeypatch):
+    calls = []
+
+    async def fake_generation(request, document_text):
+        calls.append(request)
+        return RESULT
+
+    monkeypatch.setattr(ai_service, "_generate_initial_analysis", fake_generation)
+    body = {"chapter_url": CHAPTER_URL, "explanation_scope": "A", "analysis_role": "Journalist"}
+
+    first = client.post("/api/analyze", json=body)
+    # Same canonical request: only whitespace and case differ.
+    second = client.post("/api/analyze", json={**body, "analysis_role": "  journalist "})
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert {k: v for k, v in second.json().items() if k != "session_id"} == RESULT
+    assert first.json()["session_id"] != second.json()["session_id"]
+    assert len(calls) == 1
@@ -0,0 +1,54 @@
+from app.models.schemas import FollowUpRequest
+from app.services import ai_service
+from app.services.retrieval_service import select_relevant_text
+from app.services.scraper_service import _parse_document
+from app.utils.sections import split_into_sections
+from benchmarks.local_servers import build_chapter_html
+
+DOCUMENT_TEXT = _parse_document(build_chapter_html(sections=60))
+
+
+def test_split_into_sections_finds_numbered_headings():
+    sections = split_into_sections(DOCUMENT_TEXT)
+    numbered = [s for s in sections if s.number]
+
+    assert len(numbered) == 60
+    assert numbered[7].number == "16"
+    assert numbered[7].title == "Freedom of expression"
+    assert "(2) The right to freedom of expression" in numbered[7].text
+
+
+def test_relevant_sections_are_selected_within_budget():
+    result = select_relevant_text(DOCUMENT_TEXT, "Can the right to privacy be limited?", top_k=3, token_budget=1000)
+
+    assert result.is_excerpt
+    assert "14" in result.section_numbers
+    assert len(result.section_numbers) <= 3
+    assert result.estimated_tokens <= 1000
+    assert "right to privacy" in result.text
+
+
+def test_explicit_section_reference_is_always_included():
+    result = select_relevant_text(DOCUMENT_TEXT, "Summarise s25 for me", token_budget=1000)
+
+    assert result.section_numbers[0] == "25"
+
+
+def test_low_confidence_falls_back_to_full_text():
+    result = select_relevant_text(DOCUMENT_TEXT, "zebra quantum spaceship", token_budget=1000)
+
+    assert not result.is_excerpt
+    assert result.text == DOCUMENT_TEXT
+
+
+def test_short_documents_are_sent_whole():
+    result = select_relevant_text(DOCUMENT_TEXT, "privacy", token_budget=10**6)
+
+    assert not result.is_excerpt
+
+
+def test_excerpt_prompt_tells_the_model_it_has_excerpts():
+    request = FollowUpRequest(question="q", initial_analysis_text="a", original_url="https://www.gov.za/x")
+
+    assert "most relevant to the question" in ai_service._construct_follow_up_prompt(request, "text", is_excerpt=True)
+    assert "complete, authoritative source text" in ai_service._construct_follow_up_prompt(request, "text")
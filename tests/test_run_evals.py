@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import run_evals
+from app.core import config
+from app.services import llm_backend, snapshot_service
+from app.services.stub_backend import StubBackend
+from tests.test_result_cache import CHAPTER_TEXT, CHAPTER_URL
+
+CASE = {
+    "eval_id": "chapter1_summary",
+    "request": {
+        "source_url": CHAPTER_URL,
+        "persona_and_audience": {"role": "Civic Educator", "audience": "High School Students"},
+        "user_request": {"scope": "A", "specific_questions": []},
+    },
+    "ideal_output": {"fact_rubric": ["MUST mention the Republic."], "format_rubric": []},
+    "follow_up_evals": [
+        {"question": "Is the Republic sovereign?", "ideal_answer": "Yes."},
+        {"question": "Is it democratic?", "ideal_answer": "Yes."},
+    ],
+}
+
+
+class GradingStub(StubBackend):
+    """Answers grader prompts with fixed grades and everything else as usual."""
+
+    def __init__(self, score=4):
+        super().__init__()
+        self.score = score
+
+    def _canned_text(self, prompt):
+        if "AI Test Engineer" in prompt:
+            return json.dumps({"scores": {"accuracy": self.score, "completeness": 5, "tone": 5}, "score": self.score, "reasoning": "ok"})
+        return super()._canned_text(prompt)
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_ENABLED", config.ANALYSIS_CACHE_ENABLED)
+    monkeypatch.setattr(config, "FOLLOW_UP_CACHE_ENABLED", config.FOLLOW_UP_CACHE_ENABLED)
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    dataset = tmp_path / "dataset.json"
+    dataset.write_text(json.dumps([CASE]))
+    yield tmp_path, ["--dataset", str(dataset), "--checkpoint", str(tmp_path / "checkpoint.jsonl"), "--concurrency", "2"]
+    snapshot_service.unload_snapshot()
+    llm_backend.set_backend(None)
+
+
+@pytest.mark.asyncio
+async def test_report_has_scores_latency_and_tokens_per_stage(paths):
+    tmp_path, argv = paths
+    backend = GradingStub()
+    llm_backend.set_backend(backend)
+
+    report = await run_evals.run(run_evals.parse_args(argv + ["--output", str(tmp_path / "report.json")]))
+
+    summary = report["summary"]
+    assert summary["initial"] == {"ok": 1, "error": 0} and summary["follow_ups"] == {"ok": 2, "error": 0}
+    assert summary["scores"]["accuracy"] == 4 and summary["scores"]["follow_up"] == 4
+    assert set(summary["stages"]) == set(run_evals.STAGES)
+    assert summary["stages"]["follow_up"]["count"] == 2
+    assert all(stage["prompt_tokens"] > 0 and stage["response_tokens"] > 0 for stage in summary["stages"].values())
+    # One analysis, one follow-up per question, and a grading call for each.
+    assert backend.call_count == 6
+    assert json.loads((tmp_path / "report.json").read_text())["summary"] == summary
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_the_checkpoint(paths):
+    tmp_path, argv = paths
+    llm_backend.set_backend(GradingStub())
+    await run_evals.run(run_evals.parse_args(argv + ["--output", str(tmp_path / "first.json")]))
+    # Drop the last follow-up, as if the run had been killed mid-write.
+    lines = (tmp_path / "checkpoint.jsonl").read_text().splitlines()
+    (tmp_path / "checkpoint.jsonl").write_text("\n".join(lines[:-1]) + "\n" + lines[-1][:20])
+
+    backend = GradingStub(score=2)
+    llm_backend.set_backend(backend)
+    report = await run_evals.run(run_evals.parse_args(argv + [
+        "--output", str(tmp_path / "second.json"), "--compare", str(tmp_path / "first.json"),
+    ]))
+
+    # Only the missing follow-up (and its grading) ran again.
+    assert backend.call_count == 2
+    assert len(report["results"]) == 3
+    comparison = report["comparison"]
+    assert comparison["scores"]["follow_up"] == {"previous": 4.0, "current": 3.0, "delta": -1.0}
+    assert len(comparison["regressions"]) == 1 and comparison["regressions"][0].startswith("chapter1_summary/follow_up/")
@@ -1,8 +1,30 @@
 import pytest
-# NO MORE sys.path manipulation! Pytest handles it.
 
-# The import is clean and absolute, assuming pytest is run from the root.
-from scraper_service import fetch_and_parse_url
+from app.core import config
+from app.services import cassette_service, scraper_service
+from app.services.scraper_service import fetch_and_parse_url
+from app.utils.cassette import CassetteMissError
+
+# These tests replay gov.za responses from tests/cassettes. To (re-)record
+# them, run once with network access: CASSETTE_MODE=record pytest tests/test_scraper.py
+
+
+@pytest.fixture(autouse=True)
+def cassettes(monkeypatch):
+    monkeypatch.setattr(config, "CASSETTE_MODE", config.CASSETTE_MODE if config.CASSETTE_MODE != "off" else "replay")
+    cassette_service.reset_cassette_store()
+    scraper_service.clear_document_cache()
+    yield
+    cassette_service.reset_cassette_store()
+    scraper_service.clear_document_cache()
+
+
+async def _fetch(url):
+    try:
+        return await fetch_and_parse_url(url)
+    except CassetteMissError as e:
+        pytest.skip(f"{e} Record it with CASSETTE_MODE=record (needs network access).")
+
 
 @pytest.mark.asyncio
 async def test_successful_scraping():
@@ -10,8 +32,8 @@ async def test_successful_scraping():
     Tests that a valid URL returns the expected text content.
     """
     test_url = "https://www.gov.za/documents/constitution/constitution-republic-south-africa-1996-chapter-11-security-services-07-feb"
-    extracted_text = await fetch_and_parse_url(test_url)
-    
+    extracted_text = await _fetch(test_url)
+
     assert extracted_text is not None
     assert len(extracted_text) > 500
     assert "The text below includes all amendments, up to and including the 17th Amendment to the Constitution (disclaimer)." in extracted_text
@@ -22,10 +44,10 @@ async def test_failed_scraping_bad_url():
     Tests that a 404 URL raises a RuntimeError.
     """
     test_url = "https://www.gov.za/documents/non-existent-page-12345"
-    
+
     # pytest.raises is the correct way to test for expected exceptions
     with pytest.raises(RuntimeError) as excinfo:
-        await fetch_and_parse_url(test_url)
-    
+        await _fetch(test_url)
+
     # You can even check the error message
-    assert "404 Not Found" in str(excinfo.value)
\ No newline at end of file
+    assert "404 Not Found" in str(excinfo.value)
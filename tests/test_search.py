@@ -0,0 +1,143 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.chapters import CHAPTERS_DATA
+from app.main import app
+from app.services import document_service, search_service, snapshot_service
+from app.services.scraper_service import _parse_document
+from app.utils.inverted_index import InvertedIndex, SearchQuery
+from app.utils.sections import parse_chapter_text
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _fixture_text(number):
+    with open(os.path.join(FIXTURES, f"gov_za_chapter_{number}.html"), encoding="utf-8") as f:
+        return _parse_document(f.read())
+
+
+def _index(*texts):
+    index = InvertedIndex()
+    for number, text in enumerate(texts):
+        index.add(text, number=number)
+    return index
+
+
+def test_query_parsing_separates_phrases_and_drops_stopwords():
+    query = SearchQuery.parse('"Freedom of Expression" limits of the state')
+
+    assert query.phrases == [["freedom", "of", "expression"]]
+    assert query.terms == ["limits", "state"]
+    assert not SearchQuery.parse("of the")
+
+
+def test_phrases_match_consecutive_words_only():
+    index = _index("Everyone has freedom of expression.", "Expression of freedom is different.", "Freedom and expression.")
+
+    hits, total = index.search(SearchQuery.parse('"freedom of expression"'))
+
+    assert total == 1
+    assert [hit.fields["number"] for hit in hits] == [0]
+
+
+def test_results_are_ranked_by_relevance():
+    index = _index(
+        "The courts interpret the law.",
+        "Privacy: everyone has the right to privacy, and privacy of communications.",
+        "Everyone has the right to privacy.",
+    )
+
+    hits, total = index.search(SearchQuery.parse("privacy"))
+
+    assert total == 2
+    assert [hit.fields["number"] for hit in hits] == [1, 2]
+
+
+def test_snippet_marks_matches_and_escapes_html():
+    index = _index("Intro text. " * 40 + "Children <under 18> have a right to basic education & care.")
+
+    snippet = index.snippet(0, SearchQuery.parse('"basic education"'), width=120)
+
+    assert "<mark>basic</mark> <mark>education</mark>" in snippet
+    assert "&lt;under 18&gt;" in snippet and "&amp;" in snippet
+    assert snippet.startswith("…")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    chapters = [c for c in CHAPTERS_DATA if c["id"] in (1, 2)]
+    monkeypatch.setattr(search_service, "CHAPTERS_DATA", chapters)
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    snapshot_service.write_snapshot(
+        [(c["url"], _fixture_text(c["id"])) for c in chapters], config.CORPUS_SNAPSHOT_PATH
+    )
+    document_service.clear_documents()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+    document_service.clear_documents()
+
+
+def test_index_is_built_at_startup_from_the_snapshot(client):
+    stats = client.get("/api/stats").json()["search_index"]
+
+    assert stats["built"] and stats["source"] == "snapshot"
+    assert stats["chapters"] == 2 and stats["missing_chapters"] == []
+    assert stats["documents"] > 30
+
+
+def test_search_endpoint_returns_ranked_sections_with_highlights(client):
+    body = client.get("/api/search", params={"q": '"freedom of expression"'}).json()
+
+    top = body["results"][0]
+    assert (top["chapter_id"], top["section_number"], top["section_title"]) == (2, "16", "Freedom of expression")
+    assert "<mark>freedom</mark> of <mark>expression</mark>" in top["snippet"].lower()
+
+    body = client.get("/api/search", params={"q": "freedom", "limit": 3}).json()
+    assert len(body["results"]) == 3 and body["total"] > 3
+
+
+def test_search_can_be_limited_to_one_chapter(client):
+    body = client.get("/api/search", params={"q": "national flag", "chapter_id": 1}).json()
+
+    assert body["results"]
+    assert {r["chapter_id"] for r in body["results"]} == {1}
+    assert client.get("/api/search", params={"q": "flag", "chapter_id": 2}).json()["total"] == 0
+
+
+def test_search_validates_its_parameters(client):
+    assert client.get("/api/search").status_code == 422
+    assert client.get("/api/search", params={"q": "rights", "limit": 0}).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_missing_chapters_are_retried_by_a_later_search(monkeypatch):
+    chapters = [c for c in CHAPTERS_DATA if c["id"] in (1, 2)]
+    monkeypatch.setattr(search_service, "CHAPTERS_DATA", chapters)
+    monkeypatch.setattr(config, "SEARCH_INDEX_RETRY_SECONDS", 0)
+    calls = {1: 0, 2: 0}
+
+    async def get_chapter_document(chapter_id):
+        calls[chapter_id] += 1
+        if chapter_id == 2 and calls[2] == 1:
+            raise RuntimeError("gov.za is unavailable")
+        return parse_chapter_text(_fixture_text(chapter_id), chapter_id=chapter_id, title=f"Chapter {chapter_id}")
+
+    monkeypatch.setattr(document_service, "get_chapter_document", get_chapter_document)
+    search_service.reset_search_index()
+    try:
+        first = await search_service.search('"freedom of expression"')
+        assert first["total"] == 0 and search_service.get_search_stats()["missing_chapters"] == [2]
+
+        second = await search_service.search('"freedom of expression"')
+        assert second["results"][0]["chapter_id"] == 2
+        assert search_service.get_search_stats()["missing_chapters"] == []
+
+        # Nothing is missing and the text is unchanged, so the index is kept.
+        index = await search_service.get_search_index()
+        assert await search_service.get_search_index() is index
+    finally:
+        search_service.reset_search_index()
@@ -0,0 +1,99 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import ai_service, llm_backend, result_cache, session_service, snapshot_service
+from app.services.session_service import SessionNotFoundError, SessionStore
+from app.services.stub_backend import StubBackend
+from tests.test_result_cache import CHAPTER_TEXT, CHAPTER_URL
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_store_expires_idle_sessions(monkeypatch):
+    store = SessionStore(max_sessions=10, max_bytes=10_000, ttl_seconds=60)
+    clock = FakeClock()
+    monkeypatch.setattr(store._sessions, "_clock", clock)
+    session = store.create("u", "document", "analysis")
+
+    clock.now = 50
+    assert store.get(session.session_id) is session  # activity restarts the idle timer
+    clock.now = 100
+    assert store.get(session.session_id) is session
+    clock.now = 200
+    with pytest.raises(SessionNotFoundError):
+        store.get(session.session_id)
+    assert store.stats()["entries"] == 0
+
+
+def test_store_evicts_least_recently_used_beyond_memory_cap():
+    store = SessionStore(max_sessions=10, max_bytes=250, ttl_seconds=60)
+    first = store.create("u", "a" * 100, "")
+    second = store.create("u", "b" * 100, "")
+    third = store.create("u", "c" * 40, "")
+    store.get(first.session_id)
+
+    # Growing the third session's history pushes the store over its cap,
+    # evicting the least recently used session.
+    store.add_turns(third, [("q" * 30, "a" * 30)])
+
+    with pytest.raises(SessionNotFoundError):
+        store.get(second.session_id)
+    assert store.get(first.session_id) and store.get(third.session_id).history
+    assert store.stats()["bytes"] == 200
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    session_service.reset_session_store()
+    backend = StubBackend()
+    llm_backend.set_backend(backend)
+    with TestClient(app) as test_client:
+        yield test_client, backend
+    snapshot_service.unload_snapshot()
+    result_cache.close_result_cache()
+    session_service.reset_session_store()
+
+
+def test_follow_ups_by_session_skip_scraping_and_carry_history(client, monkeypatch):
+    test_client, backend = client
+    session_id = test_client.post("/api/analyze", json={"chapter_url": CHAPTER_URL, "explanation_scope": "A"}).json()["session_id"]
+
+    async def no_scrape(url):
+        raise AssertionError("session follow-ups must not re-scrape")
+
+    monkeypatch.setattr(ai_service, "fetch_and_parse_url", no_scrape)
+    first = test_client.post("/api/follow-up", json={"session_id": session_id, "question": "Who is sovereign?"})
+    second = test_client.post("/api/follow-up", json={"session_id": session_id, "questions": ["What are the founding values?"]})
+
+    assert first.status_code == 200 and "stub answer" in first.json()["answer"]
+    assert second.status_code == 200
+    prompt = backend.recent_calls[-1].text
+    assert "<conversation_history>" in prompt and "Who is sovereign?" in prompt
+    assert "stub analysis" in prompt  # the analysis came from the session, not the request
+    assert "<conversation_history>" not in backend.recent_calls[-2].text
+
+
+def test_unknown_session_returns_404(client):
+    test_client, _ = client
+
+    response = test_client.post("/api/follow-up", json={"session_id": "missing", "question": "Hi?"})
+
+    assert response.status_code == 404
+
+
+def test_follow_up_requires_session_or_context(client):
+    test_client, _ = client
+
+    assert test_client.post("/api/follow-up", json={"question": "Hi?"}).status_code == 422
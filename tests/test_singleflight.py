@@ -0,0 +1,115 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import scraper_service
+from app.utils.singleflight import SingleFlight
+from tests.test_document_cache import PAGE_HTML, TEST_URL
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    group = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    waiters = [asyncio.create_task(group.do("key", work)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["result"] * 10
+    assert calls == 1
+    assert group.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 9}
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    group = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        raise RuntimeError("upstream failed")
+
+    waiters = [asyncio.create_task(group.do("key", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert group.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_does_not_cancel_the_others():
+    group = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return 42
+
+    first = asyncio.create_task(group.do("key", work))
+    second = asyncio.create_task(group.do("key", work))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == 42
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_last_waiter_leaving_cancels_the_shared_task():
+    group = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work():
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(group.do("key", work))
+    await started.wait()
+    waiter.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    await asyncio.sleep(0)
+    assert group.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_scrapes_of_one_url_hit_the_network_once():
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, text=PAGE_HTML)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    scraper_service.set_http_client(client)
+    scraper_service.clear_document_cache()
+    try:
+        texts = await asyncio.gather(*[scraper_service.fetch_and_parse_url(TEST_URL) for _ in range(20)])
+    finally:
+        scraper_service.set_http_client(None)
+        scraper_service.clear_document_cache()
+        await client.aclose()
+
+    assert len(set(texts)) == 1
+    assert len(requests) == 1
@@ -0,0 +1,55 @@
+import gzip
+import json
+
+import pytest
+
+from app.services import scraper_service, snapshot_service
+
+SNAPSHOT_URL = "https://www.gov.za/documents/constitution/chapter-1-founding-provisions"
+SNAPSHOT_TEXT = "1. Republic of South Africa\n\nThe Republic of South Africa is one, sovereign, democratic state."
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "corpus_snapshot.json.gz")
+    snapshot_service.write_snapshot([(SNAPSHOT_URL, SNAPSHOT_TEXT)], path)
+    yield path
+    snapshot_service.unload_snapshot()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_documents_are_served_without_network(snapshot_path, monkeypatch):
+    def fail_if_called(*args, **kwargs):
+        raise AssertionError("Snapshot documents must not be fetched over the network.")
+
+    monkeypatch.setattr(scraper_service, "create_http_client", fail_if_called)
+
+    assert snapshot_service.load_snapshot(snapshot_path) == 1
+    assert await scraper_service.fetch_and_parse_url(SNAPSHOT_URL) == SNAPSHOT_TEXT
+    assert snapshot_service.get_snapshot_stats()["hits"] == 1
+
+
+def test_missing_snapshot_loads_nothing(tmp_path):
+    assert snapshot_service.load_snapshot(str(tmp_path / "missing.json.gz")) == 0
+    assert snapshot_service.get_snapshot_document(SNAPSHOT_URL) is None
+
+
+def test_unsupported_format_version_is_ignored(snapshot_path):
+    with gzip.open(snapshot_path, "rt", encoding="utf-8") as f:
+        payload = json.load(f)
+    payload["format_version"] = snapshot_service.SNAPSHOT_FORMAT_VERSION + 1
+    with gzip.open(snapshot_path, "wt", encoding="utf-8") as f:
+        json.dump(payload, f)
+
+    assert snapshot_service.load_snapshot(snapshot_path) == 0
+
+
+def test_corrupted_entries_are_skipped(snapshot_path):
+    with gzip.open(snapshot_path, "rt", encoding="utf-8") as f:
+        payload = json.load(f)
+    payload["documents"][0]["text"] += " tampered"
+    with gzip.open(snapshot_path, "wt", encoding="utf-8") as f:
+        json.dump(payload, f)
+
+    assert snapshot_service.load_snapshot(snapshot_path) == 0
+    assert snapshot_service.get_snapshot_document(SNAPSHOT_URL) is None
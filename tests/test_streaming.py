@@ -0,0 +1,105 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services import llm_backend, result_cache, snapshot_service
+from app.services.stub_backend import StubBackend
+from app.utils.stream_json import IncrementalObjectParser
+from tests.test_result_cache import CHAPTER_TEXT, CHAPTER_URL
+
+RESULT = {
+    "analysis": "The **Bill of Rights** is a cornerstone of democracy.\nIt binds the state. é😀",
+    "answered_questions": [
+        {"question": "What limits section 16?", "answer": "Propaganda for war is excluded."},
+        {"question": "Define equality.", "answer": "Everyone is equal before the law."},
+    ],
+}
+
+
+def _chunks(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64])
+def test_parser_emits_fields_and_items_as_they_complete(size):
+    parser = IncrementalObjectParser(stream_keys=["analysis"])
+    events = []
+    for chunk in _chunks(json.dumps(RESULT, indent=2), size):
+        events.extend(parser.feed(chunk))
+
+    deltas = "".join(e[2] for e in events if e[0] == "string_delta")
+    items = [e[3] for e in events if e[0] == "item"]
+
+    assert deltas == RESULT["analysis"]
+    assert ("field", "analysis", RESULT["analysis"]) in events
+    assert items == RESULT["answered_questions"]
+    assert events[-1] == ("end", RESULT)
+
+
+def test_parser_reports_first_item_before_the_object_ends():
+    parser = IncrementalObjectParser()
+    text = json.dumps(RESULT)
+    cut = text.index("}") + 1  # just after the first answered question
+
+    events = parser.feed(text[:cut])
+
+    assert [e[3] for e in events if e[0] == "item"] == RESULT["answered_questions"][:1]
+    assert not parser.done
+
+
+def test_parser_work_is_linear_in_the_response_size():
+    def seconds(size):
+        text = json.dumps({"analysis": "word \\\"quoted\\\" é " * size, "answered_questions": []})
+        parser = IncrementalObjectParser(stream_keys=["analysis"])
+        started = time.perf_counter()
+        for chunk in _chunks(text, 16):
+            parser.feed(chunk)
+        assert parser.done
+        return time.perf_counter() - started
+
+    small, large = seconds(2_000), seconds(20_000)
+    assert large < small * 30
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    llm_backend.set_backend(StubBackend(responses={"analysis": RESULT}))
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+    result_cache.close_result_cache()
+
+
+def _stream(client):
+    with client.stream("POST", "/api/analyze/stream", json={"chapter_url": CHAPTER_URL, "explanation_scope": "B"}) as response:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_stream_endpoint_delivers_incremental_events_then_complete(client):
+    events = _stream(client)
+    kinds = [e["event"] for e in events]
+
+    assert kinds[0] == "analysis_delta"
+    assert "".join(e["text"] for e in events if e["event"] == "analysis_delta") == RESULT["analysis"]
+    assert [e["answer"] for e in events if e["event"] == "answered_question"] == [
+        q["answer"] for q in RESULT["answered_questions"]
+    ]
+    assert events[-1].pop("session_id")
+    assert events[-1] == {"event": "complete", "result": RESULT, "cache": "MISS"}
+
+
+def test_stream_endpoint_replays_cached_result(client):
+    _stream(client)
+    events = _stream(client)
+
+    assert "analysis_delta" not in [e["event"] for e in events]
+    assert events[-1]["cache"] == "HIT"
@@ -0,0 +1,85 @@
+import asyncio
+import io
+import json
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.logging_config import configure_logging, shutdown_logging
+from app.core.tracing import current_request_id, span, start_trace
+from app.main import app
+from app.services import llm_backend, result_cache, snapshot_service
+from app.services.stub_backend import StubBackend
+from tests.test_result_cache import CHAPTER_TEXT, CHAPTER_URL
+
+
+def _timings(header):
+    """Server-Timing header value -> {name: duration in ms}."""
+    timings = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        timings[name] = float(next(p for p in params if p.startswith("dur="))[4:])
+    return timings
+
+
+@pytest.mark.asyncio
+async def test_spans_from_concurrent_tasks_join_the_request_trace():
+    async def call_model():
+        with span("model"):
+            await asyncio.sleep(0.01)
+
+    with start_trace("req-1") as trace:
+        await asyncio.gather(call_model(), call_model())
+        with span("decode"):
+            pass
+
+    assert [s.name for s in trace.spans] == ["model", "model", "decode"]
+    header = trace.server_timing()
+    assert _timings(header)["model"] >= 20 and 'desc="x2"' in header
+    assert current_request_id() is None
+
+
+def test_logs_are_json_lines_with_the_request_id():
+    stream = io.StringIO()
+    configure_logging(stream)
+    try:
+        with start_trace("req-42"):
+            logging.getLogger("app.services.scraper_service").info("Scraping URL", extra={"url": CHAPTER_URL})
+        logging.getLogger("app.services.ai_service").error("Model failed: %s", "timeout")
+    finally:
+        shutdown_logging()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "Scraping URL" and first["severity"] == "INFO"
+    assert first["request_id"] == "req-42" and first["url"] == CHAPTER_URL
+    assert second["message"] == "Model failed: timeout" and "request_id" not in second
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_PATH", "")
+    monkeypatch.setattr(config, "CORPUS_SNAPSHOT_PATH", str(tmp_path / "snapshot.json.gz"))
+    snapshot_service.write_snapshot([(CHAPTER_URL, CHAPTER_TEXT)], config.CORPUS_SNAPSHOT_PATH)
+    result_cache.close_result_cache()
+    with TestClient(app) as test_client:
+        yield test_client
+    snapshot_service.unload_snapshot()
+    result_cache.close_result_cache()
+    llm_backend.set_backend(None)
+
+
+def test_responses_carry_server_timing_and_request_id(client):
+    llm_backend.set_backend(StubBackend(latency="fixed:0.02"))
+    body = {"chapter_url": CHAPTER_URL, "explanation_scope": "A", "analysis_role": "Journalist"}
+
+    response = client.post("/api/analyze", json=body, headers={"X-Request-ID": "frontend-7"})
+
+    assert response.headers["X-Request-ID"] == "frontend-7"
+    timings = _timings(response.headers["Server-Timing"])
+    assert {"cache", "prompt", "model", "decode", "total"} <= set(timings)
+    assert timings["model"] >= 20 and timings["total"] >= timings["model"]
+    # Unusable incoming ids are replaced rather than echoed.
+    other = client.get("/api/chapters", headers={"X-Request-ID": "bad id!"})
+    assert other.headers["X-Request-ID"] != "bad id!" and len(other.headers["X-Request-ID"]) == 32